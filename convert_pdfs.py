@@ -1,5 +1,5 @@
-import pdfplumber
 import os
+from src.lib.pdf_text import pdf_text
 
 DOCS_DIR = "documents"
 OUTPUT_DIR = "rules_context"
@@ -17,32 +17,35 @@ def convert_pdfs():
         os.makedirs(OUTPUT_DIR)
         print(f"Diretório '{OUTPUT_DIR}' criado.")
 
+    sources = {}
     for pdf_file, txt_file in FILES_TO_CONVERT.items():
         pdf_path = os.path.join(DOCS_DIR, pdf_file)
-        txt_path = os.path.join(OUTPUT_DIR, txt_file)
-
         if not os.path.exists(pdf_path):
             print(f"Aviso: Arquivo {pdf_path} não encontrado. Pulando.")
             continue
+        sources[pdf_path] = txt_file
 
+    # Extrai todos os PDFs em paralelo (ou lê do cache, se já extraídos)
+    pdf_text.warm(sources)
+
+    for pdf_path, txt_file in sources.items():
+        pdf_file = os.path.basename(pdf_path)
+        txt_path = os.path.join(OUTPUT_DIR, txt_file)
         print(f"Convertendo {pdf_file} para {txt_file}...")
-        
+
         try:
-            full_text = []
-            with pdfplumber.open(pdf_path) as pdf:
-                for i, page in enumerate(pdf.pages):
-                    text = page.extract_text()
-                    if text:
-                        # Limpa caracteres nulos e tenta decodificar corretamente
-                        clean_text = text.replace('\x00', '')
-                        full_text.append(f"--- Página {i+1} ---\n{clean_text}")
-            
+            full_text = [
+                f"--- Página {i + 1} ---\n{text}"
+                for i, text in enumerate(pdf_text.pages(pdf_path))
+                if text
+            ]
+
             with open(txt_path, "w", encoding="utf-8") as f:
                 f.write(f"FONTE: {pdf_file}\n\n")
                 f.write("\n\n".join(full_text))
-            
+
             print(f"Sucesso! Salvo em {txt_path}")
-            
+
         except Exception as e:
             print(f"Erro ao converter {pdf_file}: {e}")
 
@@ -1,17 +1,90 @@
-import asyncio
+"""
+Debug CLI for passport eligibility.
+
+Runs evaluatePassportEligibilityTool in trace mode and prints, per partner and
+criterion, the rule, input/coerced values, result and timing, followed by the
+DB vs compute summary. Note that the tool saves eligibility_results as usual.
+
+Usage:
+    python debug_eligibility.py                       # first user found
+    python debug_eligibility.py --user-id <uuid>
+    python debug_eligibility.py --user-id <uuid> --partner estudar --failed-only
+    python debug_eligibility.py --user-id <uuid> --slowest 10
+    python debug_eligibility.py --user-id <uuid> --json
+"""
+import argparse
+import json
+
 from src.tools.evaluatePassportEligibility import evaluatePassportEligibilityTool
 from src.lib.supabase import supabase
+from src.lib.text_utils import fold
+
+
+def _fmt(value) -> str:
+    text = json.dumps(value, ensure_ascii=False, default=str)
+    return text if len(text) <= 40 else text[:37] + "..."
+
+
+def print_report(out: dict, partner_filter: str = None, failed_only: bool = False, slowest: int = 0):
+    trace = out.get("trace") or {}
+    partners = trace.get("partners", [])
+    if partner_filter:
+        partners = [p for p in partners if fold(partner_filter) in fold(p["partner_name"] or "")]
+
+    if slowest:
+        rows = [(p["partner_name"], c) for p in partners for c in p["criteria"]]
+        rows.sort(key=lambda r: r[1]["ms"], reverse=True)
+        print(f"\n== {slowest} slowest criteria ==")
+        for name, c in rows[:slowest]:
+            print(f"  {c['ms']:8.3f} ms  {name} / {c['field']}  {c['rule'] or c['mode']}")
+    else:
+        for p in partners:
+            criteria = [c for c in p["criteria"] if not (failed_only and c["met"])]
+            met = sum(1 for c in p["criteria"] if c["met"])
+            print(f"\n== {p['partner_name']} ({met}/{len(p['criteria'])} met, {p['compute_ms']:.3f} ms) ==")
+            for c in criteria:
+                mark = "OK " if c["met"] else "NO "
+                print(f"  {mark} {c['field']:<28} {c['rule'] or '[' + c['mode'] + ']'}")
+                print(f"       input={_fmt(c['input'])} coerced={_fmt(c['coerced'])} ({c['ms']:.3f} ms)")
+
+    summary = trace.get("summary")
+    if summary:
+        print("\n== Summary ==")
+        print(f"  total   {summary['total_ms']:9.3f} ms")
+        print(f"  db      {summary['db_ms']:9.3f} ms")
+        print(f"  compute {summary['compute_ms']:9.3f} ms ({summary['criteria_evaluated']} criteria)")
+        for q in summary["queries"]:
+            print(f"    {q['query']:<16} {q['ms']:9.3f} ms")
+
+    if out.get("status") != "success" or out.get("message"):
+        print(f"\nSTATUS: {out.get('status')} {out.get('message', '')}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Trace passport eligibility evaluation for a user.")
+    parser.add_argument("--user-id", help="user_profiles.id to evaluate (defaults to the first user found)")
+    parser.add_argument("--partner", help="only show partners whose name contains this text")
+    parser.add_argument("--failed-only", action="store_true", help="only show criteria that were not met")
+    parser.add_argument("--slowest", type=int, default=0, help="list the N slowest criteria instead of the per-partner view")
+    parser.add_argument("--json", action="store_true", help="print the raw tool output, trace included")
+    args = parser.parse_args()
+
+    user_id = args.user_id
+    if not user_id:
+        res = supabase.table("user_profiles").select("id").limit(1).execute()
+        if not res.data:
+            print("No users found.")
+            return
+        user_id = res.data[0]["id"]
 
-# fetch a user ID
-res = supabase.table("user_profiles").select("id").limit(1).execute()
-if res.data:
-    user_id = res.data[0]["id"]
     print(f"Testing for user {user_id}")
-    out = evaluatePassportEligibilityTool(user_id)
-    print("OUTPUT:", out)
-    
-    # Check what got saved
-    check = supabase.table("user_profiles").select("eligibility_results").eq("id", user_id).execute()
-    print("SAVED IN DB:", check.data)
-else:
-    print("No users found.")
+    out = evaluatePassportEligibilityTool(user_id, trace=True)
+
+    if args.json:
+        print(json.dumps(out, ensure_ascii=False, indent=2, default=str))
+    else:
+        print_report(out, partner_filter=args.partner, failed_only=args.failed_only, slowest=args.slowest)
+
+
+if __name__ == "__main__":
+    main()
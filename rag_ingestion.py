@@ -1,75 +1,255 @@
+"""
+Incremental RAG ingestion into the Supabase `documents` table.
+
+Only new or changed content is embedded:
+- Each source file is hashed; unchanged files (same hash, embedding model and
+  chunker version) are skipped using the manifest.
+- Changed files are re-split along their structure (src.lib.chunking: chapters,
+  numbered items, date tables) and each chunk is hashed. Chunks whose hash is
+  already stored in `documents` with the current embedding model are kept,
+  new chunks are embedded in parallel batches and inserted, and rows that no
+  longer match any chunk (or were embedded with another model) are deleted.
+- Files that disappeared from the directory have their rows deleted.
+
+The manifest is saved after every file and chunk rows carry their hash, so an
+interrupted run resumes where it stopped.
+
+Usage:
+    python rag_ingestion.py [--dir documents] [--force] [--dry-run] [--workers 4] [--batch-size 50] [--prune-legacy]
+"""
+import argparse
+import hashlib
+import json
 import os
-from langchain_google_genai import GoogleGenerativeAIEmbeddings
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+from google import genai
 from langchain_community.document_loaders import PyPDFLoader, TextLoader
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_community.vectorstores import SupabaseVectorStore
 from src.lib.supabase import supabase
+from src.lib.chunking import chunk_document, CHUNKER_VERSION
+from src.agent.config import MODEL_EMBEDDING
 from dotenv import load_dotenv
 
 load_dotenv()
 
-def ingest_documents(directory_path: str = "documents"):
+MANIFEST_NAME = ".ingestion_manifest.json"
+SUPPORTED_EXTENSIONS = (".pdf", ".txt", ".md")
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def load_manifest(path: str) -> Dict[str, Any]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"files": {}}
+
+
+def save_manifest(path: str, manifest: Dict[str, Any]):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def load_chunks(file_path: str, source: str) -> List[Dict[str, Any]]:
+    """Splits a file into structure-aware chunks: [{"content", "metadata", "chunk_hash"}]."""
+    if file_path.endswith(".pdf"):
+        pages = PyPDFLoader(file_path).load()
+    else:
+        pages = TextLoader(file_path).load()
+    # Chunk the whole document at once so items that cross a page break stay together
+    text = "\n".join(page.page_content for page in pages)
+
+    chunks = []
+    chunked = chunk_document(text, title=os.path.splitext(source)[0], pdf=file_path.endswith(".pdf"))
+    for index, chunk in enumerate(chunked):
+        content = chunk["content"]
+        chunk_hash = _sha256(f"{source}\n{content}".encode("utf-8"))
+        metadata = {
+            "source": source,
+            "chunk_index": index,
+            "chunk_hash": chunk_hash,
+            "section_path": chunk["section_path"],
+            "items": chunk["items"],
+            "kind": chunk["kind"],
+        }
+        chunks.append({"content": content, "metadata": metadata, "chunk_hash": chunk_hash})
+    return chunks
+
+
+def existing_rows(source: str) -> List[Dict[str, Any]]:
+    res = supabase.table("documents").select("id, metadata").eq("metadata->>source", source).execute()
+    return res.data or []
+
+
+def delete_rows(ids: List[Any], batch_size: int = 200):
+    for i in range(0, len(ids), batch_size):
+        supabase.table("documents").delete().in_("id", ids[i:i + batch_size]).execute()
+
+
+class Embedder:
+    def __init__(self, model: str = MODEL_EMBEDDING):
+        self.model = model
+        self.client = genai.Client(api_key=os.getenv("GOOGLE_API_KEY"))
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        response = self.client.models.embed_content(model=self.model, contents=texts)
+        return [list(e.values) for e in response.embeddings]
+
+
+class _DryRunEmbedder:
+    """Stands in for Embedder when nothing is embedded (only .model is used)."""
+
+    def __init__(self, model: str):
+        self.model = model
+
+
+def embed_and_insert(chunks: List[Dict[str, Any]], embedder: Embedder, file_sha: str, workers: int, batch_size: int) -> int:
+    """Embeds chunks in parallel batches and inserts each batch as soon as it is ready."""
+    batches = [chunks[i:i + batch_size] for i in range(0, len(chunks), batch_size)]
+
+    def process(batch):
+        vectors = embedder.embed([c["content"] for c in batch])
+        rows = [
+            {
+                "content": chunk["content"],
+                "metadata": {**chunk["metadata"], "embedding_model": embedder.model, "file_sha256": file_sha},
+                "embedding": vector,
+            }
+            for chunk, vector in zip(batch, vectors)
+        ]
+        supabase.table("documents").insert(rows).execute()
+        return len(rows)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return sum(pool.map(process, batches))
+
+
+def ingest_file(file_path: str, source: str, embedder: Embedder, file_sha: str, workers: int, batch_size: int, dry_run: bool) -> Dict[str, int]:
+    chunks = load_chunks(file_path, source)
+    current = {c["chunk_hash"] for c in chunks}
+
+    stored = {}
+    orphans = []
+    for row in existing_rows(source):
+        meta = row.get("metadata") or {}
+        chunk_hash = meta.get("chunk_hash")
+        if chunk_hash in current and meta.get("embedding_model") == embedder.model and chunk_hash not in stored:
+            stored[chunk_hash] = row["id"]
+        else:
+            orphans.append(row["id"])
+
+    missing = [c for c in chunks if c["chunk_hash"] not in stored]
+    stats = {"chunks": len(chunks), "kept": len(stored), "embedded": len(missing), "deleted": len(orphans)}
+    if dry_run:
+        return stats
+
+    if missing:
+        embed_and_insert(missing, embedder, file_sha, workers, batch_size)
+    # Orphans go last so a crash mid-file never leaves a source without rows
+    if orphans:
+        delete_rows(orphans)
+    return stats
+
+
+def prune_legacy_rows(model: str, dry_run: bool = False, page_size: int = 1000) -> int:
+    """Deletes rows not tagged with the current embedding model (e.g. the old embedding-001 ingestion)."""
+    stale, start = [], 0
+    while True:
+        page = supabase.table("documents").select("id, metadata").order("id").range(start, start + page_size - 1).execute().data or []
+        stale.extend(row["id"] for row in page if (row.get("metadata") or {}).get("embedding_model") != model)
+        if len(page) < page_size:
+            break
+        start += page_size
+    print(f"Legacy rows not embedded with {model}: {len(stale)}")
+    if stale and not dry_run:
+        delete_rows(stale)
+    return len(stale)
+
+
+def ingest_documents(directory_path: str = "documents", force: bool = False, dry_run: bool = False, workers: int = 4, batch_size: int = 50, prune_legacy: bool = False):
     """
-    Ingests documents (PDF/Text) from the specified directory into Supabase Vector Store.
+    Ingests documents (PDF/Text) from the specified directory into the Supabase `documents` table,
+    embedding only new or changed chunks.
     """
-    
-    # 1. Setup Embeddings
-    embeddings = GoogleGenerativeAIEmbeddings(model="models/embedding-001")
-    
-    documents = []
-    
-    # 2. Load Documents
     if not os.path.exists(directory_path):
         print(f"Directory {directory_path} not found.")
         return
 
-    for filename in os.listdir(directory_path):
+    started = time.perf_counter()
+    manifest_path = os.path.join(directory_path, MANIFEST_NAME)
+    manifest = load_manifest(manifest_path)
+    files_state = manifest.setdefault("files", {})
+    embedder = None if dry_run else Embedder()
+    model = MODEL_EMBEDDING
+    totals = {"files": 0, "skipped": 0, "chunks": 0, "kept": 0, "embedded": 0, "deleted": 0}
+
+    present = set()
+    for filename in sorted(os.listdir(directory_path)):
         file_path = os.path.join(directory_path, filename)
+        if not os.path.isfile(file_path) or filename == MANIFEST_NAME:
+            continue
+        if not filename.endswith(SUPPORTED_EXTENSIONS):
+            print(f"Skipping unsupported file: {filename}")
+            continue
+
+        source = filename
+        present.add(source)
+        with open(file_path, "rb") as f:
+            file_sha = _sha256(f.read())
+
+        state = files_state.get(source, {})
+        if (not force and state.get("sha256") == file_sha and state.get("model") == model
+                and state.get("chunker") == CHUNKER_VERSION and state.get("complete")):
+            totals["skipped"] += 1
+            continue
+
         try:
-            if filename.endswith(".pdf"):
-                loader = PyPDFLoader(file_path)
-                documents.extend(loader.load())
-            elif filename.endswith(".txt") or filename.endswith(".md"):
-                loader = TextLoader(file_path)
-                documents.extend(loader.load())
-            else:
-                print(f"Skipping unsupported file: {filename}")
+            stats = ingest_file(file_path, source, embedder or _DryRunEmbedder(model), file_sha, workers, batch_size, dry_run)
         except Exception as e:
-            print(f"Error loading {filename}: {e}")
+            print(f"Error ingesting {filename}: {e}")
+            continue
 
-    if not documents:
-        print("No documents found to ingest.")
-        return
+        totals["files"] += 1
+        for key in ("chunks", "kept", "embedded", "deleted"):
+            totals[key] += stats[key]
+        print(f"{filename}: {stats['chunks']} chunks, {stats['kept']} kept, {stats['embedded']} embedded, {stats['deleted']} deleted")
+
+        if not dry_run:
+            files_state[source] = {"sha256": file_sha, "model": model, "chunker": CHUNKER_VERSION, "chunks": stats["chunks"], "complete": True}
+            save_manifest(manifest_path, manifest)
+
+    # Sources removed from the directory
+    for source in sorted(set(files_state) - present):
+        ids = [row["id"] for row in existing_rows(source)]
+        print(f"{source}: removed from {directory_path}, deleting {len(ids)} chunks")
+        totals["deleted"] += len(ids)
+        if not dry_run:
+            delete_rows(ids)
+            del files_state[source]
+            save_manifest(manifest_path, manifest)
+
+    if prune_legacy:
+        totals["deleted"] += prune_legacy_rows(model, dry_run=dry_run)
+
+    elapsed = time.perf_counter() - started
+    print(f"Ingestion complete in {elapsed:.1f}s ({'dry run, ' if dry_run else ''}model {model}): {totals}")
+    return totals
 
-    # 3. Split Text
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=1000,
-        chunk_overlap=200,
-    )
-    splits = text_splitter.split_documents(documents)
-    
-    # Sanitize content to remove null bytes
-    for split in splits:
-        split.page_content = split.page_content.replace('\x00', '')
-        
-    print(f"Split into {len(splits)} chunks.")
-
-    # 4. Index to Supabase
-    # Note: Requires a table 'documents' with 'content', 'metadata', 'embedding' columns in Supabase
-    # and pgvector extension enabled.
-    
-    try:
-        vector_store = SupabaseVectorStore.from_documents(
-            documents=splits,
-            embedding=embeddings,
-            client=supabase,
-            table_name="documents",
-            query_name="match_documents",
-            chunk_size=500
-        )
-        print("Ingestion complete!")
-    except Exception as e:
-        print(f"Error indexing to Supabase: {e}")
 
 if __name__ == "__main__":
-    ingest_documents()
+    parser = argparse.ArgumentParser(description="Incremental RAG ingestion into the Supabase documents table.")
+    parser.add_argument("--dir", default="documents")
+    parser.add_argument("--force", action="store_true", help="re-check every file even if unchanged (unchanged chunks are still kept)")
+    parser.add_argument("--dry-run", action="store_true", help="report what would change without embedding or writing")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--prune-legacy", action="store_true", help="also delete rows not tagged with the current embedding model")
+    args = parser.parse_args()
+    ingest_documents(args.dir, force=args.force, dry_run=args.dry_run, workers=args.workers, batch_size=args.batch_size, prune_legacy=args.prune_legacy)
@@ -0,0 +1,93 @@
+"""
+Offline benchmark for the query-embedding cache and micro-batcher.
+
+Uses the deterministic HashEmbeddingBackend with a simulated per-call latency,
+so no API key or network is needed. Compares, for the same workload:
+  - naive: one backend call per query, no cache
+  - service: EmbeddingService (LRU + sqlite cache, batched concurrent misses)
+
+Usage:
+    python scripts/bench_embeddings.py --queries 500 --unique 60 --concurrency 20 --latency-ms 80
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.lib.embeddings import EmbeddingCache, EmbeddingService, HashEmbeddingBackend
+
+BASE_QUESTIONS = [
+    "o que é o prouni", "como funciona o sisu", "qual a renda para bolsa integral",
+    "quais documentos preciso", "quando abrem as inscrições", "posso usar a nota do enem",
+    "o que é bolsa parcial", "como funciona a lista de espera",
+]
+
+
+def build_workload(total: int, unique: int, seed: int = 7):
+    rng = random.Random(seed)
+    pool = [f"{rng.choice(BASE_QUESTIONS)} {i}" for i in range(unique)]
+    # Skewed popularity: a few questions dominate, as in real traffic
+    weights = [1 / (i + 1) for i in range(unique)]
+    queries = rng.choices(pool, weights=weights, k=total)
+    # Same question, different surface form (case/punctuation) must hit the cache
+    return [q.upper() + "?" if rng.random() < 0.2 else q for q in queries]
+
+
+async def run(workload, concurrency, embed):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(query):
+        async with semaphore:
+            start = time.perf_counter()
+            await embed(query)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(q) for q in workload))
+    latencies.sort()
+    return {
+        "wall_ms": (time.perf_counter() - start) * 1000,
+        "p50_ms": latencies[len(latencies) // 2],
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1],
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--unique", type=int, default=60)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=80.0)
+    args = parser.parse_args()
+
+    workload = build_workload(args.queries, args.unique)
+
+    naive_backend = HashEmbeddingBackend(latency_ms=args.latency_ms)
+    naive = await run(workload, args.concurrency, lambda q: naive_backend.embed([q]))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        backend = HashEmbeddingBackend(latency_ms=args.latency_ms)
+        service = EmbeddingService(backend, EmbeddingCache(path=os.path.join(tmp, "bench.sqlite")))
+        cold = await run(workload, args.concurrency, service.embed_query)
+        cold_calls = backend.calls
+
+        # Warm start: new process memory, same sqlite file
+        restarted = EmbeddingService(backend, EmbeddingCache(path=os.path.join(tmp, "bench.sqlite")))
+        warm = await run(workload, args.concurrency, restarted.embed_query)
+
+    print(f"workload: {args.queries} queries, {args.unique} unique, concurrency {args.concurrency}, backend latency {args.latency_ms} ms\n")
+    print(f"{'mode':<18}{'backend calls':>14}{'wall ms':>10}{'p50 ms':>9}{'p95 ms':>9}")
+    print(f"{'naive':<18}{naive_backend.calls:>14}{naive['wall_ms']:>10.0f}{naive['p50_ms']:>9.1f}{naive['p95_ms']:>9.1f}")
+    print(f"{'service (cold)':<18}{cold_calls:>14}{cold['wall_ms']:>10.0f}{cold['p50_ms']:>9.1f}{cold['p95_ms']:>9.1f}")
+    print(f"{'service (disk)':<18}{backend.calls - cold_calls:>14}{warm['wall_ms']:>10.0f}{warm['p50_ms']:>9.1f}{warm['p95_ms']:>9.1f}")
+    print(f"\nservice stats (cold): {service.stats}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
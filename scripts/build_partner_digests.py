@@ -0,0 +1,107 @@
+"""
+Offline builder for the per-partner knowledge digests read by smartResearchTool.
+
+For every partner with active documents in `knowledge_documents`, the
+documents are read (through the local knowledge cache) and condensed into a
+structured digest (eligibility, dates, benefits, process, links). The result
+is published as `digests/partners.json` in the `knowledge-base` bucket.
+Partners whose source text did not change keep their previous digest.
+
+With --with-pdfs, partner PDFs in documents/partners are added to the sources
+when their file name resolves to a partner.
+
+Usage:
+    python scripts/build_partner_digests.py [--partner NAME] [--with-pdfs] [--force] [--dry-run]
+"""
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.lib.supabase import supabase
+from src.lib.chunking import clean_text
+from src.lib.knowledge_store import knowledge_store
+from src.lib.partner_directory import partner_directory, resolve_partner_id
+from src.lib.partner_digests import partner_digests, build_digest, format_digest
+from src.lib.pdf_text import pdf_text, document_pdfs
+
+
+def partner_sources(with_pdfs: bool):
+    """{partner_id: [(title, text)]} from the knowledge base (and optionally local PDFs)."""
+    docs = (
+        supabase.table("knowledge_documents")
+        .select("title, storage_path, partner_id")
+        .eq("is_active", True)
+        .execute()
+    ).data or []
+    docs = [d for d in docs if d.get("partner_id")]
+    contents = knowledge_store.read_many(supabase, [d["storage_path"] for d in docs])
+
+    sources = {}
+    for doc in docs:
+        text = contents.get(doc["storage_path"])
+        if text:
+            sources.setdefault(str(doc["partner_id"]), []).append((doc["title"], text))
+
+    if with_pdfs:
+        partners_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "documents", "partners")
+        for path in document_pdfs(partners_dir):
+            partner_id = resolve_partner_id(os.path.splitext(os.path.basename(path))[0])
+            if partner_id:
+                sources.setdefault(str(partner_id), []).append((os.path.basename(path), clean_text(pdf_text.text(path), pdf=True)))
+    return sources
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build per-partner knowledge digests.")
+    parser.add_argument("--partner", help="only rebuild this partner (name or id)")
+    parser.add_argument("--with-pdfs", action="store_true", help="also digest partner PDFs from documents/partners")
+    parser.add_argument("--force", action="store_true", help="rebuild even when the sources did not change")
+    parser.add_argument("--dry-run", action="store_true", help="print the digests without publishing them")
+    args = parser.parse_args()
+
+    existing = dict(partner_digests.all(supabase))
+    sources = partner_sources(args.with_pdfs)
+    only = resolve_partner_id(args.partner) if args.partner else None
+    if args.partner and not only:
+        print(f"Parceiro '{args.partner}' não encontrado.")
+        return
+
+    digests, rebuilt = dict(existing), 0
+    for partner_id, docs in sorted(sources.items()):
+        if only and partner_id != str(only):
+            continue
+        partner = partner_directory.get(partner_id) or {}
+        name = partner.get("name") or docs[0][0]
+        text = "\n\n".join(f"=== {title} ===\n\n{body}" for title, body in docs)
+
+        digest = build_digest(partner_id, name, text)
+        previous = existing.get(partner_id)
+        if previous and previous.get("source_sha256") == digest["source_sha256"] and not args.force:
+            print(f"{name}: sem mudanças, resumo mantido.")
+            continue
+
+        digests[partner_id] = digest
+        rebuilt += 1
+        rendered = format_digest(digest)
+        print(f"{name}: {digest['source_chars']} → {len(rendered)} caracteres ({digest['source_chars'] / max(len(rendered), 1):.1f}x menor).")
+        if args.dry_run:
+            print(f"\n{rendered}\n")
+
+    # Partners without active documents anymore
+    for partner_id in set(digests) - set(sources):
+        if not only:
+            print(f"{digests[partner_id].get('partner_name')}: sem documentos ativos, resumo removido.")
+            del digests[partner_id]
+            rebuilt += 1
+
+    if args.dry_run or not rebuilt:
+        print(f"{rebuilt} resumos alterados{' (dry run, nada publicado)' if args.dry_run else ''}.")
+        return
+    partner_digests.save(supabase, digests)
+    print(f"{rebuilt} resumos alterados; {len(digests)} publicados.")
+
+
+if __name__ == "__main__":
+    main()
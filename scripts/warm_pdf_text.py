@@ -0,0 +1,28 @@
+"""
+Extracts the editais/partner PDFs under documents/ into the PDF text disk cache.
+
+Runs before the server (see Dockerfile), so parsing happens in a process
+pool owned by this small script instead of spawning workers that would
+re-import server.py. The server then reads the cached pages from disk.
+
+Usage:
+    python scripts/warm_pdf_text.py [--workers N]
+"""
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.lib.pdf_text import pdf_text, document_pdfs, MAX_WORKERS
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Warm the PDF text cache.")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS, help="extraction processes")
+    args = parser.parse_args()
+    pdf_text.warm(document_pdfs(), workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -42,6 +42,7 @@ from google.adk.runners import Runner
 from google.genai.types import Content, Part
 from src.agent.agent import agent, runner, session_service
 from src.agent.workflow import run_workflow
+from src.agent.memory.chat_summary import chat_summaries
 
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type, RetryError
 
@@ -53,6 +54,29 @@ async def on_startup():
     from src.db.engine import ensure_schema
     ensure_schema()
 
+    # Build the BM25 knowledge index in the background so the first routed question doesn't pay for it
+    from src.lib.knowledge_index import knowledge_index
+    asyncio.create_task(asyncio.to_thread(knowledge_index.refresh))
+
+    # Load the editais/partner PDFs up front so document tools never parse a PDF mid-request.
+    # scripts/warm_pdf_text.py extracts them in parallel before the server starts; this
+    # in-process pass only reads its disk cache (and parses whatever it missed).
+    from src.lib.pdf_text import pdf_text, document_pdfs
+    asyncio.create_task(asyncio.to_thread(pdf_text.warm, document_pdfs(), 1))
+
+    # Few-shot examples are ranked in memory; load them before the first agent step needs them
+    from src.agent.retrieval import example_index
+    from src.agent.agent import supabase_client
+    if supabase_client:
+        asyncio.create_task(asyncio.to_thread(example_index.refresh, supabase_client))
+
+    # Instructions and knowledge files are served from memory (hot-reloaded on change)
+    from src.lib.assets import assets
+    from src.agent.utils import INSTRUCTIONS_DIR
+    assets.directory(INSTRUCTIONS_DIR)
+    report = assets.report()
+    print(f"[Assets] {len(report['files'])} arquivos em memória ({report['total_chars']} chars, {report['total_load_ms']} ms de leitura).")
+
 # Instrument FastAPI
 FastAPIInstrumentor.instrument_app(app)
 # Instrument HTTPX (captures outgoing requests)
@@ -128,6 +152,7 @@ async def safe_save_message(app_name: str, session_id: str, user_id: str, chat_i
         user_content = Content(role="user", parts=[Part(text=chat_input)])
         agent_content = Content(role="model", parts=[Part(text=response_text)])
         current_session.insert_messages([user_content, agent_content])
+        chat_summaries.schedule_update(current_session.client, user_id, current_session.active_workflow)
     else:
         print("Warning: current_session does not support insert_messages")
 
@@ -137,6 +162,19 @@ from src import __version__ as agent_version
 async def get_version():
     return {"version": agent_version}
 
+@app.get("/stats")
+async def get_stats():
+    """Share of turns served without an LLM (UI fast path + scripted steps), second LLM calls avoided per phase, time to first token and answer cache hits."""
+    from src.agent.fast_path import fast_path_stats
+    from src.agent.workflow import response_call_stats, ttft_stats
+    from src.lib.answer_cache import answer_cache
+    return {
+        "fast_path": fast_path_stats.report(),
+        "response_agent": response_call_stats.report(),
+        "ttft": ttft_stats.report(),
+        "answer_cache": answer_cache.report(),
+    }
+
 @app.get("/")
 async def health_check():
     """Root endpoint for Cloud Run health checks."""
@@ -1,5 +1,6 @@
 # Configuração centralizada de modelos LLM para o Cloudinha Agent
 # Facilita manutenção e testes A/B de diferentes modelos
+import os
 
 # === MODELOS DE CHAT ===
 
@@ -29,3 +30,26 @@ MODEL_EMBEDDING = "models/text-embedding-004"
 
 RAG_MATCH_THRESHOLD = 0.3
 RAG_MATCH_COUNT = 5
+
+# Onde roda a busca vetorial do knowledgeSearchTool:
+#   "rpc"   -> RPC match_documents no Supabase (pgvector)
+#   "local" -> índice local em memória mapeada (src/lib/vector_index.py), sincronizado com a tabela documents
+RAG_VECTOR_BACKEND = os.getenv("RAG_VECTOR_BACKEND", "rpc")
+# Precisão do índice local: "float32" (exato) ou "int8" (4x menor, quantizado por linha)
+RAG_LOCAL_INDEX_DTYPE = os.getenv("RAG_LOCAL_INDEX_DTYPE", "float32")
+
+
+# === PESQUISA (smartResearchTool) ===
+
+# Orçamento de caracteres do contexto devolvido ao agente de raciocínio (~4 caracteres por token).
+# Documentos maiores que isso são reduzidos às seções mais relevantes para a pergunta.
+RESEARCH_CONTEXT_BUDGET_CHARS = 12000
+
+
+# === HISTÓRICO DA CONVERSA ===
+
+# Orçamento de caracteres do histórico injetado nos prompts (~4 caracteres por token):
+# o resumo acumulado da conversa (chat_summaries) mais as últimas mensagens literais que couberem.
+CHAT_HISTORY_BUDGET_CHARS = 4000
+# Modelo que atualiza o resumo em segundo plano após cada turno
+MODEL_CHAT_SUMMARY = MODEL_ROUTER
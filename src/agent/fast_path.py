@@ -0,0 +1,215 @@
+"""
+Deterministic fast path for known UI intents.
+
+Button presses from the frontend ("Vamos começar!", "É para mim", "Para outra
+pessoa", choosing a partner card) have a fixed outcome, so they don't need
+the Reasoning → Response pipeline. `classify_ui_intent` recognizes them by
+phase and exact label/pattern, with a confidence score. `try_fast_path` runs
+the tool directly and replies from a per-phase template. When confidence is
+low or the tool returns something unexpected, it returns None and the turn
+goes through the normal LLM pipeline.
+
+`fast_path_stats.report()` gives the share of turns served without an LLM.
+"""
+import asyncio
+import re
+import threading
+from typing import Any, Dict, Optional
+
+from src.lib.text_utils import fold
+from src.lib.partner_directory import partner_directory, is_uuid
+from src.lib.partner_cache import get_partner_application_config
+from src.tools.processDependentChoice import processDependentChoiceTool
+from src.tools.startStudentApplication import startStudentApplicationTool
+
+# Below this, the message goes through the LLM pipeline
+MIN_CONFIDENCE = 0.85
+
+_START_LABELS = {"vamos comecar", "vamos la", "comecar"}
+_SELF_LABELS = {"e para mim", "para mim", "pra mim", "e pra mim", "para mim mesmo", "para mim mesma", "eu mesmo", "eu mesma"}
+_DEPENDENT_LABELS = {"e para outra pessoa", "para outra pessoa", "pra outra pessoa", "e pra outra pessoa"}
+
+_UUID = r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}"
+_TARGET_RE = re.compile(rf"[\s,(]*target_user_id\s*[=:]\s*({_UUID})\)?", re.I)
+_PARTNER_ID_RE = re.compile(rf"[\s,(]*partner_id\s*[=:]\s*({_UUID})\)?", re.I)
+_CHOOSE_PARTNER_RE = re.compile(
+    r"^(?:quero|gostaria de|desejo|vou)\s+"
+    r"(?:me\s+inscrever|me\s+candidatar|me\s+aplicar|aplicar|iniciar\s+(?:a\s+|minha\s+)?(?:inscricao|aplicacao|candidatura))"
+    r"(?:\s+(?:no|na|em|ao|a|para\s+o|para\s+a|para|pro|pra))?"
+    r"(?:\s+(?:programa|bolsa\s+do|bolsa\s+da|parceiro))?\s+(?P<partner>[^?,;]{2,80})$"
+)
+
+TEMPLATES = {
+    "start_onboarding": (
+        "Perfeito, vamos lá! 😊 Preencha o formulário ao lado com os seus dados. "
+        "Se tiver dúvida em algum campo, é só me perguntar por aqui."
+    ),
+    "dependent_self": (
+        "Combinado, vamos buscar oportunidades para você! 🎯 "
+        "Os programas parceiros que combinam com o seu perfil estão aparecendo na tela. "
+        "Quer que eu te conte mais sobre algum deles?"
+    ),
+    "dependent_other": (
+        "Perfeito! Criei o perfil da pessoa que você vai inscrever. 📝 "
+        "Agora preencha os dados dela no formulário que abriu ao lado."
+    ),
+    "choose_partner": (
+        "Ótimo, sua inscrição em {partner} foi iniciada! 🎉 "
+        "O formulário já está aberto no painel ao lado{prefilled}. Se tiver dúvida em algum campo, é só me chamar."
+    ),
+}
+_PREFILLED_RE = re.compile(r"Campos pré-preenchidos automaticamente: (.+?)\.?$")
+
+
+def _normalize(text: str) -> str:
+    """Folded, single-spaced, without the trailing punctuation buttons carry ("Vamos começar!" -> "vamos comecar")."""
+    return " ".join(fold(text or "").split()).strip(" !.")
+
+
+def classify_ui_intent(phase: str, text: str) -> Optional[Dict[str, Any]]:
+    """{"intent", "confidence", "args"} for a known UI intent in this phase, or None."""
+    normalized = _normalize(text)
+    if not normalized:
+        return None
+
+    if phase == "ONBOARDING" and normalized in _START_LABELS:
+        return {"intent": "start_onboarding", "confidence": 1.0, "args": {}}
+
+    if phase == "ASK_DEPENDENT":
+        if normalized in _SELF_LABELS:
+            return {"intent": "dependent_self", "confidence": 1.0, "args": {"choice": "self"}}
+        if normalized in _DEPENDENT_LABELS:
+            return {"intent": "dependent_other", "confidence": 1.0, "args": {"choice": "dependent"}}
+
+    if phase in ("PROGRAM_MATCH", "CONCLUDED"):
+        target = _TARGET_RE.search(normalized)
+        explicit_partner = _PARTNER_ID_RE.search(normalized)
+        remainder = _PARTNER_ID_RE.sub("", _TARGET_RE.sub("", normalized)).strip()
+        match = _CHOOSE_PARTNER_RE.match(remainder)
+        if not match:
+            return None
+        partner_ref = explicit_partner.group(1) if explicit_partner else match.group("partner").strip()
+        resolution = partner_directory.resolve(partner_ref)
+        if not resolution["partner_id"]:
+            return None
+        confidence = 1.0 if is_uuid(partner_ref) else resolution["score"] * (0.5 if resolution["ambiguous"] else 1.0)
+        return {
+            "intent": "choose_partner",
+            "confidence": confidence,
+            "args": {
+                "partner_id": resolution["partner_id"],
+                "partner_name": resolution["name"],
+                "target_user_id": target.group(1) if target else None,
+            },
+        }
+    return None
+
+
+class FastPathStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.turns = 0
+        self.fast = 0
+        self.scripted = 0
+        self.by_intent: Dict[str, int] = {}
+
+    def record_turn(self):
+        with self._lock:
+            self.turns += 1
+
+    def record_fast(self, intent: str):
+        with self._lock:
+            self.fast += 1
+            self.by_intent[intent] = self.by_intent.get(intent, 0) + 1
+
+    def record_scripted(self):
+        with self._lock:
+            self.scripted += 1
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            without_llm = self.fast + self.scripted
+            return {
+                "turns": self.turns,
+                "fast_path": self.fast,
+                "scripted": self.scripted,
+                "no_llm_share": round(without_llm / self.turns, 3) if self.turns else 0.0,
+                "by_intent": dict(self.by_intent),
+            }
+
+
+fast_path_stats = FastPathStats()
+
+
+async def try_fast_path(user_id: str, phase: str, text: str) -> Optional[Dict[str, Any]]:
+    """
+    Serves a known UI intent without the LLM: runs its tool and returns
+    {"intent", "tool", "args", "tool_output", "reply"}, or None to fall back to the pipeline.
+    """
+    intent = await asyncio.to_thread(classify_ui_intent, phase, text)  # partner names resolve against the directory
+    if not intent or intent["confidence"] < MIN_CONFIDENCE:
+        return None
+    name, args = intent["intent"], intent["args"]
+
+    if name == "start_onboarding":
+        return {"intent": name, "tool": None, "args": {}, "tool_output": None, "reply": TEMPLATES[name]}
+
+    if name in ("dependent_self", "dependent_other"):
+        result = await asyncio.to_thread(processDependentChoiceTool, user_id, args["choice"])
+        reply = template_reply("processDependentChoiceTool", args, result)
+        if not reply:
+            return None
+        return {"intent": name, "tool": "processDependentChoiceTool", "args": args, "tool_output": result, "reply": reply}
+
+    if name == "choose_partner":
+        # External sign-ups need the partner's own message and link: leave them to the LLM
+        config = await asyncio.to_thread(get_partner_application_config, args["partner_id"])
+        if not config or config.get("external_redirect_config"):
+            return None
+        tool_args = {"user_id": user_id, "partner_id": args["partner_id"]}
+        if args.get("target_user_id"):
+            tool_args["target_user_id"] = args["target_user_id"]
+        result = await asyncio.to_thread(startStudentApplicationTool, **tool_args)
+        reply = template_reply("startStudentApplicationTool", tool_args, result, partner_name=args["partner_name"])
+        if not reply:
+            return None
+        return {"intent": name, "tool": "startStudentApplicationTool", "args": tool_args, "tool_output": result, "reply": reply}
+
+    return None
+
+
+def template_reply(tool: str, params: Dict[str, Any], result: Any, partner_name: str = None) -> Optional[str]:
+    """
+    Student-facing reply for a workflow tool outcome that needs no wording
+    from the LLM (dependent choice made, application started), or None.
+    Shared by the fast path and by the pipeline after the reasoning step.
+    """
+    if tool == "processDependentChoiceTool":
+        if not isinstance(result, dict) or result.get("status") != "success":
+            return None
+        return TEMPLATES["dependent_other" if result.get("isdependent") else "dependent_self"]
+
+    if tool == "startStudentApplicationTool":
+        result = str(result or "")
+        if result.startswith("Aplicação iniciada com sucesso"):
+            prefilled = _PREFILLED_RE.search(result)
+            prefilled = prefilled.group(1) if prefilled and prefilled.group(1) != "nenhum" else None
+            return TEMPLATES["choose_partner"].format(
+                partner=partner_name or _partner_name(params.get("partner_id")),
+                prefilled=f" e já preenchi para você: {prefilled}" if prefilled else "",
+            )
+        if result.startswith("Você já"):
+            return result  # existing application: the tool's message is already written for the student
+    return None
+
+
+def _partner_name(partner_ref: str) -> str:
+    if not partner_ref:
+        return "o programa"
+    try:
+        if is_uuid(partner_ref):
+            return (partner_directory.get(partner_ref) or {}).get("name") or "o programa"
+        return partner_directory.resolve(partner_ref)["name"] or partner_ref
+    except Exception as e:
+        print(f"[FastPath] Diretório de parceiros indisponível: {e}")
+        return "o programa" if is_uuid(partner_ref) else partner_ref
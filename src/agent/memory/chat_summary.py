@@ -0,0 +1,224 @@
+"""
+Rolling conversation summaries per user/workflow (table `chat_summaries`).
+
+Prompts used to carry up to 20 raw messages, and long Cloudinha answers made
+the history the largest variable part of every reasoning/response prompt.
+Now they carry the summary of the older conversation plus the most recent
+messages, verbatim, that fit in CHAT_HISTORY_BUDGET_CHARS.
+
+After each turn, `chat_summaries.schedule_update` runs in the background.
+Once at least SUMMARIZE_BATCH messages have fallen out of the verbatim window,
+a lightweight model folds them into the summary. The summary is upserted
+together with `summarized_until` (the created_at of the last folded message),
+so messages are never summarized twice.
+"""
+import asyncio
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from google.adk.agents import LlmAgent
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai.types import Content, Part
+
+from src.agent.config import CHAT_HISTORY_BUDGET_CHARS, MODEL_CHAT_SUMMARY
+
+# Most recent messages never folded into the summary
+VERBATIM_MESSAGES = 6
+# Fold older messages into the summary once this many are pending
+SUMMARIZE_BATCH = 4
+SUMMARY_MAX_CHARS = 1200
+# Below this, a message that doesn't fit the budget is dropped instead of truncated
+MIN_MESSAGE_CHARS = 200
+CACHE_TTL_SECONDS = 300
+FETCH_LIMIT = 60
+
+SUMMARY_INSTRUCTION = f"""Você resume conversas entre um estudante e a Cloudinha, assistente educacional da Nubo Hub.
+Você recebe o RESUMO ATUAL (pode estar vazio) e NOVAS MENSAGENS. Devolva apenas o resumo atualizado, em português,
+com no máximo {SUMMARY_MAX_CHARS} caracteres, em tópicos curtos:
+- fatos sobre o estudante ou o dependente mencionados na conversa;
+- programas, parceiros e cursos de interesse;
+- dúvidas já respondidas (só o essencial da resposta) e decisões tomadas;
+- pendências ou perguntas em aberto.
+Não invente informações e não inclua saudações nem texto fora do resumo."""
+
+summary_agent = LlmAgent(
+    model=MODEL_CHAT_SUMMARY,
+    name="chat_summary_agent",
+    description="Atualiza o resumo acumulado da conversa.",
+    instruction=SUMMARY_INSTRUCTION,
+    tools=[],
+)
+
+
+def message_line(record: Dict[str, Any]) -> str:
+    role_label = "Usuário" if record.get("sender") == "user" else "Cloudinha"
+    return f"{role_label}: {record.get('content') or ''}"
+
+
+def build_history_context(
+    summary: Optional[Dict[str, Any]],
+    records: List[Dict[str, Any]],
+    budget_chars: int = CHAT_HISTORY_BUDGET_CHARS,
+) -> Tuple[str, List[str]]:
+    """
+    History block for the prompts and the verbatim lines it contains.
+    Messages already folded into the summary are skipped. Every other message
+    (including older ones still waiting to be folded) is taken newest first
+    while it fits the budget left by the summary; the oldest one that doesn't
+    fit is truncated, so nothing between the summary and the tail is lost
+    while there is room for it.
+    """
+    summary_text = ((summary or {}).get("summary") or "").strip()
+    summarized_until = (summary or {}).get("summarized_until")
+    header = f"\nRESUMO DA CONVERSA ATÉ AQUI:\n{summary_text}\n" if summary_text else ""
+
+    recent = [r for r in records if r.get("content") and not _covered(r, summarized_until)]
+    remaining = budget_chars - len(header)
+    lines: List[str] = []
+    for record in reversed(recent):
+        line = message_line(record)
+        if len(line) > remaining:
+            if remaining >= MIN_MESSAGE_CHARS:
+                lines.append(line[: remaining - 1].rstrip() + "…")
+            break
+        lines.append(line)
+        remaining -= len(line) + 1
+    lines.reverse()
+
+    context = header
+    if lines:
+        context += "\nHISTÓRICO DA CONVERSA (últimas mensagens):\n" + "\n".join(lines) + "\n---\n"
+    return context, lines
+
+
+def _covered(record: Dict[str, Any], summarized_until: Optional[str]) -> bool:
+    created_at = record.get("created_at")
+    return bool(summarized_until and created_at and _parse(created_at) <= _parse(summarized_until))
+
+
+def _parse(value: str) -> datetime:
+    parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _before_boundary(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Records older than the verbatim window, cut at a created_at boundary:
+    rows sharing a timestamp with the first verbatim one stay out, since the
+    summarized_until cursor can't tell them apart afterwards.
+    """
+    older = records[:-VERBATIM_MESSAGES]
+    if not older:
+        return []
+    boundary = _parse(records[-VERBATIM_MESSAGES]["created_at"])
+    while older and _parse(older[-1]["created_at"]) >= boundary:
+        older.pop()
+    return older
+
+
+async def _summarize_with_llm(previous: str, lines: List[str]) -> Optional[str]:
+    text = f"RESUMO ATUAL:\n{previous or '(vazio)'}\n\nNOVAS MENSAGENS:\n" + "\n".join(lines)
+    session_service = InMemorySessionService()
+    await session_service.create_session(app_name="chat_summary", session_id="summary", user_id="summary")
+    runner = Runner(agent=summary_agent, app_name="chat_summary", session_service=session_service)
+    output = ""
+    async for event in runner.run_async(user_id="summary", session_id="summary", new_message=Content(role="user", parts=[Part(text=text)])):
+        if getattr(event, "content", None) and event.content.parts:
+            output += "".join(p.text for p in event.content.parts if getattr(p, "text", None))
+    return output.strip() or None
+
+
+class ChatSummaries:
+    def __init__(self, summarize_fn: Callable = None):
+        self._summarize = summarize_fn or _summarize_with_llm
+        self._cache: Dict[Tuple[str, str], Dict[str, Any]] = {}  # (user_id, workflow) -> {"row", "at"}
+        self._lock = threading.Lock()
+        self._inflight = set()
+        self._tasks = set()  # background updates, referenced until done
+        self.stats = {"updates": 0, "folded_messages": 0, "errors": 0}
+
+    def get(self, client, user_id: str, workflow: str) -> Optional[Dict[str, Any]]:
+        """The stored summary row ({"summary", "summarized_until", ...}) or None."""
+        key = (user_id, workflow)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached and time.time() - cached["at"] < CACHE_TTL_SECONDS:
+                return cached["row"]
+        try:
+            res = client.table("chat_summaries") \
+                .select("summary, summarized_until, message_count") \
+                .eq("user_id", user_id) \
+                .eq("workflow", workflow) \
+                .limit(1) \
+                .execute()
+            row = res.data[0] if res and res.data else None
+        except Exception as e:
+            print(f"[ChatSummary] Erro ao ler resumo: {e}")
+            return cached["row"] if cached else None
+        self._remember(key, row)
+        return row
+
+    def schedule_update(self, client, user_id: str, workflow: Optional[str]):
+        """Folds older messages into the summary in the background (one update per user/workflow at a time)."""
+        if not client or not user_id or not workflow:
+            return
+        key = (user_id, workflow)
+        if key in self._inflight:
+            return
+        self._inflight.add(key)
+        task = asyncio.create_task(self.update(client, user_id, workflow))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        task.add_done_callback(lambda _: self._inflight.discard(key))
+
+    async def update(self, client, user_id: str, workflow: str) -> bool:
+        try:
+            row = await asyncio.to_thread(self.get, client, user_id, workflow)
+            since = (row or {}).get("summarized_until")
+            records = await asyncio.to_thread(self._fetch_since, client, user_id, workflow, since)
+            pending = [r for r in _before_boundary(records) if r.get("content")]
+            if len(pending) < SUMMARIZE_BATCH:
+                return False
+
+            summary = await self._summarize((row or {}).get("summary") or "", [message_line(r) for r in pending])
+            if not summary:
+                return False
+            new_row = {
+                "user_id": user_id,
+                "workflow": workflow,
+                "summary": summary[:SUMMARY_MAX_CHARS],
+                "summarized_until": pending[-1]["created_at"],
+                "message_count": ((row or {}).get("message_count") or 0) + len(pending),
+                "updated_at": datetime.now(timezone.utc).isoformat(),
+            }
+            await asyncio.to_thread(
+                lambda: client.table("chat_summaries").upsert(new_row, on_conflict="user_id,workflow").execute()
+            )
+            self._remember((user_id, workflow), new_row)
+            self.stats["updates"] += 1
+            self.stats["folded_messages"] += len(pending)
+            print(f"[ChatSummary] Resumo de {user_id}/{workflow} atualizado: +{len(pending)} mensagens ({len(new_row['summary'])} caracteres).")
+            return True
+        except Exception as e:
+            self.stats["errors"] += 1
+            print(f"[ChatSummary] Falha ao atualizar resumo de {user_id}/{workflow}: {e}")
+            return False
+
+    def _fetch_since(self, client, user_id: str, workflow: str, since: Optional[str]) -> List[Dict[str, Any]]:
+        query = client.table("chat_messages") \
+            .select("sender, content, created_at") \
+            .eq("user_id", user_id) \
+            .eq("workflow", workflow)
+        if since:
+            query = query.gt("created_at", since)
+        return query.order("created_at").limit(FETCH_LIMIT).execute().data or []
+
+    def _remember(self, key: Tuple[str, str], row: Optional[Dict[str, Any]]):
+        with self._lock:
+            self._cache[key] = {"row": row, "at": time.time()}
+
+
+chat_summaries = ChatSummaries()
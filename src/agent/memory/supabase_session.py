@@ -66,8 +66,8 @@ class SupabaseSession(Session):
             print(f"Error loading session from Supabase: {e}")
             return []
 
-    def load_for_workflow(self, workflow_name: str, limit: int = 20) -> List[Content]:
-        """Loads messages filtered by a specific workflow."""
+    def load_records_for_workflow(self, workflow_name: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """Raw chat_messages rows of a workflow (sender, content, created_at), oldest first."""
         if not self.client:
              return []
         try:
@@ -79,25 +79,26 @@ class SupabaseSession(Session):
                 .limit(limit)
                 
             response = query.execute()
-            
-            messages = []
             data = response.data[::-1] if response.data else []
             
             print(f"[SupabaseSession] load_for_workflow('{workflow_name}') fetched {len(data)} messages")
-
-            for record in data:
-                role = "user" if record["sender"] == "user" else "model"
-                content = Content(
-                    role=role,
-                    parts=[Part(text=record["content"])]
-                )
-                messages.append(content)
-            
-            return messages
+            return data
         except Exception as e:
             print(f"Error loading workflow messages from Supabase: {e}")
             return []
 
+    def load_for_workflow(self, workflow_name: str, limit: int = 20) -> List[Content]:
+        """Loads messages filtered by a specific workflow."""
+        messages = []
+        for record in self.load_records_for_workflow(workflow_name, limit):
+            role = "user" if record["sender"] == "user" else "model"
+            content = Content(
+                role=role,
+                parts=[Part(text=record["content"])]
+            )
+            messages.append(content)
+        return messages
+
     def save(self, messages: List[Content]):
         """Saves new messages to Supabase."""
         if not self.client:
@@ -182,6 +183,7 @@ class SupabaseSession(Session):
         if formatted_records:
             try:
                 self.client.table("chat_messages").insert(formatted_records).execute()
+                self.active_workflow = active_wf  # lets the caller refresh this workflow's summary
                 # Update local cache just in case
                 self._messages.extend(messages)
                 print(f"[SupabaseSession] Successfully inserted {len(formatted_records)} messages.")
@@ -5,9 +5,28 @@ ReasoningOutput is the structured contract between the Reasoning Agent and the R
 It uses a generic tools_called[] array so new tools don't require contract changes.
 """
 
+import json
+
 from pydantic import BaseModel, Field
 from typing import List, Optional, Any
 
+# Longest string kept per tool result field in the response agent's prompt
+RESULT_CHARS = 6000
+# Tools whose results are already cut to their own budget (RESEARCH_CONTEXT_BUDGET_CHARS) and pass whole
+UNCAPPED_TOOLS = ("smartResearchTool",)
+
+
+def _prune(value: Any, max_chars: Optional[int] = RESULT_CHARS) -> Any:
+    """Drops empty values and caps long strings (unless max_chars is None), recursively."""
+    if isinstance(value, dict):
+        pruned = {k: _prune(v, max_chars) for k, v in value.items()}
+        return {k: v for k, v in pruned.items() if v not in (None, "", [], {})}
+    if isinstance(value, (list, tuple)):
+        return [_prune(v, max_chars) for v in value if v not in (None, "", [], {})]
+    if isinstance(value, str) and max_chars is not None and len(value) > max_chars:
+        return value[:max_chars] + "… [truncado]"
+    return value
+
 
 class ToolCall(BaseModel):
     """A single tool call made by the Reasoning Agent."""
@@ -51,6 +70,30 @@ class ReasoningOutput(BaseModel):
         description="All tool calls made, in execution order. Generic schema for extensibility."
     )
 
+    def compact(self, exclude_tools: tuple = (), max_chars: int = RESULT_CHARS) -> str:
+        """
+        Compact JSON for the Response Agent: intention, notes, context and the
+        results of the tool calls (minus `exclude_tools`), without empty fields.
+        Results of UNCAPPED_TOOLS are never truncated.
+        """
+        payload = {
+            "intencao": self.user_intention,
+            "notas_do_raciocinio": self.reasoning,
+            "contexto": self.context_used,
+            "ferramentas": [
+                {
+                    "tool": call.tool,
+                    "params": call.params,
+                    "ok": call.success,
+                    "erro": call.error,
+                    "resultado": _prune(call.result, None if call.tool in UNCAPPED_TOOLS else max_chars),
+                }
+                for call in self.tools_called
+                if call.tool not in exclude_tools
+            ],
+        }
+        return json.dumps(_prune(payload, None), ensure_ascii=False, separators=(",", ":"), default=str)
+
     @classmethod
     def fallback(cls, user_message: str, error: str = "") -> "ReasoningOutput":
         """Creates a minimal fallback output when reasoning fails after retries."""
@@ -1,6 +1,8 @@
+import hashlib
 import logging
-import os
-# We need to access supabase client. 
+import threading
+import time
+# We need to access supabase client.
 # Ideally we import from src.agent.agent but circular imports could be an issue if agent.py imports workflow which imports retrieval.
 # However, agent.py imports simple tools. workflow imports agent.
 # So retrieval importing agent might be circular if agent imports workflow?
@@ -8,51 +10,121 @@ import os
 # So 'retrieval.py' importing 'agent.py' is SAFE.
 
 from src.agent.agent import supabase_client
+from src.lib.bm25 import BM25Index
 
 logger = logging.getLogger(__name__)
 
+MAX_EXAMPLES = 3
+# How often the active examples are re-read; changes are picked up in the background
+REFRESH_SECONDS = 120
+# After a failed read, try again this soon instead of waiting a full REFRESH_SECONDS
+RETRY_SECONDS = 15
+
+
+class ExampleIndex:
+    """
+    Active `learning_examples` kept in memory, with a BM25 index over their
+    input queries. The table is re-read every REFRESH_SECONDS in a background
+    thread (the stale index keeps serving meanwhile) and the index is rebuilt
+    only when the rows changed.
+    """
+
+    def __init__(self, refresh_seconds: float = REFRESH_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self._bm25 = BM25Index()
+        self._examples = {}  # id -> row, in created_at desc order
+        self._signature = None
+        self._loaded_at = 0.0
+        self._refreshing = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._examples)
+
+    def refresh(self, client, force: bool = False):
+        """Re-reads the active examples (synchronously) and rebuilds the index if they changed."""
+        if not force and time.time() - self._loaded_at < self.refresh_seconds:
+            return
+        with self._refreshing:
+            if not force and time.time() - self._loaded_at < self.refresh_seconds:
+                return
+            try:
+                rows = (
+                    client.table("learning_examples").select("*").eq("is_active", True)
+                    .order("created_at", desc=True).execute()
+                ).data or []
+                self._load(rows)
+            except Exception as e:
+                logger.error(f"Error refreshing learning examples: {e}")
+                self._loaded_at = time.time() - self.refresh_seconds + min(RETRY_SECONDS, self.refresh_seconds)
+                return
+            self._loaded_at = time.time()
+
+    def _load(self, rows):
+        signature = hashlib.sha1(repr([sorted(row.items()) for row in rows]).encode("utf-8")).hexdigest()
+        if signature == self._signature:
+            return
+        bm25, examples = BM25Index(), {}
+        for position, row in enumerate(rows):
+            example_id = row.get("id", position)
+            examples[example_id] = row
+            bm25.add(example_id, row.get("input_query") or "", meta=row.get("intent_category"))
+        self._bm25, self._examples, self._signature = bm25, examples, signature
+        print(f"[Retrieval] {len(examples)} exemplos de aprendizado indexados.")
+
+    def _ensure_fresh(self, client):
+        if not self._loaded_at:
+            self.refresh(client)  # first use: nothing to serve yet
+        elif time.time() - self._loaded_at >= self.refresh_seconds and not self._refreshing.locked():
+            threading.Thread(target=self.refresh, args=(client,), daemon=True, name="learning-examples").start()
+
+    def search(self, client, query: str, intent_category: str = None, k: int = MAX_EXAMPLES) -> list:
+        """Top-k examples most similar to `query`; completed with the most recent ones of the category."""
+        self._ensure_fresh(client)
+        bm25, examples = self._bm25, self._examples
+        matches_category = (lambda category: category == intent_category) if intent_category else None
+
+        chosen = [hit["id"] for hit in bm25.search(query or "", k=k, where=matches_category)]
+        for example_id, row in examples.items():
+            if len(chosen) >= k:
+                break
+            if example_id not in chosen and (not intent_category or row.get("intent_category") == intent_category):
+                chosen.append(example_id)
+        return [examples[example_id] for example_id in chosen]
+
+
+example_index = ExampleIndex()
+
+
 def retrieve_similar_examples(query: str, intent_category: str = None) -> str:
     """
     Retrieves few-shot examples from the 'learning_examples' table.
-    Currently uses basic filtering by intent_category.
-    Future: Vector search using embeddings.
+    Examples of the intent_category are ranked by BM25 similarity between
+    their input_query and the user message (in memory, see ExampleIndex).
     """
     if not supabase_client:
         logger.warning("Supabase client not initialized, skipping retrieval.")
         return ""
-    
+
     try:
-        # Build query
-        db_query = supabase_client.table("learning_examples").select("*").eq("is_active", True)
-        
-        if intent_category:
-            # Map agent names to categories if needed, or assume 1:1
-            # categories in DB: 'sisu_dates', 'match_logic', 'general_qa', etc.
-            # We can try to match loosely or fetch generic ones if category doesn't match
-            # For now, let's assume intent_category passed IS the category column value
-            # or we sort of 'ilike' it.
-            # Let's do a direct match for now.
-            db_query = db_query.eq("intent_category", intent_category)
-        
-        # Limit to 3 recent examples
-        response = db_query.order("created_at", desc=True).limit(3).execute()
-        examples = response.data
-        
+        # categories in DB: 'sisu_dates', 'match_logic', 'general_qa', etc.
+        # intent_category is matched exactly against the intent_category column.
+        examples = example_index.search(supabase_client, query, intent_category)
+
         if not examples:
             return ""
-            
+
         formatted = []
         for ex in examples:
             q = ex.get('input_query', '').replace('\n', ' ')
             a = ex.get('ideal_output', '').replace('\n', ' ')
             r = ex.get('reasoning', '')
             formatted.append(f"- Exemplo: {q}\n  Resposta Ideal: {a}\n  Motivo: {r}")
-            
+
         block = (
     "\n\n### EXEMPLOS DE TOM E ESTILO (APRENDIZADO)\n"
     "Os exemplos abaixo mostram o tom e a qualidade esperada da RESPOSTA FINAL ao usuário. "
     "ATENÇÃO: Para gerar respostas como estas, você DEVE OBRIGATORIAMENTE usar as ferramentas (Tools) disponíveis primeiro. "
-    "Não tente gerar o texto diretamente sem antes consultar a ferramenta.\n\n" 
+    "Não tente gerar o texto diretamente sem antes consultar a ferramenta.\n\n"
     + "\n\n".join(formatted)
 )
         return block
@@ -1,15 +1,17 @@
 import os
+from src.lib.assets import assets
+
+INSTRUCTIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "util")
 
 def load_instruction_from_file(filename):
     """
     Loads instruction text from a file located in the 'util' subdirectory.
+    Served by the shared asset manager, so repeated loads come from memory.
     """
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    file_path = os.path.join(current_dir, "util", filename)
+    file_path = os.path.join(INSTRUCTIONS_DIR, filename)
     
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            return f.read()
+        return assets.require(file_path)
     except FileNotFoundError:
         raise FileNotFoundError(f"Instruction file not found at: {file_path}")
     except Exception as e:
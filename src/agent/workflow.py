@@ -2,15 +2,26 @@ from typing import AsyncGenerator, Any, Dict, Optional
 import asyncio
 import httpx
 import json
+import threading
+import time
+from collections import deque
 from google.adk.runners import Runner
 from google.adk.agents import LlmAgent, Agent
+from google.adk.agents.run_config import RunConfig, StreamingMode
 from google.genai.types import Content, Part
 from google.adk.sessions import InMemorySessionService
 from src.lib.resilience import retry_with_backoff
 from tenacity import RetryError
 from src.agent.agent import session_service, root_agent, sisu_agent, prouni_agent
+from src.agent.memory.chat_summary import chat_summaries, build_history_context
 from src.agent.router_agent import execute_router_agent
 from src.agent.retrieval import retrieve_similar_examples
+from src.agent.fast_path import try_fast_path, fast_path_stats, template_reply
+from src.agent.reasoning_models import ReasoningOutput, ToolCall
+from src.agent.passport_workflow import DIRECT_REPLY_MARKER
+from src.lib.answer_cache import answer_cache, mentions
+from src.lib.tool_memo import tool_turn
+from src.lib.text_utils import tokenize, fold, NAME_STOP_WORDS
 from src.tools.getStudentProfile import getStudentProfileTool
 from src.tools.updateStudentProfile import updateStudentProfileTool
 import logging
@@ -66,18 +77,16 @@ root_workflow = SingleAgentWorkflow(root_agent, "root_workflow")
 
 # --- Knowledge Base Paths (injected into reasoning/concluded agents) ---
 import os
+from src.lib.assets import assets
 _DOCS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "documents")
 _PASSPORT_DOC_PATH = os.path.join(_DOCS_DIR, "passei_workflow_doc.md")
 _GENERAL_KNOWLEDGE_PATH = os.path.join(_DOCS_DIR, "partners", "Base de conhecimento geral.md")
 
-# Cache to avoid re-reading files on every turn
-_knowledge_cache = {}
-
 def _load_knowledge_context() -> str:
-    """Pre-loads knowledge base content and returns formatted context string."""
-    if "content" in _knowledge_cache:
-        return _knowledge_cache["content"]
-    
+    """Knowledge context for the agents; rebuilt only when the knowledge file changes on disk."""
+    return assets.derived("workflow_knowledge_context", [_GENERAL_KNOWLEDGE_PATH], _build_knowledge_context)
+
+def _build_knowledge_context() -> str:
     print(f"[Workflow] Loading knowledge base files...")
     
     sections = []
@@ -114,8 +123,7 @@ São iniciativas de organizações da sociedade civil que ampliam oportunidades
     
     if os.path.exists(_GENERAL_KNOWLEDGE_PATH):
         try:
-            with open(_GENERAL_KNOWLEDGE_PATH, "r", encoding="utf-8") as f:
-                content = f.read()
+            content = assets.text(_GENERAL_KNOWLEDGE_PATH) or ""
             if content.strip():
                 sections.append(f"=== BASE DE CONHECIMENTO DETALHADA SOBRE PROGRAMAS EDUCACIONAIS ===\n{content}")
                 print(f"[Workflow] ✅ Loaded Base de conhecimento geral.md ({len(content)} chars)")
@@ -126,8 +134,6 @@ São iniciativas de organizações da sociedade civil que ampliam oportunidades
     
     result = "\nBASE DE CONHECIMENTO — USE ESTAS INFORMAÇÕES PARA RESPONDER PERGUNTAS DO ESTUDANTE:\n" + "\n\n".join(sections) + "\n--- FIM DA BASE DE CONHECIMENTO ---\n"
     print(f"[Workflow] ✅ Knowledge context ready ({len(result)} chars total)")
-    
-    _knowledge_cache["content"] = result
     return result
 
 class SimpleTextEvent:
@@ -166,8 +172,9 @@ async def _run_reasoning_agent(
     message: Content,
     default_context: str,
     knowledge_context: str,
+    context_used: Optional[Dict[str, Any]] = None,
 ) -> str:
-    """Runs the Reasoning Agent and returns its raw text output."""
+    """Runs the Reasoning Agent; yields tool events, its raw text and the structured ReasoningOutput."""
     
     enriched_instruction = (
         f"USER_ID_CONTEXT: {user_id}\n\n"
@@ -196,6 +203,7 @@ async def _run_reasoning_agent(
     
     captured = ""
     last_tool_args = {}  # Track args from tool_start to pair with tool_end
+    tools_called = []
     async for event in runner.run_async(user_id=user_id, session_id=session_id, new_message=message):
         if hasattr(event, 'text') and event.text:
             captured += event.text
@@ -219,6 +227,15 @@ async def _run_reasoning_agent(
                     yield {"type": "tool_end", "tool": tool_name, "output": json.dumps(resp_dict, ensure_ascii=False)}
                     
                     tool_args = last_tool_args.pop(tool_name, None)
+                    failed = resp_dict.get("success") is False
+                    tools_called.append(ToolCall(
+                        tool=tool_name,
+                        params=tool_args or {},
+                        # String results come wrapped as {"result": ...} by ADK
+                        result=resp_dict["result"] if set(resp_dict) == {"result"} else resp_dict,
+                        success=not failed,
+                        error=str(resp_dict.get("error", "Unknown tool error")) if failed else None,
+                    ))
                     
                     # Check for explicit failure flag
                     if resp_dict.get("success") is False:
@@ -243,27 +260,258 @@ async def _run_reasoning_agent(
                             error_type="tool_empty_result"
                         )
                         
-    # Yield the final accumulated reasoning text
+    # Yield the final accumulated reasoning text and the structured contract built from the tool calls
     yield {"type": "final_text", "text": captured}
+    user_message = message.parts[0].text if message.parts else ""
+    yield {"type": "final_output", "output": ReasoningOutput(
+        user_message=user_message or "",
+        user_intention=_infer_intention(tools_called),
+        intention_confidence="high" if tools_called else "medium",
+        reasoning=captured.strip(),
+        context_used=context_used or {},
+        tools_called=tools_called,
+    )}
+
+
+# First matching tool decides the intention recorded in ReasoningOutput
+_TOOL_INTENTIONS = [
+    ("startStudentApplicationTool", "workflow_action"),
+    ("processDependentChoiceTool", "workflow_response"),
+    ("rewindWorkflowStatusTool", "workflow_action"),
+    ("getPartnerFormsTool", "question_about_form_field"),
+    ("getImportantDatesTool", "question_about_dates"),
+    ("getEligibilityResultsTool", "question_about_eligibility"),
+    ("smartResearchTool", "question_about_programs_general"),
+]
+
+
+def _infer_intention(tools_called: list) -> str:
+    names = {call.tool for call in tools_called}
+    for tool, intention in _TOOL_INTENTIONS:
+        if tool in names:
+            return intention
+    return "unknown"
+
+
+# Tools whose output needs no LLM wording; knowledge tools mean the student also asked something
+_KNOWLEDGE_TOOLS = {"smartResearchTool", "getImportantDatesTool", "getPartnerFormsTool"}
+
+
+def _templated_reply(output: ReasoningOutput) -> Optional[str]:
+    """Reply for fully templated outcomes (application started, dependent choice made), or None."""
+    if any(call.tool in _KNOWLEDGE_TOOLS for call in output.tools_called):
+        return None
+    for call in reversed(output.tools_called):
+        if call.success:
+            reply = template_reply(call.tool, call.params, call.result)
+            if reply:
+                return reply
+    return None
+
+
+def _direct_reply(output: ReasoningOutput) -> Optional[str]:
+    """The reasoning agent's own in-persona answer for tool-free turns (greetings, thanks, clarifications), or None."""
+    if output.tools_called:
+        return None
+    reasoning = (output.reasoning or "").lstrip()
+    # Only a report that starts with the marker is a reply; one that merely mentions it is not
+    if not reasoning.startswith(DIRECT_REPLY_MARKER):
+        return None
+    reply = reasoning[len(DIRECT_REPLY_MARKER):].strip().strip('"').strip()
+    return reply or None
+
+
+class ResponseCallStats:
+    """Per phase: pipeline turns and how many skipped the Response Agent (second LLM call)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.by_phase: Dict[str, Dict[str, int]] = {}
+
+    def record(self, phase: Optional[str], mode: str):
+        """mode: "response_agent", "direct" (tool-free reasoning answer), "templated" or "cached" (answer cache, no LLM call)."""
+        with self._lock:
+            counts = self.by_phase.setdefault(phase or "UNKNOWN", {"turns": 0, "response_agent": 0, "direct": 0, "templated": 0, "cached": 0})
+            counts["turns"] += 1
+            counts[mode] += 1
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            report = {}
+            for phase, counts in self.by_phase.items():
+                avoided = counts["direct"] + counts["templated"] + counts["cached"]
+                report[phase] = {
+                    **counts,
+                    "avoided_second_calls": avoided,
+                    "avoided_share": round(avoided / counts["turns"], 3) if counts["turns"] else 0.0,
+                }
+            return report
+
+
+response_call_stats = ResponseCallStats()
+
+
+# Only knowledge-base research is reusable across students: profile, eligibility,
+# forms and dates (not covered by the knowledge version) are never cached
+_CACHEABLE_TOOLS = {"smartResearchTool"}
+_WEB_SOURCE = "FONTE: PESQUISA NA WEB"
+
+
+def _answer_cache_terms(output: ReasoningOutput) -> Optional[list]:
+    """
+    Program/partner terms a turn was researched for, when its answer can be
+    reused for other students; None otherwise (other tools, failed calls,
+    web results, no program/partner scope, or a question that relies on the
+    conversation for its scope).
+    """
+    calls = output.tools_called
+    if not calls or any(call.tool not in _CACHEABLE_TOOLS or not call.success for call in calls):
+        return None
+
+    terms = []
+    for call in calls:
+        if _WEB_SOURCE in str(call.result):
+            return None
+        program = call.params.get("program")
+        if program in ("prouni", "sisu"):
+            terms.append(program)
+        terms.extend(tokenize(call.params.get("partner_name") or "", NAME_STOP_WORDS))
+    terms = sorted(set(terms))
+    if not terms or not mentions(output.user_message, terms):
+        return None
+    return terms
+
+
+def _impersonal(output: ReasoningOutput, phase: Optional[str]) -> ReasoningOutput:
+    """The report without profile, dependent, history or reasoning notes, so the answer can be shared."""
+    return output.model_copy(update={"reasoning": "", "context_used": {"passport_phase": phase} if phase else {}})
+
+
+# Background cache writes, referenced until done
+_cache_tasks = set()
+
+
+def _cache_answer(phase: str, question: str, answer: str, terms: list):
+    async def store():
+        try:
+            if await answer_cache.store(phase, question, answer, terms):
+                print(f"[RunWorkflow] 🗄️ Resposta guardada no cache (fase={phase}, termos={terms}).")
+        except Exception as e:
+            print(f"[RunWorkflow] Falha ao guardar resposta no cache: {e}")
+
+    task = asyncio.create_task(store())
+    _cache_tasks.add(task)
+    task.add_done_callback(_cache_tasks.discard)
+
+
+# Student-facing agents (response, concluded) stream token deltas instead of whole model turns
+STREAMING_RUN_CONFIG = RunConfig(streaming_mode=StreamingMode.SSE)
+TTFT_SAMPLES = 500
+
+
+class TTFTStats:
+    """Time from the start of the turn to the first streamed text delta, per agent (last TTFT_SAMPLES turns)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._samples: Dict[str, deque] = {}
+
+    def record(self, agent_name: str, ms: float):
+        with self._lock:
+            self._samples.setdefault(agent_name, deque(maxlen=TTFT_SAMPLES)).append(ms)
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            report = {}
+            for agent_name, samples in self._samples.items():
+                ordered = sorted(samples)
+                report[agent_name] = {
+                    "count": len(ordered),
+                    "avg_ms": round(sum(ordered) / len(ordered), 1),
+                    "p50_ms": round(ordered[len(ordered) // 2], 1),
+                    "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 1),
+                }
+            return report
+
+
+ttft_stats = TTFTStats()
+
+
+def _event_text(event: Any) -> str:
+    if hasattr(event, 'text') and event.text:
+        return event.text
+    parts = getattr(getattr(event, 'content', None), 'parts', None) or []
+    return "".join(p.text for p in parts if getattr(p, 'text', None))
+
+
+async def _stream_deltas(events, agent_name: str, turn_started: Optional[float] = None) -> AsyncGenerator[Any, None]:
+    """
+    Passes an SSE run through as it arrives: partial events carry the text
+    deltas, and the aggregated event that closes each model turn repeats
+    that text, so it is dropped (or reduced to its tool parts). Records the
+    time to the first delta in ttft_stats.
+    """
+    call_started = time.perf_counter()
+    first_delta = True
+    streamed = False
+    async for event in events:
+        if getattr(event, 'partial', False):
+            if not _event_text(event):
+                continue
+            if first_delta:
+                first_delta = False
+                now = time.perf_counter()
+                ttft_ms = (now - (turn_started or call_started)) * 1000
+                ttft_stats.record(agent_name, ttft_ms)
+                print(f"[RunWorkflow] ⏱️ TTFT {agent_name}: {ttft_ms:.0f}ms no turno ({(now - call_started) * 1000:.0f}ms na chamada)")
+            streamed = True
+            yield event
+            continue
+        if streamed:
+            streamed = False
+            parts = getattr(getattr(event, 'content', None), 'parts', None) or []
+            other_parts = [p for p in parts if not getattr(p, 'text', None)]
+            if not other_parts:
+                continue
+            event = event.model_copy(update={"content": Content(role=event.content.role, parts=other_parts)})
+        yield event
+
+
+# Response-agent context: what the phase instructions refer to, not the whole profile again
+_RESPONSE_CONTEXT_FIELDS = ("passport_phase", "full_name", "age", "current_dependent_id")
+_RESPONSE_HISTORY_LINES = 6
+
+
+def _response_context(profile_state: Dict, chat_history_lines: list, ui_form_state: Optional[Dict] = None, conversation_summary: Optional[Dict] = None) -> Dict[str, Any]:
+    context = {k: profile_state.get(k) for k in _RESPONSE_CONTEXT_FIELDS if profile_state.get(k) not in (None, "")}
+    if ui_form_state and ui_form_state.get("_focused_field"):
+        context["campo_em_foco"] = ui_form_state["_focused_field"]
+    if conversation_summary and conversation_summary.get("summary"):
+        context["resumo_da_conversa"] = conversation_summary["summary"]
+    if chat_history_lines:
+        context["historico_recente"] = chat_history_lines[-_RESPONSE_HISTORY_LINES:]
+    return context
 
 
 async def _run_response_agent(
     response_agent: LlmAgent,
     user_id: str,
     session_id: str,
-    reasoning_report: str,
-    user_message: str,
-    default_context: str,
+    reasoning_output: ReasoningOutput,
+    turn_started: Optional[float] = None,
+    isolated: bool = False,
 ) -> AsyncGenerator[Any, None]:
-    """Runs the Response Agent with the reasoning report and streams output."""
+    """
+    Runs the Response Agent with the compact reasoning report and streams its text deltas.
+    `isolated` runs it on a transient session, without the student's previous turns.
+    """
     
+    # The profile is already summarized in context_used; its raw tool output is not repeated
     response_input_text = f"""MENSAGEM ORIGINAL DO USUÁRIO:
-{user_message}
-
-RELATÓRIO TÉCNICO DO MÓDULO DE RACIOCÍNIO:
-{reasoning_report}
+{reasoning_output.user_message}
 
-{default_context}
+RELATÓRIO TÉCNICO DO MÓDULO DE RACIOCÍNIO (JSON):
+{reasoning_output.compact(exclude_tools=("getStudentProfileTool",))}
 """
     
     enriched_instruction = (
@@ -280,11 +528,17 @@ RELATÓRIO TÉCNICO DO MÓDULO DE RACIOCÍNIO:
         output_key=response_agent.output_key,
     )
     
-    runner = Runner(agent=runnable, app_name="cloudinha-agent", session_service=session_service)
+    if isolated:
+        transient_session = InMemorySessionService()
+        await transient_session.create_session(app_name="cloudinha-agent", session_id=session_id, user_id=user_id)
+        runner = Runner(agent=runnable, app_name="cloudinha-agent", session_service=transient_session)
+    else:
+        runner = Runner(agent=runnable, app_name="cloudinha-agent", session_service=session_service)
     
     response_message = Content(role="user", parts=[Part(text=response_input_text)])
     
-    async for event in runner.run_async(user_id=user_id, session_id=session_id, new_message=response_message):
+    events = runner.run_async(user_id=user_id, session_id=session_id, new_message=response_message, run_config=STREAMING_RUN_CONFIG)
+    async for event in _stream_deltas(events, response_agent.name, turn_started):
         yield event
 
 
@@ -294,6 +548,21 @@ async def run_workflow(
     new_message: Content,
     ui_form_state: Optional[Dict[str, Any]] = None,
     passport_phase: Optional[str] = None
+) -> AsyncGenerator[Any, None]:
+    """Runs one chat turn; read-only tools are memoized for the duration of the turn."""
+    with tool_turn() as memo:
+        async for event in _run_turn(user_id, session_id, new_message, ui_form_state, passport_phase):
+            yield event
+        if memo.stats["hits"]:
+            print(f"[RunWorkflow] ♻️ Ferramentas somente leitura: {memo.stats['hits']} chamadas reaproveitadas, {memo.stats['misses']} executadas, {memo.stats['invalidated']} invalidadas.")
+
+
+async def _run_turn(
+    user_id: str,
+    session_id: str,
+    new_message: Content,
+    ui_form_state: Optional[Dict[str, Any]] = None,
+    passport_phase: Optional[str] = None
 ) -> AsyncGenerator[Any, None]:
     """
     Orchestrates the generic agent workflow.
@@ -308,6 +577,9 @@ async def run_workflow(
         yield SimpleTextEvent("Desculpe, não posso falar com você se não estiver logado.")
         return
 
+    fast_path_stats.record_turn()
+    turn_started = time.perf_counter()
+
     # 0. Fetch Initial State
     profile_state = getStudentProfileTool(user_id)
     db_phase_initial = profile_state.get("passport_phase")
@@ -323,27 +595,24 @@ async def run_workflow(
     # Fetch Recent History from Session
     recent_history_str = ""
     chat_history_for_agent = ""
+    agent_history_lines = []
+    conversation_summary = None
     active_wf = profile_state.get("active_workflow")
     try:
         session = await session_service.get_session("cloudinha-server", session_id, user_id)
         
-        if active_wf and hasattr(session, 'load_for_workflow'):
-            workflow_history = session.load_for_workflow(active_wf, limit=20)
+        # Rolling summary of the older conversation + the latest messages under the history budget
+        if active_wf and hasattr(session, 'load_records_for_workflow'):
+            workflow_records = session.load_records_for_workflow(active_wf, limit=20)
+            conversation_summary = chat_summaries.get(session.client, user_id, active_wf)
         else:
             workflow_history = session.load()[-20:] if session.load() else []
+            workflow_records = [
+                {"sender": "user" if m.role == "user" else "cloudinha", "content": "".join(p.text for p in (m.parts or []) if p.text)}
+                for m in workflow_history
+            ]
         
-        agent_history_lines = []
-        for m in workflow_history:
-            role_label = "Usuário" if m.role == "user" else "Cloudinha"
-            txt = ""
-            if m.parts:
-                for p in m.parts:
-                    if p.text: txt += p.text
-            if txt:
-                agent_history_lines.append(f"{role_label}: {txt}")
-        
-        if agent_history_lines:
-            chat_history_for_agent = "\nHISTÓRICO DA CONVERSA (últimas mensagens):\n" + "\n".join(agent_history_lines) + "\n---\n"
+        chat_history_for_agent, agent_history_lines = build_history_context(conversation_summary, workflow_records)
         
         all_history = session.load()
         last_messages_for_router = all_history[-10:] if all_history else []
@@ -437,6 +706,7 @@ async def run_workflow(
             
             print(f"[RunWorkflow] Yielding scripted message: '{scripted_message[:50]}...'")
             yield SimpleTextEvent(scripted_message)
+            fast_path_stats.record_scripted()
             captured_output = scripted_message
             
             updates = workflow_obj.handle_step_completion(user_id, profile_state, captured_output)
@@ -453,6 +723,50 @@ async def run_workflow(
             steps_run += 1
             continue
 
+        # --- FAST PATH (known UI intents: tool + template, no LLM) ---
+        if steps_run == 0 and (not isinstance(step, dict) or step.get("type") == "reasoning_response"):
+            user_text = current_message.parts[0].text if current_message.parts else ""
+            fast = await try_fast_path(user_id, profile_state.get("passport_phase"), user_text)
+            if fast:
+                print(f"[RunWorkflow] ⚡ Fast path: {fast['intent']} (sem LLM)")
+                fast_path_stats.record_fast(fast["intent"])
+                if fast["tool"]:
+                    yield {"type": "tool_start", "tool": fast["tool"], "args": fast["args"]}
+                    output = fast["tool_output"]
+                    yield {"type": "tool_end", "tool": fast["tool"], "output": output if isinstance(output, str) else json.dumps(output, ensure_ascii=False)}
+                yield SimpleTextEvent(fast["reply"])
+
+                updates = workflow_obj.handle_step_completion(user_id, profile_state, fast["reply"])
+                if updates:
+                    db_updates = {k: v for k, v in updates.items() if not k.startswith("_")}
+                    if db_updates:
+                        updateStudentProfileTool(user_id=user_id, updates=db_updates)
+                    profile_state.update(updates)
+                break
+
+        # --- ANSWER CACHE (same knowledge question answered before: no research, no LLM) ---
+        if steps_run == 0 and isinstance(step, dict) and step.get("type") == "reasoning_response":
+            user_text = current_message.parts[0].text if current_message.parts else ""
+            phase = profile_state.get("passport_phase")
+            try:
+                cached = await answer_cache.lookup(phase, user_text)
+            except Exception as e:
+                print(f"[RunWorkflow] Cache de respostas indisponível: {e}")
+                cached = None
+            if cached:
+                print(f"[RunWorkflow] 🗄️ Resposta do cache (similaridade={cached['similarity']}, pergunta original='{cached['question'][:60]}')")
+                response_call_stats.record(phase, "cached")
+                yield {"type": "cache_hit", "similarity": cached["similarity"], "age_seconds": cached["age_seconds"]}
+                yield SimpleTextEvent(cached["answer"])
+
+                updates = workflow_obj.handle_step_completion(user_id, profile_state, cached["answer"])
+                if updates:
+                    db_updates = {k: v for k, v in updates.items() if not k.startswith("_")}
+                    if db_updates:
+                        updateStudentProfileTool(user_id=user_id, updates=db_updates)
+                    profile_state.update(updates)
+                break
+
         # --- REASONING → RESPONSE PIPELINE (2-agent chain) ---
         if isinstance(step, dict) and step.get("type") == "reasoning_response":
             r_agent = step["reasoning_agent"]
@@ -469,6 +783,7 @@ async def run_workflow(
             # === STEP 1: Reasoning Agent ===
             print(f"[RunWorkflow] 🧠 Running Reasoning Agent...")
             reasoning_raw = ""
+            reasoning_output = None
             max_retries = 3
             
             for attempt in range(max_retries):
@@ -480,12 +795,15 @@ async def run_workflow(
                         message=current_message,
                         default_context=default_context,
                         knowledge_context=knowledge_context,
+                        context_used=_response_context(profile_state, agent_history_lines, ui_form_state, conversation_summary),
                     ):
                         if isinstance(r_event, dict):
                             if r_event.get("type") in ["tool_start", "tool_end"]:
                                 yield r_event
                             elif r_event.get("type") == "final_text":
                                 reasoning_raw = r_event.get("text", "")
+                            elif r_event.get("type") == "final_output":
+                                reasoning_output = r_event["output"]
                     break
                 except Exception as e:
                     import traceback
@@ -508,43 +826,57 @@ async def run_workflow(
             
             # Log reasoning output
             user_msg_text = current_message.parts[0].text if current_message.parts else ""
+            if reasoning_output is None:
+                reasoning_output = ReasoningOutput.fallback(user_msg_text, "Relatório estruturado ausente.")
             
-            print(f"[RunWorkflow] 🧠 Reasoning complete. Report length: {len(reasoning_raw)} chars")
+            print(f"[RunWorkflow] 🧠 Reasoning complete. Report length: {len(reasoning_raw)} chars, {len(reasoning_output.tools_called)} tool calls, intention={reasoning_output.user_intention}")
             print(f"[RunWorkflow] 🧠 Report preview: {reasoning_raw[:300]}...")
             
             yield {"type": "tool_end", "tool": r_agent.name, "output": "Reasoning Complete"}
             
-            # === STEP 2: Response Agent ===
-            print(f"[RunWorkflow] 💬 Running Response Agent...")
-            yield {"type": "tool_start", "tool": "response_agent", "args": {"workflow": workflow_obj.name}}
-            
             captured_output = ""
+            templated = _templated_reply(reasoning_output)
+            direct = None if templated else _direct_reply(reasoning_output)
+            single_call = templated or direct
+            phase = profile_state.get("passport_phase")
             
-            for attempt in range(max_retries):
+            if templated:
+                # === STEP 2 (templated): outcome needs no wording from the Response Agent ===
+                print(f"[RunWorkflow] 💬 Resposta por template ({reasoning_output.user_intention}); Response Agent ignorado.")
+                response_call_stats.record(phase, "templated")
+            elif direct:
+                # === STEP 2 (direct): tool-free turn already answered in persona by the Reasoning Agent ===
+                print(f"[RunWorkflow] 💬 Resposta direta do raciocínio (sem ferramentas); Response Agent ignorado.")
+                response_call_stats.record(phase, "direct")
+            else:
+                response_call_stats.record(phase, "response_agent")
+            
+            if single_call:
+                yield SimpleTextEvent(single_call)
+                captured_output = single_call
+            
+            # === STEP 2: Response Agent ===
+            # Answers that may go to the answer cache are written without the student's context
+            cache_terms = None if single_call else _answer_cache_terms(reasoning_output)
+            response_input = _impersonal(reasoning_output, phase) if cache_terms else reasoning_output
+            response_failed = False
+            for attempt in range(0 if single_call else max_retries):
+                if attempt == 0:
+                    print(f"[RunWorkflow] 💬 Running Response Agent...")
+                    yield {"type": "tool_start", "tool": "response_agent", "args": {"workflow": workflow_obj.name}}
                 try:
                     async for event in _run_response_agent(
                         response_agent=resp_agent,
                         user_id=user_id,
                         session_id=session_id,
-                        reasoning_report=reasoning_raw,
-                        user_message=user_msg_text,
-                        default_context=default_context,
+                        reasoning_output=response_input,
+                        turn_started=turn_started,
+                        isolated=bool(cache_terms),
                     ):
+                        captured_output += _event_text(event)
                         final_event = workflow_obj.transform_event(event, resp_agent.name)
-                        
                         if final_event:
-                            if hasattr(final_event, 'text') and final_event.text:
-                                captured_output += final_event.text
-                            elif isinstance(final_event, dict) and final_event.get("output"):
-                                captured_output += final_event.get("output", "")
                             yield final_event
-                        else:
-                            if hasattr(event, 'text') and event.text:
-                                captured_output += event.text
-                            elif hasattr(event, 'content') and hasattr(event.content, 'parts'):
-                                for p in event.content.parts:
-                                    if hasattr(p, 'text') and p.text:
-                                        captured_output += p.text
                     break
                 except Exception as e:
                     import traceback
@@ -559,13 +891,19 @@ async def run_workflow(
                         error_type="response_agent_error"
                     )
                     
-                    if attempt == max_retries - 1:
+                    # Deltas already streamed can't be taken back: retrying would repeat them
+                    if attempt == max_retries - 1 or captured_output:
                         yield {"type": "error", "message": "Estou com dificuldades de conexão ou limite de uso excedido. Tente novamente em alguns minutos."}
+                        response_failed = True
                         break
                     await asyncio.sleep(2 ** attempt)
-                    captured_output = ""
             
-            yield {"type": "tool_end", "tool": "response_agent", "output": "Response Complete"}
+            if not single_call:
+                yield {"type": "tool_end", "tool": "response_agent", "output": "Response Complete"}
+                first_name = (profile_state.get("full_name") or "").split(" ")[0]
+                personal = bool(first_name) and fold(first_name) in fold(captured_output)
+                if cache_terms and not response_failed and not personal and captured_output.strip():
+                    _cache_answer(phase, user_msg_text, captured_output.strip(), cache_terms)
             
             # Handle Completion / Transitions
             updates = workflow_obj.handle_step_completion(user_id, profile_state, captured_output)
@@ -653,28 +991,18 @@ async def run_workflow(
         
         for attempt in range(max_retries):
             try:
-                async for event in runner.run_async(user_id=user_id, session_id=session_id, new_message=current_message):
+                events = runner.run_async(user_id=user_id, session_id=session_id, new_message=current_message, run_config=STREAMING_RUN_CONFIG)
+                async for event in _stream_deltas(events, agent.name, turn_started):
+                    captured_output += _event_text(event)
                     final_event = workflow_obj.transform_event(event, agent.name)
-                    
                     if final_event:
-                        if hasattr(final_event, 'text') and final_event.text:
-                            captured_output += final_event.text
-                        elif isinstance(final_event, dict) and final_event.get("output"):
-                            captured_output += final_event.get("output", "")
-                        
                         yield final_event
-                    else:
-                         if hasattr(event, 'text') and event.text:
-                             captured_output += event.text
-                         elif hasattr(event, 'content') and hasattr(event.content, 'parts'):
-                             for p in event.content.parts:
-                                 if hasattr(p, 'text') and p.text: captured_output += p.text
                 
                 break
             
             except (httpx.ConnectTimeout, httpx.ReadTimeout, httpx.ConnectError, ConnectionError, TimeoutError, OSError) as e:
                 print(f"[RunWorkflow] Attempt {attempt+1}/{max_retries} failed: {e}")
-                if attempt == max_retries - 1:
+                if attempt == max_retries - 1 or captured_output:
                     yield {"type": "error", "message": "Estou com dificuldades de conexão. Tente novamente."}
                     break
                 
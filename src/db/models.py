@@ -229,6 +229,23 @@ class ChatMessage(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
 
+class ChatSummary(Base):
+    """Rolling summary of a user's conversation in one workflow (messages up to summarized_until)."""
+    __tablename__ = "chat_summaries"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=sa_text("gen_random_uuid()"))
+    user_id = Column(UUID(as_uuid=True), nullable=False)
+    workflow = Column(Text, nullable=False)
+    summary = Column(Text)
+    summarized_until = Column(DateTime(timezone=True))
+    message_count = Column(Integer, server_default=sa_text("0"))
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "workflow", name="uq_chat_summaries_user_workflow"),
+    )
+
+
 class ModerationLog(Base):
     __tablename__ = "moderation_logs"
 
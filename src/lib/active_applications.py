@@ -0,0 +1,88 @@
+"""
+In-process index of each user's active (latest DRAFT) student application.
+
+The EVALUATE reasoning agent usually calls getPartnerFormsTool and
+getStudentApplicationTool in the same turn, and both need the user's current
+draft's partner. Entries only hold identity columns (id, partner_id,
+updated_at) and are served from memory for a short window. After that one
+query re-reads the latest draft; when its id or updated_at differ from the
+cached ones (a draft started or edited elsewhere), the entry is replaced from
+that same response. Answers are never cached here since the frontend edits
+them directly.
+"""
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from src.lib.supabase import supabase
+
+# Entries younger than this are trusted without touching the database (covers one turn)
+FRESH_SECONDS = 30
+
+ACTIVE_APP_COLUMNS = "id, partner_id, updated_at"
+
+# user_id -> {"application": {...} | None, "checked_at": float}
+_ACTIVE_APPS: Dict[str, Dict[str, Any]] = {}
+_lock = threading.Lock()
+
+
+def _store(user_id: str, application: Optional[Dict[str, Any]]):
+    with _lock:
+        _ACTIVE_APPS[user_id] = {"application": application, "checked_at": time.time()}
+
+
+def get_active_application(user_id: str) -> Optional[Dict[str, Any]]:
+    """Returns `{id, partner_id, updated_at}` of the user's latest DRAFT application, or None."""
+    if not user_id:
+        return None
+
+    with _lock:
+        entry = _ACTIVE_APPS.get(user_id)
+    if entry and time.time() - entry["checked_at"] < FRESH_SECONDS:
+        return entry["application"]
+
+    application = _latest_draft(user_id)
+    cached = entry["application"] if entry else None
+    if cached and application and _version(cached) == _version(application):
+        application = cached  # unchanged since it was cached
+    elif entry is not None and _version(cached) != _version(application):
+        print(f"[ActiveApplications] Rascunho ativo de {user_id} mudou fora deste processo; cache atualizado.")
+    _store(user_id, application)
+    return application
+
+
+def _version(application: Optional[Dict[str, Any]]):
+    return (application.get("id"), application.get("updated_at")) if application else None
+
+
+def _latest_draft(user_id: str) -> Optional[Dict[str, Any]]:
+    res = (
+        supabase
+        .table("student_applications")
+        .select(ACTIVE_APP_COLUMNS)
+        .eq("user_id", user_id)
+        .eq("status", "DRAFT")
+        .order("updated_at", desc=True)
+        .limit(1)
+        .execute()
+    )
+    return res.data[0] if res.data else None
+
+
+def remember_active_application(user_id: str, application: Dict[str, Any]):
+    """Records a draft that was just created by this process (needs at least id and partner_id)."""
+    if not user_id:
+        return
+    if application and application.get("id") and application.get("partner_id"):
+        _store(user_id, {k: application.get(k) for k in ("id", "partner_id", "updated_at")})
+    else:
+        invalidate_active_application(user_id)
+
+
+def invalidate_active_application(user_id: str = None):
+    """Forces the next lookup for `user_id` (or for everyone) to hit the database."""
+    with _lock:
+        if user_id is None:
+            _ACTIVE_APPS.clear()
+        else:
+            _ACTIVE_APPS.pop(user_id, None)
@@ -0,0 +1,177 @@
+"""
+Semantic cache of final answers to knowledge questions.
+
+Many students ask the same program questions (ProUni income limits, Sisu
+dates, what a partner offers). An answer built only from knowledge-base
+research, and written without the student's profile or history, is stored
+with the passport phase, the program/partner terms it was researched for and
+the question's embedding. A later question in the same phase that
+names the same program/partner and whose embedding is at least
+SIMILARITY_THRESHOLD close is answered from memory, skipping research and
+both LLM calls.
+
+Entries expire after TTL_SECONDS and are dropped as soon as the knowledge
+index version they were answered from changes (a document was edited, added
+or removed). Lookups run the index's throttled refresh first, so an edit is
+noticed within its REFRESH_SECONDS even when every question is a hit.
+
+Embeddings come from the shared EmbeddingService when it has been set up
+(knowledgeSearchTool creates it); otherwise a local hash backend is used,
+which only matches near-identical wording.
+"""
+import asyncio
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from src.lib.embeddings import HashEmbeddingBackend, get_embedding_service, normalize_query
+from src.lib.knowledge_index import knowledge_index
+from src.lib.text_utils import tokenize
+
+SIMILARITY_THRESHOLD = 0.92
+TTL_SECONDS = 6 * 3600
+MAX_ENTRIES = 1024
+
+_fallback_backend = HashEmbeddingBackend()
+
+
+async def _default_embed(text: str):
+    """(model name, vector) for a question."""
+    service = get_embedding_service()
+    if service is not None:
+        return service.backend.name, await service.embed_query(text)
+    return _fallback_backend.name, (await _fallback_backend.embed([text]))[0]
+
+
+def mentions(question: str, terms: List[str]) -> bool:
+    """
+    Whether the question itself names every scope term (folded tokens).
+    An empty scope never matches: unscoped answers are not reusable.
+    """
+    tokens = set(tokenize(question))
+    return bool(terms) and all(term in tokens for term in terms)
+
+
+class AnswerCache:
+    def __init__(
+        self,
+        threshold: float = SIMILARITY_THRESHOLD,
+        ttl_seconds: float = TTL_SECONDS,
+        max_entries: int = MAX_ENTRIES,
+        embed_fn: Callable = None,
+        version_fn: Callable[[], Optional[str]] = None,
+        refresh_fn: Callable[[], Any] = None,
+    ):
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._embed = embed_fn or _default_embed
+        self._version = version_fn or knowledge_index.version
+        self._refresh = refresh_fn or knowledge_index.refresh
+        self._entries: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self.stats = {"lookups": 0, "hits": 0, "misses": 0, "stored": 0, "expired": 0, "invalidated": 0}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def lookup(self, phase: str, question: str) -> Optional[Dict[str, Any]]:
+        """{"answer", "question", "similarity", "age_seconds"} for a cached answer to this question, or None."""
+        self.stats["lookups"] += 1
+        if not normalize_query(question) or not self._entries:
+            self.stats["misses"] += 1
+            return None
+
+        model, vector = await self._embed(question)
+        query = _unit(vector)
+        await asyncio.to_thread(self._refresh)
+        version = self._version()
+        now = time.time()
+        best, best_score = None, self.threshold
+        with self._lock:
+            for entry in list(self._entries):
+                if now - entry["stored_at"] > self.ttl_seconds:
+                    self._entries.remove(entry)
+                    self.stats["expired"] += 1
+                    continue
+                if entry["version"] != version:
+                    self._entries.remove(entry)
+                    self.stats["invalidated"] += 1
+                    continue
+                if entry["phase"] != phase or entry["model"] != model or not mentions(question, entry["terms"]):
+                    continue
+                score = float(np.dot(entry["vector"], query))
+                if score >= best_score:
+                    best, best_score = entry, score
+
+        if best is None:
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        return {
+            "answer": best["answer"],
+            "question": best["question"],
+            "similarity": round(best_score, 3),
+            "age_seconds": round(now - best["stored_at"]),
+        }
+
+    async def store(self, phase: str, question: str, answer: str, terms: List[str]) -> bool:
+        """
+        Caches an answer researched for `terms` (program/partner tokens).
+        Questions that don't name those terms relied on the conversation for
+        context and are not stored.
+        """
+        if not answer or not normalize_query(question) or not mentions(question, terms):
+            return False
+        # Pin the entry to the knowledge version the answer was produced from
+        await asyncio.to_thread(self._refresh)
+        version = self._version()
+        if version is None:
+            return False
+
+        model, vector = await self._embed(question)
+        entry = {
+            "phase": phase,
+            "terms": list(terms),
+            "question": question,
+            "answer": answer,
+            "model": model,
+            "vector": _unit(vector),
+            "version": version,
+            "stored_at": time.time(),
+        }
+        with self._lock:
+            # Same question asked again: the newer answer replaces the old one
+            self._entries = [
+                e for e in self._entries
+                if not (e["phase"] == phase and e["terms"] == entry["terms"] and e["model"] == model
+                        and float(np.dot(e["vector"], entry["vector"])) >= self.threshold)
+            ]
+            self._entries.append(entry)
+            while len(self._entries) > self.max_entries:
+                self._entries.pop(0)
+        self.stats["stored"] += 1
+        return True
+
+    def invalidate(self):
+        with self._lock:
+            self._entries = []
+
+    def report(self) -> Dict[str, Any]:
+        lookups = self.stats["lookups"]
+        return {
+            **self.stats,
+            "entries": len(self._entries),
+            "hit_rate": round(self.stats["hits"] / lookups, 3) if lookups else 0.0,
+        }
+
+
+def _unit(vector) -> np.ndarray:
+    array = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(array)
+    return array / norm if norm else array
+
+
+answer_cache = AnswerCache()
@@ -0,0 +1,157 @@
+"""
+File-backed assets (knowledge files, rule documents, agent instructions).
+
+Every file is read once and served from memory. At most every
+CHECK_SECONDS a cheap `os.stat` compares mtime and size with what was
+loaded, and changed files are re-read, so editing a knowledge or rules file
+takes effect without a restart. Directory listings are cached the same way
+(keyed by the directory's mtime), and `derived()` caches values built from a
+set of files until one of them changes.
+
+`report()` lists each asset with its size, load time and reload count.
+"""
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+CHECK_SECONDS = 2.0
+
+
+class AssetManager:
+    def __init__(self, check_seconds: float = CHECK_SECONDS):
+        self.check_seconds = check_seconds
+        # path -> {"text", "signature", "checked_at", "loaded_at", "load_ms", "reloads"}
+        self._files: Dict[str, Dict[str, Any]] = {}
+        # directory -> {"signature", "checked_at", "names"}
+        self._dirs: Dict[str, Dict[str, Any]] = {}
+        # key -> {"signatures", "value"}
+        self._derived: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.RLock()
+
+    # --- files ------------------------------------------------------------
+
+    def text(self, path: str) -> Optional[str]:
+        """Contents of a UTF-8 file, or None if it does not exist."""
+        entry = self._fresh_entry(os.path.abspath(path))
+        return entry["text"] if entry else None
+
+    def require(self, path: str) -> str:
+        """Like text(), but a missing file is an error."""
+        content = self.text(path)
+        if content is None:
+            raise FileNotFoundError(f"Asset file not found at: {path}")
+        return content
+
+    def directory(self, path: str, extensions: Tuple[str, ...] = (".md", ".txt")) -> List[Tuple[str, str]]:
+        """[(file path, text)] for the matching files of a directory, sorted by name; [] if it does not exist."""
+        path = os.path.abspath(path)
+        now = time.time()
+        with self._lock:
+            entry = self._dirs.get(path)
+            if entry is None or now - entry["checked_at"] >= self.check_seconds:
+                signature = _signature(path)
+                if entry is None or signature != entry["signature"]:
+                    names = sorted(n for n in os.listdir(path) if n.endswith(extensions)) if signature else []
+                    entry = {"signature": signature, "names": names}
+                    self._dirs[path] = entry
+                entry["checked_at"] = now
+            names = entry["names"]
+
+        files = []
+        for name in names:
+            content = self.text(os.path.join(path, name))
+            if content is not None:
+                files.append((os.path.join(path, name), content))
+        return files
+
+    def derived(self, key: str, paths: Iterable[str], build: Callable[[], Any]) -> Any:
+        """Value built from `paths`, rebuilt only when one of them changed (or appeared/disappeared)."""
+        paths = [os.path.abspath(p) for p in paths]
+        for p in paths:
+            self._fresh_entry(p)
+        signatures = tuple(self._files[p]["signature"] if p in self._files else None for p in paths)
+        with self._lock:
+            cached = self._derived.get(key)
+            if cached and cached["signatures"] == signatures:
+                return cached["value"]
+        value = build()
+        with self._lock:
+            self._derived[key] = {"signatures": signatures, "value": value}
+        return value
+
+    def preload(self, paths: Iterable[str]):
+        for path in paths:
+            self.text(path)
+
+    def report(self) -> Dict[str, Any]:
+        """Sizes and load times of every loaded asset."""
+        with self._lock:
+            files = {
+                path: {
+                    "chars": len(entry["text"]),
+                    "load_ms": round(entry["load_ms"], 2),
+                    "loaded_at": entry["loaded_at"],
+                    "reloads": entry["reloads"],
+                }
+                for path, entry in self._files.items()
+                if entry["text"] is not None
+            }
+        return {
+            "files": files,
+            "total_chars": sum(f["chars"] for f in files.values()),
+            "total_load_ms": round(sum(f["load_ms"] for f in files.values()), 2),
+        }
+
+    def invalidate(self, path: str = None):
+        """Forces the next access to re-check one file (or everything) on disk."""
+        with self._lock:
+            if path is None:
+                for entry in list(self._files.values()) + list(self._dirs.values()):
+                    entry["checked_at"] = 0.0
+            elif os.path.abspath(path) in self._files:
+                self._files[os.path.abspath(path)]["checked_at"] = 0.0
+
+    # --- internals --------------------------------------------------------
+
+    def _fresh_entry(self, path: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            entry = self._files.get(path)
+            if entry and now - entry["checked_at"] < self.check_seconds:
+                return entry if entry["text"] is not None else None
+
+            signature = _signature(path)
+            if entry and signature == entry["signature"]:
+                entry["checked_at"] = now
+                return entry if entry["text"] is not None else None
+
+            started = time.perf_counter()
+            content = None
+            if signature:
+                with open(path, "r", encoding="utf-8") as f:
+                    content = f.read()
+            reloads = entry["reloads"] + 1 if entry else 0
+            if entry:
+                print(f"[Assets] Recarregado: {os.path.basename(path)}")
+            entry = {
+                "text": content,
+                "signature": signature,
+                "checked_at": now,
+                "loaded_at": now,
+                "load_ms": (time.perf_counter() - started) * 1000,
+                "reloads": reloads,
+            }
+            self._files[path] = entry
+            return entry if content is not None else None
+
+
+def _signature(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+assets = AssetManager()
@@ -0,0 +1,153 @@
+"""
+In-process BM25 index with a Portuguese analyzer.
+
+The analyzer accent-folds, drops stop words and applies a light suffix
+stemmer so that "inscrições", "inscrição" and "inscricao" share a term.
+Documents can be added/replaced/removed one at a time; statistics are kept
+incrementally, so scores always reflect the current contents without a
+rebuild.
+"""
+import math
+import threading
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional
+
+from src.lib.text_utils import tokenize
+
+PT_STOP_WORDS = {
+    "a", "o", "as", "os", "um", "uma", "uns", "umas", "e", "ou", "mas", "nem",
+    "de", "da", "do", "das", "dos", "em", "na", "no", "nas", "nos", "num", "numa",
+    "ao", "aos", "pelo", "pela", "pelos", "pelas", "por", "para", "pra",
+    "com", "sem", "sob", "sobre", "entre", "ate", "apos", "desde",
+    "que", "qual", "quais", "quem", "onde", "quando", "como", "porque", "se",
+    "eu", "tu", "ele", "ela", "vos", "eles", "elas", "me", "te", "lhe", "lhes",
+    "meu", "minha", "meus", "minhas", "seu", "sua", "seus", "suas",
+    "esse", "essa", "esses", "essas", "este", "esta", "estes", "estas", "isso", "isto",
+    "aquele", "aquela", "aquilo", "ja", "nao", "sim", "mais", "menos", "muito", "muita",
+    "ser", "sao", "foi", "era", "sera", "estar", "estou", "tem", "ter", "ha",
+    "vai", "vou", "pode", "posso", "deve", "tambem", "so", "ainda",
+}
+
+# Derivational suffixes removed after plural reduction (longest first)
+_SUFFIXES = (
+    "amentos", "imentos", "amento", "imento", "mente", "acoes", "icoes",
+    "acao", "icao", "idade", "ismos", "ismo", "istas", "ista",
+    "avel", "ivel", "adora", "adores", "ador", "edor", "idor",
+)
+
+# Plural endings and their singular replacement
+_PLURALS = (
+    ("oes", "ao"), ("aes", "ao"), ("ais", "al"), ("eis", "el"), ("ois", "ol"),
+    ("ns", "m"), ("res", "r"), ("zes", "z"), ("les", "l"),
+)
+
+
+def stem_pt(token: str) -> str:
+    """Light Portuguese stemmer: plural reduction, common suffixes, final vowel."""
+    if len(token) <= 3 or token.isdigit():
+        return token
+
+    for suffix, replacement in _PLURALS:
+        if token.endswith(suffix) and len(token) > len(suffix) + 2:
+            token = token[: -len(suffix)] + replacement
+            break
+    else:
+        if token.endswith("s") and not token.endswith(("ss", "us", "is")) and len(token) > 4:
+            token = token[:-1]
+
+    for suffix in _SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            token = token[: -len(suffix)]
+            break
+
+    if len(token) > 4 and token[-1] in "aeo":
+        token = token[:-1]
+    return token
+
+
+def analyze(text: str) -> List[str]:
+    """Folded, stop-word free, stemmed terms of `text`."""
+    return [stem_pt(t) for t in tokenize(text, PT_STOP_WORDS)]
+
+
+class BM25Index:
+    def __init__(self, k1: float = 1.5, b: float = 0.75, analyzer: Callable[[str], List[str]] = analyze):
+        self.k1 = k1
+        self.b = b
+        self.analyzer = analyzer
+        self._docs: Dict[Any, Dict[str, Any]] = {}   # doc_id -> {"terms": Counter, "length": int, "meta": ...}
+        self._postings: Dict[str, Dict[Any, int]] = {}  # term -> {doc_id: tf}
+        self._total_length = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def __contains__(self, doc_id) -> bool:
+        return doc_id in self._docs
+
+    def add(self, doc_id, text: str, meta: Any = None):
+        """Adds a document, replacing any previous version with the same id."""
+        terms = Counter(self.analyzer(text))
+        with self._lock:
+            self._remove(doc_id)
+            length = sum(terms.values())
+            self._docs[doc_id] = {"terms": terms, "length": length, "meta": meta}
+            self._total_length += length
+            for term, tf in terms.items():
+                self._postings.setdefault(term, {})[doc_id] = tf
+
+    def remove(self, doc_id):
+        with self._lock:
+            self._remove(doc_id)
+
+    def _remove(self, doc_id):
+        doc = self._docs.pop(doc_id, None)
+        if not doc:
+            return
+        self._total_length -= doc["length"]
+        for term in doc["terms"]:
+            posting = self._postings.get(term)
+            if posting is not None:
+                posting.pop(doc_id, None)
+                if not posting:
+                    del self._postings[term]
+
+    def meta(self, doc_id) -> Any:
+        doc = self._docs.get(doc_id)
+        return doc["meta"] if doc else None
+
+    def scores(self, query: str, candidates: Optional[set] = None) -> Dict[Any, float]:
+        """Raw BM25 score per matching doc_id (for fusion with other retrievers)."""
+        terms = set(self.analyzer(query))
+        with self._lock:
+            n = len(self._docs)
+            if not n or not terms:
+                return {}
+            avgdl = self._total_length / n or 1.0
+            result: Dict[Any, float] = {}
+            for term in terms:
+                posting = self._postings.get(term)
+                if not posting:
+                    continue
+                idf = math.log(1 + (n - len(posting) + 0.5) / (len(posting) + 0.5))
+                for doc_id, tf in posting.items():
+                    if candidates is not None and doc_id not in candidates:
+                        continue
+                    length = self._docs[doc_id]["length"]
+                    norm = tf * (self.k1 + 1) / (tf + self.k1 * (1 - self.b + self.b * length / avgdl))
+                    result[doc_id] = result.get(doc_id, 0.0) + idf * norm
+            return result
+
+    def search(self, query: str, k: int = 10, where: Callable[[Any], bool] = None) -> List[Dict[str, Any]]:
+        """Top-k [{"id", "score", "meta"}], optionally filtered by a predicate on meta."""
+        ranked = sorted(self.scores(query).items(), key=lambda item: -item[1])
+        results = []
+        for doc_id, score in ranked:
+            meta = self.meta(doc_id)
+            if where is not None and not where(meta):
+                continue
+            results.append({"id": doc_id, "score": score, "meta": meta})
+            if len(results) >= k:
+                break
+        return results
@@ -0,0 +1,291 @@
+"""
+Structure-aware chunker for editais and partner documents.
+
+PDF text from the ProUni/Sisu editais and partner regulations comes out as
+hard-wrapped lines with page footers. This module rebuilds the document's
+structure and cuts chunks along it instead of at fixed character offsets:
+
+- headings: CAPÍTULO/TÍTULO/SEÇÃO/ANEXO lines, "1. DAS INSCRIÇÕES"-style
+  numbered titles, all-caps lines and Markdown headings;
+- items: "Art. 5º", "1.2.1." numbered items, with their incisos ("I -"),
+  alíneas ("a)") and bullets kept attached;
+- date tables: runs of short lines that each carry a date stay in one chunk.
+
+Consecutive items under the same heading are packed up to `max_chars`
+without overlap; an item is only split (on sentence boundaries) when it
+alone exceeds the limit. Each chunk starts with its section path so it reads
+on its own, and the path is returned as metadata.
+"""
+import re
+from typing import Any, Dict, List
+
+MAX_CHARS = 1200
+# Bump when chunk boundaries change so ingestion re-splits files whose bytes did not change
+CHUNKER_VERSION = "structure-3"
+
+_PAGE_NOISE = [
+    re.compile(r"^\s*\d{1,3}\s*$"),                          # bare page numbers
+    re.compile(r"^\s*--- Página \d+ ---\s*$"),                # convert_pdfs markers
+    re.compile(r"SEI\s+[\d./-]+\s*/\s*pg\.\s*\d+", re.I),    # SEI footers of MEC editais
+    re.compile(r"^Página \d+ de \d+"),                        # browser print headers/footers
+    re.compile(r"^\d{2}/\d{2}/\d{4}, \d{2}:\d{2}"),
+    re.compile(r"^Publicada usando o Google Docs|Atualizado automaticamente a cada"),
+]
+_CHAPTER_RE = re.compile(r"^(CAP[IÍ]TULO|T[IÍ]TULO|SE[CÇ][AÃ]O|ANEXO)\b.*", re.I)
+_MD_HEADING_RE = re.compile(r"^#{1,6}\s+(.+)")
+_MAX_HEADING_CHARS = 120
+_ARTICLE_RE = re.compile(r"^(Art\.?\s*\d+[º°o]?)")
+# "1.", "1.2.3." or "1.2.3 Texto" (the trailing dot is often missing); at most two digits so years don't match
+_ITEM_RE = re.compile(r"^(\d{1,2}(?:\.\d+)+|\d{1,2}(?=\.))\.?(?:\s*(\S.*))?$")
+_ITEM_NUMBER_RE = re.compile(r"^\d+(?:\.\d+)*\.$")
+_ATTACHED_RE = re.compile(r"^([IVXLC]+\s*[-–]|[a-z]\)|[•▪●○]|-\s)")
+_DATE_RE = re.compile(
+    r"\b\d{1,2}/\d{1,2}(?:/\d{2,4})?\b|\b\d{1,2}º? de (?:janeiro|fevereiro|março|marco|abril|maio|junho|julho|agosto|setembro|outubro|novembro|dezembro)\b",
+    re.I,
+)
+_SENTENCE_RE = re.compile(r"(?<=[.;:])\s+(?=[A-ZÁÉÍÓÚÂÊÔÃÕÇ0-9])")
+# pypdf renders the "ti"/"tt" ligatures of the MEC editais font as "<", "=" and "E"
+_PDF_LIGATURES = [
+    (re.compile(r"(?<=[a-zà-ú])[<=](?=[a-zà-ú])"), "ti"),
+    (re.compile(r"\bhEps?:"), lambda m: m.group(0).replace("E", "tt")),
+]
+_LIGATURES = [
+    (re.compile("ﬁ"), "fi"),
+    (re.compile("ﬂ"), "fl"),
+]
+
+
+def _is_noise(line: str) -> bool:
+    return any(p.search(line) for p in _PAGE_NOISE)
+
+
+def _is_caps_heading(line: str) -> bool:
+    letters = [c for c in line if c.isalpha() and c not in "ºª"]
+    return len(letters) >= 6 and len(line) <= _MAX_HEADING_CHARS and all(c.isupper() for c in letters) and len(line.split()) >= 2
+
+
+def _rejoin_words(text: str) -> str:
+    """Some PDFs (e.g. exported from Google Docs) come out one word per line; rebuild their paragraphs."""
+    text = re.sub(r"\n(?:[ \t]*\n){2,}", "\x01", text)
+    text = re.sub(r"\n[ \t]*\n", " ", text)
+    text = re.sub(r"\n(?=[,.;:)])", "", text)
+    return text.replace("\n", " ").replace("\x01", "\n")
+
+
+def _one_word_per_line(text: str) -> bool:
+    """Mostly blank lines and very short ones in between: a PDF extracted word by word."""
+    raw = text.splitlines()
+    filled = [l.strip() for l in raw if l.strip()]
+    if not filled or len(raw) - len(filled) <= 0.4 * len(raw):
+        return False
+    return sum(len(l) for l in filled) / len(filled) <= 20
+
+
+def clean_text(text: str, pdf: bool = True) -> str:
+    """
+    Undoes PDF extraction damage: ligature glyphs, page headers/footers,
+    numbering split across lines and sentences wrapped mid-phrase.
+    Returns one logical line per paragraph/item/heading start.
+
+    With pdf=False (Markdown/plain text files) blank lines are kept as
+    paragraph breaks and the PDF font ligature fixes are skipped, since
+    "<"/"=" between letters are real characters there.
+    """
+    text = text.replace("\x00", "")
+    if pdf and _one_word_per_line(text):
+        text = _rejoin_words(text)
+    for pattern, repl in (_PDF_LIGATURES + _LIGATURES if pdf else _LIGATURES):
+        text = pattern.sub(repl, text)
+
+    lines: List[str] = []
+    for line in (l.strip() for l in text.splitlines()):
+        if not line or _is_noise(line):
+            continue
+        if lines:
+            prev = lines[-1]
+            if _ITEM_NUMBER_RE.match(prev):
+                # "1.2." + "1.1." -> "1.2.1.1."; "1.2.1.2." + "Compete..." -> one line
+                lines[-1] = prev + line if re.match(r"^\d+(?:\.\d+)*\.", line) else f"{prev} {line}"
+                continue
+            # Wrapped sentence: continuation starts lowercase or with punctuation
+            if (line[0] in ",.;:)" or line[0].islower()) and not _ATTACHED_RE.match(line):
+                lines[-1] = f"{prev}{'' if line[0] in ',.;:)' else ' '}{line}"
+                continue
+            # Heading wrapped over several lines: "3. DA DIVULGAÇÃO DO" + "RESULTADO DA CHAMADA REGULAR"
+            heading_prev = _ITEM_RE.match(prev)
+            prev_title = (heading_prev.group(2) or "") if heading_prev else prev
+            if _is_caps_heading(prev_title) and _is_caps_heading(line) and not _ITEM_RE.match(line) and len(prev) + len(line) < _MAX_HEADING_CHARS:
+                lines[-1] = f"{prev} {line}"
+                continue
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def _classify(line: str):
+    """Returns (kind, payload) for a cleaned, non-empty line."""
+    md = _MD_HEADING_RE.match(line)
+    if md:
+        # A "heading" longer than any title carries body text: keep it as a paragraph
+        if len(md.group(1)) > _MAX_HEADING_CHARS:
+            return "text", None
+        return "heading", md.group(1).strip()
+    if _CHAPTER_RE.match(line):
+        return "heading", line
+    item = _ITEM_RE.match(line)
+    if item:
+        number, rest = item.groups()
+        # "1. DAS INSCRIÇÕES" / "2.1 CONTRACHEQUE": a number followed by an all-caps title is a heading
+        if rest and _is_caps_heading(rest):
+            return "heading", line
+        return "item", number
+    article = _ARTICLE_RE.match(line)
+    if article:
+        return "item", article.group(1).replace(" ", "")
+    if _ATTACHED_RE.match(line):
+        return "attached", None
+    if _is_caps_heading(line):
+        return "heading", line
+    return "text", None
+
+
+def _blocks(text: str, pdf: bool = True) -> List[Dict[str, Any]]:
+    """
+    Groups lines into structural blocks: {"kind": heading|item|dates|text, "label", "lines"}.
+    Headings also carry "level", the Markdown `#` depth (None for other headings).
+    """
+    lines = clean_text(text, pdf=pdf).splitlines()
+
+    blocks: List[Dict[str, Any]] = []
+    i = 0
+    while i < len(lines):
+        # Date table: 3+ consecutive short lines, each with a date
+        run = i
+        while run < len(lines) and len(lines[run]) <= 160 and _DATE_RE.search(lines[run]):
+            run += 1
+        if run - i >= 3:
+            blocks.append({"kind": "dates", "label": None, "lines": lines[i:run]})
+            i = run
+            continue
+
+        line = lines[i]
+        kind, payload = _classify(line)
+        if kind == "heading":
+            level = len(line) - len(line.lstrip("#")) if _MD_HEADING_RE.match(line) else None
+            blocks.append({"kind": "heading", "label": payload, "lines": [], "level": level})
+        elif kind == "item":
+            blocks.append({"kind": "item", "label": payload, "lines": [line]})
+        elif kind == "attached" and blocks and blocks[-1]["kind"] in ("item", "text"):
+            blocks[-1]["lines"].append(line)
+        elif blocks and blocks[-1]["kind"] in ("item", "text"):
+            # Hard-wrapped continuation of the previous paragraph
+            blocks[-1]["lines"][-1] += " " + line
+        else:
+            blocks.append({"kind": "text", "label": None, "lines": [line]})
+        i += 1
+    return blocks
+
+
+def _split_long(text: str, limit: int) -> List[str]:
+    if len(text) <= limit:
+        return [text]
+    parts, current = [], ""
+    for sentence in _SENTENCE_RE.split(text):
+        if current and len(current) + len(sentence) + 1 > limit:
+            parts.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        parts.append(current)
+    # A single sentence longer than the limit is cut hard
+    return [p[i:i + limit] for p in parts for i in range(0, len(p), limit)]
+
+
+def chunk_document(text: str, title: str = None, max_chars: int = MAX_CHARS, pdf: bool = True) -> List[Dict[str, Any]]:
+    """
+    Splits document text into self-contained chunks.
+    Pass pdf=False for Markdown/plain text sources (see clean_text).
+
+    Returns [{"content", "section_path" (list), "items" (item labels), "kind" (text|dates)}].
+    """
+    chunks: List[Dict[str, Any]] = []
+    heading_path: List[str] = []
+    levels: List[Any] = []  # Markdown depth of each heading_path entry (None for other headings)
+    pending: List[tuple] = []  # (label, text) of items under the current heading
+
+    def header() -> str:
+        path = ([title] if title else []) + heading_path
+        return f"[{' > '.join(path)}]\n" if path else ""
+
+    def emit(texts: List[str], labels: List[str], kind: str = "text"):
+        chunks.append({
+            "content": header() + "\n".join(texts),
+            "section_path": list(heading_path),
+            "items": [l for l in labels if l],
+            "kind": kind,
+        })
+
+    def flush():
+        budget = max_chars - len(header())
+        texts, labels, size = [], [], 0
+        for label, body in pending:
+            if len(body) > budget:
+                if texts:
+                    emit(texts, labels)
+                    texts, labels, size = [], [], 0
+                for part in _split_long(body, budget):
+                    emit([part], [label])
+                continue
+            if texts and size + len(body) + 1 > budget:
+                emit(texts, labels)
+                texts, labels, size = [], [], 0
+            texts.append(body)
+            labels.append(label)
+            size += len(body) + 1
+        if texts:
+            emit(texts, labels)
+        pending.clear()
+
+    for block in _blocks(text, pdf=pdf):
+        if block["kind"] == "heading":
+            flush()
+            heading_path, levels = _next_path(heading_path, levels, block["label"], block["level"])
+        elif block["kind"] == "dates":
+            flush()
+            emit(block["lines"], [], kind="dates")
+        else:
+            pending.append((block["label"], "\n".join(block["lines"])))
+    flush()
+    return chunks
+
+
+def _heading_number(heading: str):
+    match = _ITEM_RE.match(heading)
+    return match.group(1) if match else None
+
+
+def _next_path(path: List[str], levels: List[Any], heading: str, level: int = None):
+    """
+    Returns the new (path, levels). A Markdown heading nests under the
+    Markdown headings of lower depth ("## Renda" under "# Guia ProUni").
+    Chapters/annexes restart the path. A numbered heading nests under the
+    numbered headings that prefix it ("2.1" under "2."); an unnumbered one
+    replaces the previous unnumbered heading at the end of the path. Both
+    stay under the enclosing Markdown headings.
+    """
+    if level is not None:
+        kept = [(entry, depth) for entry, depth in zip(path, levels) if depth is not None and depth < level]
+    elif _CHAPTER_RE.match(heading):
+        kept = []
+    else:
+        number = _heading_number(heading)
+        kept = []
+        for entry, depth in zip(path, levels):
+            if depth is not None or _CHAPTER_RE.match(entry):
+                kept.append((entry, depth))
+                continue
+            parent = _heading_number(entry)
+            if parent and (number is None or number.startswith(parent + ".")):
+                kept.append((entry, depth))
+    kept.append((heading, level))
+    return [entry for entry, _ in kept], [depth for _, depth in kept]
@@ -0,0 +1,235 @@
+"""
+Query embeddings with caching and micro-batching.
+
+- Backends are pluggable: GenAIEmbeddingBackend calls `embed_content`;
+  HashEmbeddingBackend is a deterministic local stand-in (feature hashing,
+  optional simulated latency) used to benchmark the cache/batcher offline.
+- EmbeddingCache keys vectors by (model, normalized query) in an in-memory
+  LRU backed by a sqlite file, so common questions survive restarts.
+- EmbeddingService merges concurrent misses into one batched backend call
+  (up to MAX_BATCH texts or MAX_WAIT_MS of waiting), and identical pending
+  queries share one request.
+"""
+import asyncio
+import hashlib
+import os
+import re
+import sqlite3
+import struct
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from src.lib.text_utils import tokenize
+
+MEMORY_ENTRIES = 2048
+MAX_BATCH = 32
+MAX_WAIT_MS = 10
+
+
+def normalize_query(text: str) -> str:
+    """Cache key form of a query: lowercased, single-spaced, without trailing punctuation."""
+    text = re.sub(r"\s+", " ", (text or "").strip().lower())
+    return text.rstrip("?!.,;: ")
+
+
+# --- backends -------------------------------------------------------------
+
+class GenAIEmbeddingBackend:
+    def __init__(self, client, model: str):
+        self.client = client
+        self.name = model
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        response = await self.client.aio.models.embed_content(model=self.name, contents=texts)
+        return [list(e.values) for e in response.embeddings]
+
+
+class HashEmbeddingBackend:
+    """Deterministic bag-of-words vectors via signed feature hashing. Not semantic; for offline benchmarks/tests."""
+
+    def __init__(self, dim: int = 768, latency_ms: float = 0.0):
+        self.dim = dim
+        self.latency_ms = latency_ms
+        self.name = f"hash-{dim}"
+        self.calls = 0
+
+    def _vector(self, text: str) -> List[float]:
+        vector = [0.0] * self.dim
+        for token in tokenize(text) or [""]:
+            digest = hashlib.sha1(token.encode("utf-8")).digest()
+            bucket = int.from_bytes(digest[:4], "little") % self.dim
+            vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+        norm = sum(v * v for v in vector) ** 0.5 or 1.0
+        return [v / norm for v in vector]
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        self.calls += 1
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+        return [self._vector(t) for t in texts]
+
+
+# --- cache ----------------------------------------------------------------
+
+def _cache_path() -> Optional[str]:
+    """EMBEDDING_CACHE_PATH overrides the sqlite file; an empty value disables the disk tier."""
+    path = os.getenv("EMBEDDING_CACHE_PATH")
+    if path is None:
+        path = os.path.join(tempfile.gettempdir(), "cloudinha_embeddings.sqlite")
+    return path or None
+
+
+def _pack(vector: List[float]) -> bytes:
+    return struct.pack(f"<{len(vector)}f", *vector)
+
+
+def _unpack(blob: bytes) -> List[float]:
+    return list(struct.unpack(f"<{len(blob) // 4}f", blob))
+
+
+class EmbeddingCache:
+    def __init__(self, path: str = None, max_entries: int = MEMORY_ENTRIES):
+        self.path = path if path is not None else _cache_path()
+        self.max_entries = max_entries
+        self._memory: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if self.path:
+            try:
+                self._db = sqlite3.connect(self.path, check_same_thread=False)
+                self._db.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB)")
+                self._db.commit()
+            except sqlite3.Error as e:
+                print(f"[Embeddings] Cache em disco indisponível ({self.path}): {e}")
+                self._db = None
+
+    @staticmethod
+    def key(model: str, query: str) -> str:
+        return f"{model}:{normalize_query(query)}"
+
+    def get(self, key: str) -> Optional[List[float]]:
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+            if not self._db:
+                return None
+            row = self._db.execute("SELECT vector FROM embeddings WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        vector = _unpack(row[0])
+        self._remember(key, vector)
+        return vector
+
+    def put_many(self, items: Dict[str, List[float]]):
+        for key, vector in items.items():
+            self._remember(key, vector)
+        if self._db and items:
+            with self._lock:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                    [(k, _pack(v)) for k, v in items.items()],
+                )
+                self._db.commit()
+
+    def _remember(self, key: str, vector: List[float]):
+        with self._lock:
+            self._memory[key] = vector
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+
+# --- service --------------------------------------------------------------
+
+class EmbeddingService:
+    def __init__(self, backend, cache: EmbeddingCache = None, max_batch: int = MAX_BATCH, max_wait_ms: float = MAX_WAIT_MS):
+        self.backend = backend
+        self.cache = cache if cache is not None else EmbeddingCache()
+        self.max_batch = max_batch
+        self.max_wait_ms = max_wait_ms
+        self._pending: Dict[str, "asyncio.Future"] = {}
+        self._queue: List[tuple] = []  # (key, text)
+        self._flusher: Optional[asyncio.Task] = None
+        self._loop = None
+        self._tasks = set()  # in-flight batches (kept referenced until done)
+        self.stats = {"requests": 0, "cache_hits": 0, "shared": 0, "batches": 0, "embedded": 0}
+
+    async def embed_query(self, text: str) -> List[float]:
+        self.stats["requests"] += 1
+        key = EmbeddingCache.key(self.backend.name, text)
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.stats["cache_hits"] += 1
+            return cached
+
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Batcher state belongs to one event loop
+            self._loop, self._pending, self._queue, self._flusher = loop, {}, [], None
+
+        future = self._pending.get(key)
+        if future is not None:
+            self.stats["shared"] += 1
+            return await asyncio.shield(future)
+
+        future = loop.create_future()
+        self._pending[key] = future
+        self._queue.append((key, text))
+        if len(self._queue) >= self.max_batch:
+            self._flush()
+        elif self._flusher is None:
+            self._flusher = loop.create_task(self._flush_later())
+        return await asyncio.shield(future)
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.max_wait_ms / 1000)
+        self._flusher = None
+        self._flush()
+
+    def _flush(self):
+        batch, self._queue = self._queue[: self.max_batch], self._queue[self.max_batch:]
+        if self._queue and self._flusher is None:
+            self._flusher = self._loop.create_task(self._flush_later())
+        if batch:
+            task = self._loop.create_task(self._run_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch: List[tuple]):
+        keys = [key for key, _ in batch]
+        self.stats["batches"] += 1
+        try:
+            vectors = await self.backend.embed([text for _, text in batch])
+        except Exception as e:
+            for key in keys:
+                future = self._pending.pop(key, None)
+                if future and not future.done():
+                    future.set_exception(e)
+            return
+
+        self.stats["embedded"] += len(vectors)
+        self.cache.put_many(dict(zip(keys, vectors)))
+        for key, vector in zip(keys, vectors):
+            future = self._pending.pop(key, None)
+            if future and not future.done():
+                future.set_result(vector)
+
+
+_service: Optional[EmbeddingService] = None
+
+
+def get_embedding_service(client=None, model: str = None) -> Optional[EmbeddingService]:
+    """
+    Shared service. EMBEDDING_BACKEND=hash selects the offline stand-in;
+    otherwise a GenAI client and model are required (returns None without them).
+    """
+    global _service
+    if _service is None:
+        if os.getenv("EMBEDDING_BACKEND") == "hash":
+            _service = EmbeddingService(HashEmbeddingBackend())
+        elif client is not None and model:
+            _service = EmbeddingService(GenAIEmbeddingBackend(client, model))
+    return _service
@@ -0,0 +1,154 @@
+"""
+BM25 passage index over every active knowledge-base document.
+
+Each document from `knowledge_documents` is split into heading sections
+(knowledge_sections) and each section becomes a BM25 passage carrying the
+document's category and partner. The index is built on first use and then
+refreshed incrementally: only documents whose content changed are
+re-indexed, and documents that became inactive are removed.
+
+Content comes from knowledge_store, so refreshing costs no downloads for
+documents that are already cached.
+"""
+import hashlib
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from src.lib.supabase import supabase
+from src.lib.bm25 import BM25Index
+from src.lib.knowledge_store import knowledge_store
+from src.lib.knowledge_sections import split_sections, section_search_text
+
+REFRESH_SECONDS = 300
+# After a failed refresh, wait this long before trying again (stale index is kept)
+RETRY_SECONDS = 30
+
+
+class KnowledgeIndex:
+    def __init__(self):
+        self._bm25 = BM25Index()
+        # storage_path -> {"sha1", "ids": [passage ids], "category", "partner_id"}
+        self._docs: Dict[str, Dict[str, Any]] = {}
+        self._loaded_at = 0.0
+        self._loaded = False  # at least one successful refresh
+        self._refresh_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._bm25)
+
+    def refresh(self, force: bool = False):
+        """Re-reads the active document list and re-indexes only what changed."""
+        if not force and time.time() - self._loaded_at < REFRESH_SECONDS:
+            return
+        with self._refresh_lock:
+            if not force and time.time() - self._loaded_at < REFRESH_SECONDS:
+                return
+            try:
+                self._refresh()
+            except Exception as e:
+                print(f"[KnowledgeIndex] Falha ao atualizar o índice: {e}")
+                self._loaded_at = time.time() - REFRESH_SECONDS + RETRY_SECONDS
+
+    def _refresh(self):
+        started = time.perf_counter()
+
+        docs = (
+            supabase.table("knowledge_documents")
+            .select("title, storage_path, partner_id, category_id")
+            .eq("is_active", True)
+            .execute()
+        ).data or []
+        categories = {
+            c["id"]: (c.get("name") or "").lower()
+            for c in (supabase.table("knowledge_categories").select("id, name").execute().data or [])
+        }
+        contents = knowledge_store.read_many(supabase, [d["storage_path"] for d in docs])
+
+        seen, changed = set(), 0
+        for doc in docs:
+            path = doc["storage_path"]
+            text = contents.get(path)
+            seen.add(path)
+            if text is None:
+                continue  # download failed: keep whatever was indexed before
+            digest = hashlib.sha1(text.encode("utf-8")).hexdigest()
+            if self._docs.get(path, {}).get("sha1") == digest:
+                continue
+            self._index_document(doc, text, digest, categories.get(doc.get("category_id")))
+            changed += 1
+
+        for path in set(self._docs) - seen:
+            self._remove_document(path)
+
+        self._loaded_at = time.time()
+        self._loaded = True
+        print(f"[KnowledgeIndex] {len(seen)} documentos, {changed} reindexados, {len(self._bm25)} passagens ({(time.perf_counter() - started) * 1000:.0f} ms).")
+
+    def _index_document(self, doc: Dict[str, Any], text: str, digest: str, category: Optional[str]):
+        path = doc["storage_path"]
+        self._remove_document(path)
+        ids = []
+        for section in split_sections(f"=== {doc['title']} ===\n\n{text}"):
+            passage_id = f"{path}#{section['order']}"
+            self._bm25.add(passage_id, section_search_text(section), meta={
+                "title": doc["title"],
+                "heading": section["heading"],
+                "text": section["text"],
+                "storage_path": path,
+                "category": category,
+                "partner_id": doc.get("partner_id"),
+            })
+            ids.append(passage_id)
+        self._docs[path] = {"sha1": digest, "ids": ids, "category": category, "partner_id": doc.get("partner_id")}
+
+    def _remove_document(self, path: str):
+        entry = self._docs.pop(path, None)
+        for passage_id in (entry or {}).get("ids", []):
+            self._bm25.remove(passage_id)
+
+    def search(self, query: str, k: int = 5, category: str = None, partner_ids: List[str] = None) -> List[Dict[str, Any]]:
+        """Top-k passages [{"score", "title", "heading", "text", "category", "partner_id", "storage_path"}]."""
+        self.refresh()
+        category = category.lower() if category else None
+
+        def where(meta):
+            if category and meta["category"] != category:
+                return False
+            if partner_ids and meta["partner_id"] not in partner_ids:
+                return False
+            return True
+
+        hits = self._bm25.search(query, k=k, where=where if (category or partner_ids) else None)
+        return [{"score": hit["score"], **hit["meta"]} for hit in hits]
+
+    def has_documents(self, category: str = None, partner_ids: List[str] = None) -> Optional[bool]:
+        """
+        Whether any indexed document matches the category/partners, without
+        refreshing (no I/O). None while the index has never been loaded.
+        """
+        if not self._loaded:
+            return None
+        category = category.lower() if category else None
+        return any(
+            (not category or doc["category"] == category) and (not partner_ids or doc["partner_id"] in partner_ids)
+            for doc in list(self._docs.values())
+        )
+
+    def version(self) -> Optional[str]:
+        """
+        Fingerprint of the indexed documents' contents, without refreshing
+        (no I/O). Changes whenever a document is edited, added or removed;
+        None while the index has never been loaded.
+        """
+        if not self._loaded:
+            return None
+        digests = sorted(f"{path}:{doc['sha1']}" for path, doc in list(self._docs.items()))
+        return hashlib.sha1("\n".join(digests).encode("utf-8")).hexdigest()
+
+    def invalidate(self):
+        """Forces the next search to re-read the document list."""
+        self._loaded_at = 0.0
+
+
+knowledge_index = KnowledgeIndex()
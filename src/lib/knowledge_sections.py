@@ -0,0 +1,182 @@
+"""
+Heading-level sections of knowledge-base documents.
+
+getKnowledgeContentTool returns documents as `=== Title ===` blocks of
+Markdown. Here that text is split once into sections (document title +
+heading breadcrumb + body), cached by content hash together with a BM25
+index over the sections, and ranked against a query so research tools can
+return only the relevant parts under a budget instead of whole documents.
+"""
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List
+
+from src.lib.bm25 import BM25Index
+
+# Sections longer than this are split again on paragraph boundaries
+MAX_SECTION_CHARS = 2500
+# Section indexes kept in memory (one per distinct document text)
+MAX_CACHED_INDEXES = 64
+
+_DOC_RE = re.compile(r"^=== (.+?) ===\s*$")
+_HEADING_RE = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+_DOC_SEPARATOR = "\n\n---\n\n"
+
+# content hash -> {"sections": [...], "bm25": BM25Index}
+_INDEX_CACHE: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def _chunk_body(body: str, limit: int) -> List[str]:
+    if len(body) <= limit:
+        return [body]
+    chunks, current = [], ""
+    for paragraph in re.split(r"\n\s*\n", body):
+        if current and len(current) + len(paragraph) + 2 > limit:
+            chunks.append(current)
+            current = paragraph
+        else:
+            current = f"{current}\n\n{paragraph}" if current else paragraph
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def split_sections(text: str, max_chars: int = MAX_SECTION_CHARS) -> List[Dict[str, Any]]:
+    """
+    Splits document text into sections.
+
+    Each section: {"doc", "path" (heading breadcrumb), "heading", "text", "order"}.
+    """
+    sections: List[Dict[str, Any]] = []
+    doc_title = ""
+    stack: List[tuple] = []  # (level, heading)
+    lines: List[str] = []
+
+    def flush():
+        body = "\n".join(lines).strip()
+        lines.clear()
+        if not body or body == "---":
+            return
+        path = [h for _, h in stack]
+        heading = " > ".join(path)
+        for part in _chunk_body(body, max_chars):
+            sections.append({
+                "doc": doc_title,
+                "path": path,
+                "heading": heading,
+                "text": part,
+                "order": len(sections),
+            })
+
+    for line in text.splitlines():
+        doc_match = _DOC_RE.match(line)
+        if doc_match:
+            flush()
+            doc_title = doc_match.group(1).strip()
+            stack = []
+            continue
+        heading_match = _HEADING_RE.match(line)
+        if heading_match:
+            flush()
+            level = len(heading_match.group(1))
+            while stack and stack[-1][0] >= level:
+                stack.pop()
+            stack.append((level, heading_match.group(2).strip()))
+            continue
+        if line.strip() == "---" and not lines:
+            continue
+        lines.append(line)
+    flush()
+    return sections
+
+
+def section_search_text(section: Dict[str, Any]) -> str:
+    # Headings are repeated so that a match in the title outweighs one in the body
+    return f"{section['doc']} {section['heading']} {section['heading']} {section['text']}"
+
+
+def build_section_bm25(sections: List[Dict[str, Any]]) -> BM25Index:
+    index = BM25Index()
+    for section in sections:
+        index.add(section["order"], section_search_text(section))
+    return index
+
+
+def _get_entry(text: str) -> Dict[str, Any]:
+    key = hashlib.sha1(text.encode("utf-8")).hexdigest()
+    with _lock:
+        if key in _INDEX_CACHE:
+            _INDEX_CACHE.move_to_end(key)
+            return _INDEX_CACHE[key]
+
+    sections = split_sections(text)
+    entry = {"sections": sections, "bm25": build_section_bm25(sections)}
+    with _lock:
+        _INDEX_CACHE[key] = entry
+        while len(_INDEX_CACHE) > MAX_CACHED_INDEXES:
+            _INDEX_CACHE.popitem(last=False)
+    return entry
+
+
+def get_section_index(text: str) -> List[Dict[str, Any]]:
+    """Cached split_sections, keyed by content hash."""
+    return _get_entry(text)["sections"]
+
+
+def rank_sections(sections: List[Dict[str, Any]], query: str, index: BM25Index = None) -> List[tuple]:
+    """Returns [(score, section)] sorted by descending BM25 relevance to the query."""
+    if not sections:
+        return []
+    index = index or build_section_bm25(sections)
+    scores = index.scores(query)
+    scored = [(scores.get(section["order"], 0.0), section) for section in sections]
+    scored.sort(key=lambda item: (-item[0], item[1]["order"]))
+    return scored
+
+
+def format_section(section: Dict[str, Any]) -> str:
+    label = " > ".join(p for p in [section["doc"]] + section["path"] if p)
+    return f"### {label}\n\n{section['text']}" if label else section["text"]
+
+
+def select_sections(text: str, query: str, budget_chars: int) -> Dict[str, Any]:
+    """
+    Picks the sections most relevant to `query` that fit in `budget_chars`.
+
+    Returns {"text", "trimmed" (bool), "sections" (count kept), "total_sections"}.
+    Text that already fits the budget is returned unchanged.
+    """
+    if len(text) <= budget_chars:
+        return {"text": text, "trimmed": False, "sections": None, "total_sections": None}
+
+    entry = _get_entry(text)
+    sections = entry["sections"]
+    ranked = rank_sections(sections, query, entry["bm25"])
+    matched = bool(ranked) and ranked[0][0] > 0
+    # No query term matched anything: keep document order (introductions first)
+    if not matched:
+        ranked = [(0.0, s) for s in sections]
+
+    chosen, used = [], 0
+    for score, section in ranked:
+        if matched and score == 0:
+            break
+        block = format_section(section)
+        if used + len(block) > budget_chars:
+            if not chosen:
+                chosen.append((section, block[:budget_chars]))
+                used = budget_chars
+            continue
+        chosen.append((section, block))
+        used += len(block) + len(_DOC_SEPARATOR)
+
+    chosen.sort(key=lambda item: item[0]["order"])
+    return {
+        "text": _DOC_SEPARATOR.join(block for _, block in chosen),
+        "trimmed": True,
+        "sections": len(chosen),
+        "total_sections": len(sections),
+    }
@@ -0,0 +1,239 @@
+"""
+Local cache for documents of the `knowledge-base` storage bucket.
+
+Documents are kept in memory and on local disk. Disk files are content
+addressed (`<sha256>.md`) and an `index.json` maps each storage path to the
+eTag reported by the bucket listing plus the content hash.
+
+- Memory hits younger than REVALIDATE_SECONDS are served directly.
+- Older memory hits are served immediately and revalidated in the background.
+- Disk hits (cold process) are validated with one listing call per folder
+  before being served; only changed documents are downloaded again.
+- Misses are downloaded concurrently.
+
+The Supabase client is passed in by the caller so tools keep using (and tests
+keep patching) their own module-level client.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional
+
+BUCKET = "knowledge-base"
+REVALIDATE_SECONDS = 300
+MAX_WORKERS = 8
+LIST_LIMIT = 1000
+
+
+def _cache_dir() -> Optional[str]:
+    """KNOWLEDGE_CACHE_DIR overrides the location; an empty value disables the disk layer."""
+    path = os.getenv("KNOWLEDGE_CACHE_DIR")
+    if path is None:
+        path = os.path.join(tempfile.gettempdir(), "cloudinha_knowledge")
+    return path or None
+
+
+def _split(storage_path: str):
+    folder, _, name = storage_path.rpartition("/")
+    return folder, name
+
+
+class KnowledgeStore:
+    def __init__(self, bucket: str = BUCKET):
+        self.bucket = bucket
+        # storage_path -> {"etag", "sha256", "text", "checked_at"}
+        self._memory: Dict[str, Dict[str, Any]] = {}
+        self._index: Optional[Dict[str, Dict[str, str]]] = None
+        self._index_dir: Optional[str] = None
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="knowledge-store")
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "downloads": 0, "revalidations": 0}
+
+    # --- public API -------------------------------------------------------
+
+    def read_many(self, client, storage_paths: Iterable[str]) -> Dict[str, Optional[str]]:
+        """Returns {storage_path: text or None (download failed)} for the given paths."""
+        paths = list(dict.fromkeys(storage_paths))
+        results: Dict[str, Optional[str]] = {}
+        stale, cold = [], []
+        now = time.time()
+
+        with self._lock:
+            for path in paths:
+                entry = self._memory.get(path)
+                if entry:
+                    results[path] = entry["text"]
+                    self.stats["memory_hits"] += 1
+                    if now - entry["checked_at"] >= REVALIDATE_SECONDS:
+                        stale.append(path)
+                else:
+                    cold.append(path)
+
+        if stale:
+            self._revalidate_in_background(client, stale)
+
+        if cold:
+            etags = self._list_etags(client, cold)
+            to_download = []
+            for path in cold:
+                text = self._read_disk(path, etags.get(path))
+                if text is not None:
+                    results[path] = text
+                else:
+                    to_download.append(path)
+            if to_download:
+                results.update(self._download_many(client, to_download, etags))
+
+        return results
+
+    def read(self, client, storage_path: str) -> Optional[str]:
+        return self.read_many(client, [storage_path]).get(storage_path)
+
+    def invalidate(self, storage_path: str = None):
+        """Drops a document (or everything) from memory; disk entries are revalidated by eTag on next read."""
+        with self._lock:
+            if storage_path is None:
+                self._memory.clear()
+            else:
+                self._memory.pop(storage_path, None)
+
+    # --- storage ----------------------------------------------------------
+
+    def _list_etags(self, client, paths: List[str]) -> Dict[str, str]:
+        """One bucket listing per folder; returns {storage_path: eTag} for the files found."""
+        wanted: Dict[str, set] = {}
+        for path in paths:
+            folder, name = _split(path)
+            wanted.setdefault(folder, set()).add(name)
+
+        etags = {}
+        for folder, names in wanted.items():
+            try:
+                items = client.storage.from_(self.bucket).list(folder, {"limit": LIST_LIMIT})
+                for item in items or []:
+                    name = item.get("name") if isinstance(item, dict) else None
+                    if name not in names:
+                        continue
+                    etag = (item.get("metadata") or {}).get("eTag")
+                    if etag:
+                        etags[f"{folder}/{name}" if folder else name] = etag
+            except Exception as e:
+                print(f"[KnowledgeStore] Falha ao listar '{folder}': {e}")
+        return etags
+
+    def _download(self, client, path: str) -> bytes:
+        return client.storage.from_(self.bucket).download(path)
+
+    def _download_many(self, client, paths: List[str], etags: Dict[str, str]) -> Dict[str, Optional[str]]:
+        futures = {path: self._executor.submit(self._download, client, path) for path in paths}
+        results = {}
+        for path, future in futures.items():
+            try:
+                raw = future.result()
+            except Exception as e:
+                print(f"[KnowledgeStore] Erro ao baixar '{path}': {e}")
+                results[path] = None
+                continue
+            results[path] = self._store(path, raw, etags.get(path))
+        return results
+
+    def _revalidate_in_background(self, client, paths: List[str]):
+        with self._lock:
+            paths = [p for p in paths if p not in self._refreshing]
+            self._refreshing.update(paths)
+        if paths:
+            self._executor.submit(self._revalidate, client, paths)
+
+    def _revalidate(self, client, paths: List[str]):
+        try:
+            etags = self._list_etags(client, paths)
+            changed = []
+            now = time.time()
+            with self._lock:
+                self.stats["revalidations"] += 1
+                for path in paths:
+                    entry = self._memory.get(path)
+                    if entry and etags.get(path) and etags[path] == entry["etag"]:
+                        entry["checked_at"] = now
+                    else:
+                        changed.append(path)
+            # Already on a pool thread: download inline rather than waiting on the same pool
+            for path in changed:
+                try:
+                    self._store(path, self._download(client, path), etags.get(path))
+                except Exception as e:
+                    print(f"[KnowledgeStore] Erro ao revalidar '{path}': {e}")
+        finally:
+            with self._lock:
+                self._refreshing.difference_update(paths)
+
+    # --- memory / disk ----------------------------------------------------
+
+    def _store(self, path: str, raw: bytes, etag: Optional[str]) -> str:
+        sha = hashlib.sha256(raw).hexdigest()
+        # Use 'replace' to avoid UnicodeDecodeError if there's any corruption
+        text = raw.decode("utf-8", errors="replace")
+        with self._lock:
+            self.stats["downloads"] += 1
+            self._memory[path] = {"etag": etag, "sha256": sha, "text": text, "checked_at": time.time()}
+        self._write_disk(path, sha, etag, text)
+        return text
+
+    def _load_index(self, directory: str) -> Dict[str, Dict[str, str]]:
+        if self._index is None or self._index_dir != directory:
+            self._index_dir = directory
+            try:
+                with open(os.path.join(directory, "index.json"), encoding="utf-8") as f:
+                    self._index = json.load(f)
+            except (OSError, ValueError):
+                self._index = {}
+        return self._index
+
+    def _read_disk(self, path: str, etag: Optional[str]) -> Optional[str]:
+        """Serves a disk entry only when its recorded eTag matches the bucket's current one."""
+        directory = _cache_dir()
+        if not directory or not etag:
+            return None
+        with self._lock:
+            record = self._load_index(directory).get(path)
+        if not record or record.get("etag") != etag:
+            return None
+        try:
+            with open(os.path.join(directory, f"{record['sha256']}.md"), encoding="utf-8") as f:
+                text = f.read()
+        except OSError:
+            return None
+        with self._lock:
+            self.stats["disk_hits"] += 1
+            self._memory[path] = {"etag": etag, "sha256": record["sha256"], "text": text, "checked_at": time.time()}
+        return text
+
+    def _write_disk(self, path: str, sha: str, etag: Optional[str], text: str):
+        directory = _cache_dir()
+        if not directory:
+            return
+        try:
+            os.makedirs(directory, exist_ok=True)
+            blob = os.path.join(directory, f"{sha}.md")
+            if not os.path.exists(blob):
+                tmp = f"{blob}.{threading.get_ident()}.tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    f.write(text)
+                os.replace(tmp, blob)
+            with self._lock:
+                index = self._load_index(directory)
+                index[path] = {"etag": etag, "sha256": sha}
+                tmp = os.path.join(directory, f"index.json.{threading.get_ident()}.tmp")
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(index, f)
+                os.replace(tmp, os.path.join(directory, "index.json"))
+        except OSError as e:
+            print(f"[KnowledgeStore] Falha ao gravar cache em disco: {e}")
+
+
+knowledge_store = KnowledgeStore()
@@ -0,0 +1,156 @@
+"""
+Process-wide cache of partner application settings.
+
+Partners, their external redirect config and their form mapping sources change
+only when an admin edits them, so they are loaded in a single embedded query
+(`partners` + `partner_forms`) and kept in memory with a TTL instead of being
+re-queried on every tool call.
+"""
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from src.lib.supabase import supabase
+
+CACHE_TTL_SECONDS = 300  # 5 minutes
+
+_PARTNER_SELECT = "id, name, external_redirect_config, partner_forms(field_name, mapping_source)"
+
+# partner_id -> {"data": {...}, "timestamp": float}
+_PARTNER_CACHE: Dict[str, Dict[str, Any]] = {}
+_lock = threading.Lock()
+
+
+def _build_entry(row: Dict[str, Any]) -> Dict[str, Any]:
+    forms = row.get("partner_forms") or []
+    mappings = [
+        {"field_name": f.get("field_name"), "mapping_source": f.get("mapping_source")}
+        for f in forms
+        if f.get("field_name") and f.get("mapping_source")
+    ]
+    return {
+        "id": row["id"],
+        "name": row.get("name"),
+        "external_redirect_config": row.get("external_redirect_config"),
+        "has_form": bool(forms),
+        "mappings": mappings,
+    }
+
+
+def _get_cached(partner_id: str) -> Optional[Dict[str, Any]]:
+    with _lock:
+        entry = _PARTNER_CACHE.get(partner_id)
+        if entry and time.time() - entry["timestamp"] < CACHE_TTL_SECONDS:
+            return entry["data"]
+        if entry:
+            del _PARTNER_CACHE[partner_id]  # Expired
+    return None
+
+
+def _set_cached(data: Dict[str, Any]):
+    with _lock:
+        _PARTNER_CACHE[data["id"]] = {"data": data, "timestamp": time.time()}
+
+
+def get_partner_application_config(partner_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Returns the application settings for a partner UUID.
+    Names should be resolved first with `src.lib.partner_directory`.
+
+    Result keys: id, name, external_redirect_config, has_form, mappings
+    (list of {field_name, mapping_source} with a non-empty mapping_source).
+    Returns None if the partner does not exist.
+    """
+    if not partner_id:
+        return None
+
+    cached = _get_cached(str(partner_id))
+    if cached:
+        return cached
+
+    res = supabase.table("partners").select(_PARTNER_SELECT).eq("id", str(partner_id)).execute()
+    if not res.data:
+        return None
+
+    data = _build_entry(res.data[0])
+    _set_cached(data)
+    return data
+
+
+def invalidate_partner_cache(partner_id: str = None):
+    """Drops one partner (or every partner when omitted) from the cache."""
+    with _lock:
+        if partner_id is None:
+            _PARTNER_CACHE.clear()
+        else:
+            _PARTNER_CACHE.pop(str(partner_id), None)
+
+
+# ============================================================
+# Partner form schemas (grouped by step)
+# ============================================================
+
+_FORM_SELECT = (
+    "field_name, question_text, data_type, options, mapping_source, is_criterion, "
+    "sort_order, maskking, step_id, partner_steps(step_name, sort_order)"
+)
+
+# partner_id -> {"data": {...}, "timestamp": float}
+_FORM_SCHEMA_CACHE: Dict[str, Dict[str, Any]] = {}
+
+
+def _group_by_step(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    steps: Dict[Any, Dict[str, Any]] = {}
+    for item in sorted(rows, key=lambda r: r.get("sort_order") or 0):
+        item = dict(item)
+        step_info = item.pop("partner_steps", None) or {}
+        item["step_name"] = step_info.get("step_name")
+        step = steps.setdefault(item.get("step_id"), {
+            "step_id": item.get("step_id"),
+            "step_name": item["step_name"],
+            "sort_order": step_info.get("sort_order", 0) or 0,
+            "fields": [],
+        })
+        step["fields"].append(item)
+
+    ordered = sorted(steps.values(), key=lambda s: (s["sort_order"], s["step_name"] or ""))
+    return {
+        "steps": ordered,
+        "fields": [f for s in ordered for f in s["fields"]],
+    }
+
+
+def get_partner_form_schema(partner_id: str) -> Dict[str, Any]:
+    """
+    Returns the partner form grouped by step, loaded once per partner and cached.
+
+    Result keys:
+        steps: [{step_id, step_name, sort_order, fields: [...]}] ordered by step sort_order
+        fields: every field (with `step_name`) in step/field order
+    """
+    with _lock:
+        entry = _FORM_SCHEMA_CACHE.get(str(partner_id))
+        if entry and time.time() - entry["timestamp"] < CACHE_TTL_SECONDS:
+            return entry["data"]
+
+    res = (
+        supabase
+        .table("partner_forms")
+        .select(_FORM_SELECT)
+        .eq("partner_id", str(partner_id))
+        .order("sort_order")
+        .execute()
+    )
+    data = _group_by_step(res.data or [])
+    with _lock:
+        _FORM_SCHEMA_CACHE[str(partner_id)] = {"data": data, "timestamp": time.time()}
+    return data
+
+
+def invalidate_form_schema_cache(partner_id: str = None):
+    """Drops one partner's form schema (or all of them when omitted) from the cache."""
+    with _lock:
+        if partner_id is None:
+            _FORM_SCHEMA_CACHE.clear()
+        else:
+            _FORM_SCHEMA_CACHE.pop(str(partner_id), None)
@@ -0,0 +1,217 @@
+"""
+Per-partner knowledge digests.
+
+A digest is a compact, structured summary of a partner's documents, with
+short extractive bullets for eligibility, dates, benefits, process and links.
+Digests are built offline (scripts/build_partner_digests.py) and stored next
+to the knowledge documents, in `digests/partners.json` of the
+`knowledge-base` bucket. At query time they are read through knowledge_store,
+so they are cached locally and revalidated by eTag.
+
+smartResearch answers partner questions from the digest when
+`digest_answers()` says the digest covers the question. Otherwise it falls
+back to the full documents.
+"""
+import hashlib
+import json
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from src.lib.bm25 import analyze
+from src.lib.knowledge_sections import split_sections
+from src.lib.knowledge_store import knowledge_store, BUCKET
+
+DIGESTS_PATH = "digests/partners.json"
+MAX_ITEMS = 4
+ITEM_CHARS = 240
+# After a failed read (no digests published yet), wait this long before trying again
+RETRY_SECONDS = 60
+
+# field -> (title, document vocabulary, question vocabulary)
+FIELDS = {
+    "eligibility": (
+        "Elegibilidade",
+        "requisito requisitos critério critérios elegibilidade elegível renda per capita salário mínimo idade "
+        "escola pública rede pública cursando matriculado matriculados série ano ensino fundamental médio podem participar",
+        "requisito requisitos quem pode posso participar renda idade critério critérios elegível exigência exigências "
+        "série ano escola pública",
+    ),
+    "dates": (
+        "Datas",
+        "prazo prazos inscrições período cronograma data datas previsto prevista",
+        "quando prazo prazos data datas cronograma abrem encerram termina período dia",
+    ),
+    "benefits": (
+        "Benefícios",
+        "bolsa bolsas benefício benefícios oferece oferecemos auxílio mentoria custeio mensalidade financeiro "
+        "aulas curso cursinho formação transporte alimentação material",
+        "benefício benefícios oferece oferecem ganha ganho auxílio cobre valor mentoria vantagens bolsa",
+    ),
+    "process": (
+        "Processo seletivo",
+        "etapa etapas seleção processo seletivo inscrição inscrever prova entrevista dinâmica painel avaliação "
+        "resultado eliminatória classificação",
+        "etapa etapas processo seletivo seleção prova entrevista inscrever inscrição funciona passo",
+    ),
+    "links": (
+        "Links",
+        "",
+        "site link links página endereço contato email e-mail",
+    ),
+}
+
+_URL_RE = re.compile(r"https?://[^\s)\]>\"']+|www\.[^\s)\]>\"']+|[\w.+-]+@[\w-]+\.[\w.]+")
+_DATE_RE = re.compile(
+    r"\b\d{1,2}/\d{1,2}(?:/\d{2,4})?\b|\b\d{1,2}º? de (?:janeiro|fevereiro|março|abril|maio|junho|julho|agosto|setembro|outubro|novembro|dezembro)\b",
+    re.I,
+)
+_UNIT_SPLIT_RE = re.compile(r"\n\s*[-*•●]\s+|\n{2,}|(?<=[.;!?])\s+(?=[A-ZÁÉÍÓÚÂÊÔÃÕÇ])")
+
+_DOC_TERMS = {field: set(analyze(spec[1])) for field, spec in FIELDS.items()}
+_QUERY_TERMS = {field: set(analyze(spec[2])) for field, spec in FIELDS.items()}
+# Words that name the partner/program rather than ask something about it
+_GENERIC_TERMS = set(analyze("programa programas parceiro parceiros instituto fundação edital regulamento"))
+
+
+# --- building (offline) ---------------------------------------------------
+
+def _units(text: str) -> List[Dict[str, Any]]:
+    """Bullets/sentences of the text with their heading, in document order."""
+    units = []
+    for section in split_sections(text):
+        for raw in _UNIT_SPLIT_RE.split("\n" + section["text"]):
+            sentence = re.sub(r"[*_#`]+", "", " ".join(raw.split())).strip(" -•●")
+            if len(sentence) >= 20:
+                units.append({"text": sentence, "heading": section["heading"], "terms": set(analyze(sentence))})
+    return units
+
+
+def _shorten(text: str, limit: int = ITEM_CHARS) -> str:
+    if len(text) <= limit:
+        return text
+    return text[:limit].rsplit(" ", 1)[0].rstrip(",;:") + "…"
+
+
+def build_digest(partner_id: str, partner_name: str, text: str) -> Dict[str, Any]:
+    """Extractive digest of a partner's documents: {"partner_id", "partner_name", "fields", "source_sha256", ...}."""
+    units = _units(text)
+    heading_terms = {}
+    candidates: Dict[str, List[tuple]] = {field: [] for field in FIELDS if field != "links"}
+
+    for position, unit in enumerate(units):
+        heading = heading_terms.setdefault(unit["heading"], set(analyze(unit["heading"])))
+        best, best_score = None, 0.0
+        for field in candidates:
+            score = len(unit["terms"] & _DOC_TERMS[field]) + 2 * len(heading & _DOC_TERMS[field])
+            if field == "dates":
+                score = score + 3 if _DATE_RE.search(unit["text"]) else 0
+            if score > best_score:
+                best, best_score = field, score
+        if best:
+            candidates[best].append((best_score, position, _shorten(unit["text"])))
+
+    fields: Dict[str, List[str]] = {}
+    for field, scored in candidates.items():
+        top = sorted(scored, key=lambda item: (-item[0], item[1]))[:MAX_ITEMS]
+        seen, items = set(), []
+        for _, _, item in sorted(top, key=lambda item: item[1]):
+            if item not in seen:
+                seen.add(item)
+                items.append(item)
+        fields[field] = items
+    fields["links"] = list(dict.fromkeys(m.rstrip(".,;") for m in _URL_RE.findall(text)))[:MAX_ITEMS]
+
+    return {
+        "partner_id": partner_id,
+        "partner_name": partner_name,
+        "fields": fields,
+        "source_sha256": hashlib.sha256(text.encode("utf-8")).hexdigest(),
+        "source_chars": len(text),
+        "built_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+
+
+def format_digest(digest: Dict[str, Any], fields: List[str] = None) -> str:
+    """Markdown rendering of a digest, optionally limited to some fields."""
+    lines = [f"RESUMO DO PARCEIRO: {digest['partner_name']} (gerado em {digest['built_at'][:10]})"]
+    for field in fields or FIELDS:
+        items = digest["fields"].get(field) or []
+        if items:
+            lines.append(f"\n## {FIELDS[field][0]}")
+            lines.extend(f"- {item}" for item in items)
+    return "\n".join(lines)
+
+
+# --- answering ------------------------------------------------------------
+
+def query_fields(query: str) -> List[str]:
+    """Digest fields a question asks about (e.g. 'quando abrem as inscrições' -> dates, process)."""
+    terms = set(analyze(query))
+    return [field for field in FIELDS if terms & _QUERY_TERMS[field]]
+
+
+def digest_answers(digest: Dict[str, Any], query: str, partner_name: str = None) -> bool:
+    """
+    Whether the digest is likely to answer `query`: every field the question
+    asks about has content, and most of the remaining content words of the
+    question appear in the digest.
+    """
+    asked = query_fields(query)
+    if asked and not all(digest["fields"].get(field) for field in asked):
+        return False
+
+    generic = set().union(*(_QUERY_TERMS[f] for f in asked)) if asked else set()
+    generic |= _GENERIC_TERMS | set(analyze(partner_name or digest.get("partner_name") or ""))
+    remaining = set(analyze(query)) - generic
+    if not remaining:
+        return bool(asked)
+
+    digest_terms = set(analyze(format_digest(digest)))
+    coverage = len(remaining & digest_terms) / len(remaining)
+    return coverage >= (0.5 if asked else 0.8)
+
+
+# --- storage --------------------------------------------------------------
+
+class PartnerDigests:
+    def __init__(self, path: str = DIGESTS_PATH):
+        self.path = path
+        self._parsed: Optional[tuple] = None  # (content sha1, {partner_id: digest})
+        self._retry_at = 0.0
+        self._lock = threading.Lock()
+
+    def all(self, client) -> Dict[str, Dict[str, Any]]:
+        if time.time() < self._retry_at:
+            return {}
+        raw = knowledge_store.read(client, self.path)
+        if raw is None:
+            self._retry_at = time.time() + RETRY_SECONDS
+            return {}
+        key = hashlib.sha1(raw.encode("utf-8")).hexdigest()
+        with self._lock:
+            if self._parsed and self._parsed[0] == key:
+                return self._parsed[1]
+        try:
+            digests = json.loads(raw).get("partners", {})
+        except ValueError as e:
+            print(f"[PartnerDigests] Arquivo de resumos inválido: {e}")
+            digests = {}
+        with self._lock:
+            self._parsed = (key, digests)
+        return digests
+
+    def get(self, client, partner_id: str) -> Optional[Dict[str, Any]]:
+        return self.all(client).get(str(partner_id)) if partner_id else None
+
+    def save(self, client, digests: Dict[str, Dict[str, Any]]):
+        """Publishes all digests (used by the offline builder)."""
+        payload = json.dumps({"partners": digests}, ensure_ascii=False, indent=1).encode("utf-8")
+        client.storage.from_(BUCKET).upload(self.path, payload, {"content-type": "application/json", "upsert": "true"})
+        knowledge_store.invalidate(self.path)
+        self._retry_at = 0.0
+
+
+partner_digests = PartnerDigests()
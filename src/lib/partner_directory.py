@@ -0,0 +1,225 @@
+"""
+Process-wide partner directory with local fuzzy name resolution.
+
+The `partners` table is small and rarely edited, so it is loaded once (and
+refreshed after a TTL, also when it is empty) and indexed in memory. Names, partial names and acronyms
+("Insper", "Behring", "Estudar", "FE") are resolved to partner ids without a
+database round-trip, replacing the per-tool `ilike '%name%'` queries.
+"""
+import bisect
+import math
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from src.lib.supabase import supabase
+from src.lib.text_utils import fold, tokenize, NAME_STOP_WORDS
+
+DIRECTORY_TTL_SECONDS = 300  # 5 minutes
+
+# Below this score a partner is not considered a match at all
+MIN_MATCH_SCORE = 0.5
+# Candidates scoring within this margin of the best one make the result ambiguous
+AMBIGUITY_MARGIN = 0.1
+# Query tokens at least this long may match partner tokens by prefix ("behr" -> "behring")
+MIN_PREFIX_LEN = 3
+
+
+def is_uuid(value: Any) -> bool:
+    try:
+        uuid.UUID(str(value))
+        return True
+    except (ValueError, TypeError):
+        return False
+
+
+class PartnerDirectory:
+    """In-memory index over the `partners` table."""
+
+    def __init__(self, ttl_seconds: int = DIRECTORY_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._loaded_at = 0.0
+        self._partners: Dict[str, Dict[str, Any]] = {}
+        self._token_index: Dict[str, set] = {}
+        self._sorted_tokens: List[str] = []
+        self._acronyms: Dict[str, set] = {}
+        self._idf: Dict[str, float] = {}
+
+    # --- Loading ---
+
+    def _fresh(self) -> bool:
+        # An empty directory is cached for the TTL too, so lookups don't re-query the table
+        return bool(self._loaded_at) and time.time() - self._loaded_at < self.ttl_seconds
+
+    def _ensure_loaded(self):
+        if self._fresh():
+            return
+        with self._lock:
+            if self._fresh():
+                return
+            res = supabase.table("partners").select("id, name, applications_open, external_redirect_config").execute()
+            self._build(res.data or [])
+
+    def _build(self, rows: List[Dict[str, Any]]):
+        partners, token_index, acronyms = {}, {}, {}
+        for row in rows:
+            if not row.get("id"):
+                continue
+            name = row.get("name") or ""
+            tokens = tokenize(name, NAME_STOP_WORDS)
+            partners[row["id"]] = {**row, "_folded": fold(name).strip(), "_tokens": set(tokens)}
+            for token in tokens:
+                token_index.setdefault(token, set()).add(row["id"])
+            if len(tokens) > 1:
+                acronyms.setdefault("".join(t[0] for t in tokens), set()).add(row["id"])
+
+        n = max(len(partners), 1)
+        self._idf = {t: math.log(1 + n / len(ids)) for t, ids in token_index.items()}
+        self._partners = partners
+        self._token_index = token_index
+        self._sorted_tokens = sorted(token_index)
+        self._acronyms = acronyms
+        self._loaded_at = time.time()
+        print(f"[PartnerDirectory] Indexed {len(partners)} partners ({len(token_index)} tokens)")
+
+    def invalidate(self):
+        """Forces a reload on the next lookup (e.g. after an admin edit)."""
+        with self._lock:
+            self._loaded_at = 0.0
+
+    # --- Lookup ---
+
+    def get(self, partner_id: str) -> Optional[Dict[str, Any]]:
+        """Returns the cached partner row (without index fields) for an id."""
+        self._ensure_loaded()
+        row = self._partners.get(str(partner_id))
+        if not row:
+            return None
+        return {k: v for k, v in row.items() if not k.startswith("_")}
+
+    def all(self) -> List[Dict[str, Any]]:
+        self._ensure_loaded()
+        return [{k: v for k, v in row.items() if not k.startswith("_")} for row in self._partners.values()]
+
+    def _expand(self, token: str) -> List[str]:
+        """Index tokens equal to `token` or, for long enough tokens, starting with it."""
+        if len(token) < MIN_PREFIX_LEN:
+            return [token] if token in self._token_index else []
+        start = bisect.bisect_left(self._sorted_tokens, token)
+        matches = []
+        for candidate in self._sorted_tokens[start:]:
+            if not candidate.startswith(token):
+                break
+            matches.append(candidate)
+        return matches
+
+    def _score(self, partner: Dict[str, Any], query_folded: str, query_tokens: List[str], expanded: Dict[str, List[str]]) -> float:
+        if query_folded == partner["_folded"]:
+            return 1.0
+
+        p_tokens = partner["_tokens"]
+        q_weight = sum(self._idf.get(t, 1.0) for t in query_tokens) or 1.0
+        p_weight = sum(self._idf.get(t, 1.0) for t in p_tokens) or 1.0
+        matched = 0.0
+        matched_partner_tokens = set()
+        for t in query_tokens:
+            hits = [c for c in expanded.get(t, []) if c in p_tokens]
+            if hits:
+                # Exact token hits count fully, prefix hits slightly less
+                matched += self._idf.get(t, 1.0) * (1.0 if t in hits else 0.9)
+                matched_partner_tokens.update(hits)
+        if not matched:
+            return 0.0
+
+        coverage_query = matched / q_weight
+        coverage_partner = sum(self._idf.get(t, 1.0) for t in matched_partner_tokens) / p_weight
+        score = 0.75 * coverage_query + 0.25 * coverage_partner
+        if len(query_folded) >= MIN_PREFIX_LEN and query_folded in partner["_folded"]:
+            # Same behaviour as the old ILIKE '%name%' match, ranked by how much of the name it covers
+            score = max(score, 0.8 + 0.15 * coverage_partner)
+        return min(score, 0.99)
+
+    def resolve(self, name: str, limit: int = 5) -> Dict[str, Any]:
+        """
+        Resolves a partner name, partial name or acronym.
+
+        Returns a dict with:
+            partner_id: best match id (None when nothing matched)
+            name: best match name
+            score: best match score in [0, 1]
+            ambiguous: True when other candidates score within AMBIGUITY_MARGIN of the best
+            candidates: up to `limit` {partner_id, name, score} ranked by score
+        """
+        result = {"partner_id": None, "name": None, "score": 0.0, "ambiguous": False, "candidates": []}
+        if not name or not name.strip():
+            return result
+
+        self._ensure_loaded()
+        if is_uuid(name) and str(name) in self._partners:
+            row = self._partners[str(name)]
+            return {**result, "partner_id": row["id"], "name": row.get("name"), "score": 1.0,
+                    "candidates": [{"partner_id": row["id"], "name": row.get("name"), "score": 1.0}]}
+
+        query_folded = fold(name).strip()
+        query_tokens = tokenize(name, NAME_STOP_WORDS) or tokenize(name)
+        expanded = {t: self._expand(t) for t in query_tokens}
+
+        candidate_ids = set()
+        for hits in expanded.values():
+            for token in hits:
+                candidate_ids.update(self._token_index[token])
+        acronym_ids = self._acronyms.get(query_folded.replace(" ", ""), set()) if len(query_tokens) == 1 else set()
+        candidate_ids.update(acronym_ids)
+
+        scored = []
+        for pid in candidate_ids:
+            partner = self._partners[pid]
+            score = self._score(partner, query_folded, query_tokens, expanded)
+            if pid in acronym_ids:
+                score = max(score, 0.85)
+            if score >= MIN_MATCH_SCORE:
+                scored.append({"partner_id": pid, "name": partner.get("name"), "score": round(score, 3)})
+
+        if not scored:
+            return result
+
+        scored.sort(key=lambda c: (-c["score"], c["name"] or ""))
+        best = scored[0]
+        ambiguous = len(scored) > 1 and scored[1]["score"] >= best["score"] - AMBIGUITY_MARGIN
+        return {
+            "partner_id": best["partner_id"],
+            "name": best["name"],
+            "score": best["score"],
+            "ambiguous": ambiguous,
+            "candidates": scored[:limit],
+        }
+
+
+# Process-wide singleton shared by all tools
+partner_directory = PartnerDirectory()
+
+
+def resolve_partner_id(partner_ref: str) -> Optional[str]:
+    """Returns the partner UUID for a UUID or a name (best match), or None."""
+    if not partner_ref:
+        return None
+    if is_uuid(partner_ref):
+        return str(partner_ref)
+    return partner_directory.resolve(partner_ref)["partner_id"]
+
+
+def describe_ambiguity(resolution: Dict[str, Any]) -> str:
+    """Human-readable list of the tied candidates, for tool messages."""
+    best = resolution["score"]
+    names = [c["name"] for c in resolution["candidates"] if c["score"] >= best - AMBIGUITY_MARGIN]
+    return ", ".join(n for n in names if n)
+
+
+def ambiguity_message(name: str, resolution: Dict[str, Any]) -> str:
+    """What every partner-scoped tool returns for an ambiguous name, so the agent asks the user."""
+    return (
+        f"O nome '{name}' corresponde a mais de um parceiro: {describe_ambiguity(resolution)}. "
+        "Pergunte ao usuário qual deles ele deseja e chame a ferramenta novamente com o nome completo."
+    )
@@ -0,0 +1,225 @@
+"""
+Shared PDF text extraction with a per-page disk cache.
+
+Text is extracted once per distinct file content: the cache is keyed by the
+file's sha256, so renaming a PDF costs nothing and replacing it re-extracts
+only that file. Pages are kept in memory and in `<sha256>.json` files on
+local disk (PDF_TEXT_CACHE_DIR), so a restarted process reads JSON instead of
+parsing PDFs.
+
+`warm()` extracts every cache miss in a process pool (parsing is CPU-bound).
+The pool is only used by scripts/warm_pdf_text.py, which the container runs
+before the server: spawned workers re-import the main module, and the
+server's main module builds the agents and the app. Server startup then warms
+in-process (workers=1), which is normally all disk hits. A lookup for a file
+whose extraction is in flight waits for it (up to INFLIGHT_WAIT_SECONDS)
+instead of parsing the same PDF again on the request path.
+"""
+import hashlib
+import json
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional
+
+from pypdf import PdfReader
+
+ENGINE = "pypdf"
+MAX_WORKERS = 4
+INFLIGHT_WAIT_SECONDS = 60
+DOCUMENTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "documents")
+
+
+def _cache_dir() -> Optional[str]:
+    """PDF_TEXT_CACHE_DIR overrides the location; an empty value disables the disk layer."""
+    path = os.getenv("PDF_TEXT_CACHE_DIR")
+    if path is None:
+        path = os.path.join(tempfile.gettempdir(), "cloudinha_pdf_text")
+    return path or None
+
+
+def extract_pages(file_path: str) -> List[str]:
+    """Parses a PDF and returns the text of each page (runs in worker processes)."""
+    reader = PdfReader(file_path)
+    return [(page.extract_text() or "").replace("\x00", "") for page in reader.pages]
+
+
+def document_pdfs(root: str = DOCUMENTS_DIR) -> List[str]:
+    """Every PDF under documents/ (editais and partner regulations)."""
+    found = []
+    for directory, _, files in os.walk(root):
+        found.extend(os.path.join(directory, name) for name in sorted(files) if name.lower().endswith(".pdf"))
+    return found
+
+
+class PdfTextService:
+    def __init__(self, cache_dir: str = None):
+        self._cache_dir = cache_dir
+        # sha256 -> pages
+        self._pages: Dict[str, List[str]] = {}
+        # file path -> (mtime, size, sha256): avoids re-hashing unchanged files
+        self._hashes: Dict[str, tuple] = {}
+        # sha256 -> set once an extraction already running for it has finished
+        self._inflight: Dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "extracted": 0, "extract_ms": 0.0}
+
+    @property
+    def cache_dir(self) -> Optional[str]:
+        return self._cache_dir if self._cache_dir is not None else _cache_dir()
+
+    # --- public API -------------------------------------------------------
+
+    def pages(self, file_path: str) -> List[str]:
+        """Text of every page of the PDF."""
+        sha = self._sha256(file_path)
+        pages = self._lookup(sha)
+        if pages is None:
+            pending = self._inflight.get(sha)
+            if pending is not None:
+                pending.wait(INFLIGHT_WAIT_SECONDS)
+                pages = self._lookup(sha)
+        if pages is None:
+            pages = self._extract_many({sha: file_path}, workers=1)[sha]
+        return pages
+
+    def page(self, file_path: str, number: int) -> str:
+        """Text of one page (1-based)."""
+        pages = self.pages(file_path)
+        if not 1 <= number <= len(pages):
+            raise IndexError(f"{os.path.basename(file_path)} has {len(pages)} pages, not {number}")
+        return pages[number - 1]
+
+    def page_count(self, file_path: str) -> int:
+        return len(self.pages(file_path))
+
+    def text(self, file_path: str) -> str:
+        """Whole document text, pages separated by newlines."""
+        return "\n".join(p for p in self.pages(file_path) if p)
+
+    def warm(self, file_paths: Iterable[str], workers: int = MAX_WORKERS) -> Dict[str, int]:
+        """Makes sure every given PDF is cached; misses are extracted in parallel. Returns {path: page count}."""
+        started = time.perf_counter()
+        by_sha = {}
+        for path in file_paths:
+            by_sha.setdefault(self._sha256(path), path)
+
+        missing = {sha: path for sha, path in by_sha.items() if self._lookup(sha) is None}
+        if missing:
+            self._extract_many(missing, workers)
+
+        counts = {path: len(self._pages[sha]) for sha, path in by_sha.items()}
+        print(f"[PdfText] {len(counts)} PDFs prontos, {len(missing)} extraídos ({(time.perf_counter() - started) * 1000:.0f} ms).")
+        return counts
+
+    def invalidate(self, file_path: str = None):
+        """Forgets the hash of one file (or all), so it is re-hashed on next access."""
+        with self._lock:
+            if file_path is None:
+                self._hashes.clear()
+            else:
+                self._hashes.pop(file_path, None)
+
+    # --- internals --------------------------------------------------------
+
+    def _sha256(self, file_path: str) -> str:
+        stat = os.stat(file_path)
+        cached = self._hashes.get(file_path)
+        if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return cached[2]
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        sha = digest.hexdigest()
+        with self._lock:
+            self._hashes[file_path] = (stat.st_mtime_ns, stat.st_size, sha)
+        return sha
+
+    def _lookup(self, sha: str) -> Optional[List[str]]:
+        pages = self._pages.get(sha)
+        if pages is not None:
+            self.stats["memory_hits"] += 1
+            return pages
+        pages = self._read_disk(sha)
+        if pages is not None:
+            self.stats["disk_hits"] += 1
+            with self._lock:
+                self._pages[sha] = pages
+        return pages
+
+    def _extract_many(self, files: Dict[str, str], workers: int) -> Dict[str, List[str]]:
+        started = time.perf_counter()
+        shas, paths = list(files), list(files.values())
+        with self._lock:
+            events = {sha: self._inflight.setdefault(sha, threading.Event()) for sha in shas}
+        workers = min(workers, len(paths), os.cpu_count() or 1)
+        try:
+            if workers > 1:
+                try:
+                    # spawn: forking a process that already runs threads can deadlock
+                    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+                        results = list(pool.map(extract_pages, paths))
+                except (OSError, RuntimeError) as e:
+                    # Sandboxes without process support: parse in this process instead
+                    print(f"[PdfText] Pool de processos indisponível ({e}); extraindo sequencialmente.")
+                    results = [extract_pages(p) for p in paths]
+                extracted = dict(zip(shas, results))
+                self._publish(files, extracted)
+            else:
+                extracted = {}
+                for sha, path in files.items():
+                    extracted[sha] = extract_pages(path)
+                    self._publish({sha: path}, {sha: extracted[sha]})
+        finally:
+            with self._lock:
+                for sha, event in events.items():
+                    if self._inflight.get(sha) is event:
+                        del self._inflight[sha]
+            for event in events.values():
+                event.set()
+        self.stats["extracted"] += len(extracted)
+        self.stats["extract_ms"] += (time.perf_counter() - started) * 1000
+        return extracted
+
+    def _publish(self, files: Dict[str, str], extracted: Dict[str, List[str]]):
+        with self._lock:
+            self._pages.update(extracted)
+        for sha, pages in extracted.items():
+            self._write_disk(sha, files[sha], pages)
+            event = self._inflight.get(sha)
+            if event is not None:
+                event.set()
+
+    def _disk_path(self, sha: str) -> Optional[str]:
+        directory = self.cache_dir
+        return os.path.join(directory, f"{sha}.json") if directory else None
+
+    def _read_disk(self, sha: str) -> Optional[List[str]]:
+        path = self._disk_path(sha)
+        if not path:
+            return None
+        try:
+            with open(path, encoding="utf-8") as f:
+                payload = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return payload["pages"] if payload.get("engine") == ENGINE else None
+
+    def _write_disk(self, sha: str, file_path: str, pages: List[str]):
+        path = self._disk_path(sha)
+        if not path:
+            return
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+                json.dump({"engine": ENGINE, "file": os.path.basename(file_path), "pages": pages}, f, ensure_ascii=False)
+            os.replace(f"{path}.tmp", path)
+        except OSError as e:
+            print(f"[PdfText] Falha ao gravar cache de {file_path}: {e}")
+
+
+pdf_text = PdfTextService()
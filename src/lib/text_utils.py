@@ -0,0 +1,33 @@
+"""
+Text normalization helpers shared by the local search indexes.
+
+Everything is accent-folded and lowercased so that "Fundação", "fundacao"
+and "FUNDACAO" compare equal.
+"""
+import re
+import unicodedata
+from typing import List
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Short Portuguese function words that carry no meaning for name matching
+NAME_STOP_WORDS = {
+    "a", "o", "as", "os", "e", "de", "da", "do", "das", "dos",
+    "em", "na", "no", "nas", "nos", "para", "com", "por", "que",
+}
+
+
+def fold(text: str) -> str:
+    """Lowercases and strips diacritics ('Fundação' -> 'fundacao')."""
+    if not text:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+
+def tokenize(text: str, stop_words: set = None) -> List[str]:
+    """Splits folded text into alphanumeric tokens, optionally dropping stop words."""
+    tokens = _TOKEN_RE.findall(fold(text))
+    if stop_words:
+        tokens = [t for t in tokens if t not in stop_words]
+    return tokens
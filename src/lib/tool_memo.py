@@ -0,0 +1,144 @@
+"""
+Per-turn memoization of read-only tools.
+
+Within one chat turn the reasoning agent often calls the same read-only tool
+more than once with identical arguments, and the workflow re-reads the same
+profile after it. Tools are marked with a decorator:
+
+- `@read_only("profile")` memoizes the result by argument hash while a turn
+  is active (`with tool_turn(): ...`);
+- `@mutates("profile", "eligibility")` drops every memoized entry of those
+  scopes once the tool has run (also when it fails halfway).
+
+The memo lives in a ContextVar, so it follows the turn into tasks and
+`asyncio.to_thread` calls and is never shared between concurrent turns.
+Outside a turn the decorators are transparent. Callers get a deep copy of a
+memoized result, so mutating it doesn't leak into later calls.
+
+Place the decorator below `@safe_execution`, so errors turned into default
+returns are never memoized.
+"""
+import contextvars
+import copy
+import functools
+import hashlib
+import inspect
+import json
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Optional, Tuple
+
+
+class TurnMemo:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple[str, str], Dict[str, Any]] = {}  # (scope, key) -> {"value"}
+        self.stats = {"hits": 0, "misses": 0, "invalidated": 0}
+
+    def get(self, scope: str, key: str):
+        with self._lock:
+            entry = self._entries.get((scope, key))
+            self.stats["hits" if entry else "misses"] += 1
+            return entry
+
+    def put(self, scope: str, key: str, value: Any):
+        with self._lock:
+            self._entries[(scope, key)] = {"value": value}
+
+    def invalidate(self, *scopes: str):
+        with self._lock:
+            stale = [k for k in self._entries if k[0] in scopes]
+            for k in stale:
+                del self._entries[k]
+            self.stats["invalidated"] += len(stale)
+
+
+_current: contextvars.ContextVar = contextvars.ContextVar("tool_memo_turn", default=None)
+
+
+def current_memo() -> Optional[TurnMemo]:
+    return _current.get()
+
+
+@contextmanager
+def tool_turn():
+    """Scopes read-only tool memoization to one turn."""
+    memo = TurnMemo()
+    token = _current.set(memo)
+    try:
+        yield memo
+    finally:
+        try:
+            _current.reset(token)
+        except ValueError:
+            _current.set(None)  # closed from another context (abandoned stream)
+
+
+def _call_key(func, sig: inspect.Signature, args, kwargs) -> str:
+    try:
+        bound = sig.bind(*args, **kwargs)
+        bound.apply_defaults()
+        payload = json.dumps(bound.arguments, sort_keys=True, default=str, ensure_ascii=False)
+    except TypeError:
+        payload = repr((args, sorted(kwargs.items())))
+    return f"{func.__module__}.{func.__qualname__}:" + hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def read_only(scope: str):
+    """Memoizes the tool's result per turn under `scope`."""
+    def decorator(func):
+        sig = inspect.signature(func)
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                memo = _current.get()
+                if memo is None:
+                    return await func(*args, **kwargs)
+                key = _call_key(func, sig, args, kwargs)
+                entry = memo.get(scope, key)
+                if entry is None:
+                    entry = {"value": await func(*args, **kwargs)}
+                    memo.put(scope, key, entry["value"])
+                return copy.deepcopy(entry["value"])
+            return async_wrapper
+
+        @functools.wraps(func)
+        def sync_wrapper(*args, **kwargs):
+            memo = _current.get()
+            if memo is None:
+                return func(*args, **kwargs)
+            key = _call_key(func, sig, args, kwargs)
+            entry = memo.get(scope, key)
+            if entry is None:
+                entry = {"value": func(*args, **kwargs)}
+                memo.put(scope, key, entry["value"])
+            return copy.deepcopy(entry["value"])
+        return sync_wrapper
+    return decorator
+
+
+def mutates(*scopes: str):
+    """Invalidates the memoized entries of `scopes` after the tool runs."""
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    memo = _current.get()
+                    if memo is not None:
+                        memo.invalidate(*scopes)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def sync_wrapper(*args, **kwargs):
+            try:
+                return func(*args, **kwargs)
+            finally:
+                memo = _current.get()
+                if memo is not None:
+                    memo.invalidate(*scopes)
+        return sync_wrapper
+    return decorator
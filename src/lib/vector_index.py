@@ -0,0 +1,232 @@
+"""
+Local vector index over the `documents` table (the RAG chunks behind match_documents).
+
+Embeddings are L2-normalized and stored row-wise in a memory-mapped matrix
+(float32, or int8 with a per-row scale) so top-k cosine search runs in
+process with one brute-force dot product instead of a pgvector round-trip.
+
+The index is refreshed incrementally by diffing the table's ids with the
+indexed ones: new rows are fetched and appended, deleted rows dropped, and
+the matrix file is rewritten atomically. Ingestion replaces changed chunks
+with new rows, so an id diff is enough to see every change.
+
+Matrix, scales and rows are published together as one immutable tuple
+(`_state`), and a search reads that tuple once, so a concurrent refresh can
+never pair new vectors with old rows.
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.lib.supabase import supabase
+from src.agent.config import RAG_LOCAL_INDEX_DTYPE, RAG_MATCH_THRESHOLD, RAG_MATCH_COUNT
+
+REFRESH_SECONDS = 600
+PAGE_SIZE = 1000
+FETCH_BATCH = 200
+# Rows dequantized and multiplied at a time, so int8 searches never copy the whole matrix
+SEARCH_BLOCK_ROWS = 4096
+_DTYPES = {"float32": np.float32, "int8": np.int8}
+
+
+def _index_dir() -> str:
+    return os.getenv("VECTOR_INDEX_DIR") or os.path.join(tempfile.gettempdir(), "cloudinha_vectors")
+
+
+def parse_embedding(value: Any) -> Optional[np.ndarray]:
+    """pgvector columns arrive as text ("[0.1,0.2,...]") through PostgREST, or as lists."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = json.loads(value)
+    return np.asarray(value, dtype=np.float32)
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def quantize(matrix: np.ndarray):
+    """Symmetric per-row int8 quantization: returns (int8 matrix, float32 scales)."""
+    scales = np.abs(matrix).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    quantized = np.clip(np.rint(matrix / scales[:, None]), -127, 127).astype(np.int8)
+    return quantized, scales.astype(np.float32)
+
+
+class LocalVectorIndex:
+    def __init__(self, directory: str = None, dtype: str = None):
+        self.dtype = dtype or RAG_LOCAL_INDEX_DTYPE
+        if self.dtype not in _DTYPES:
+            raise ValueError(f"Unsupported vector index dtype: {self.dtype}")
+        self._directory = directory
+        # (matrix, scales, rows); rows are aligned with matrix rows: {"id", "content", "metadata"}
+        self._state: Tuple[Optional[np.ndarray], Optional[np.ndarray], List[Dict[str, Any]]] = (None, None, [])
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def directory(self) -> str:
+        return self._directory or _index_dir()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, f"{name}.{self.dtype}")
+
+    def __len__(self) -> int:
+        return len(self._state[2])
+
+    @property
+    def _rows(self) -> List[Dict[str, Any]]:
+        return self._state[2]
+
+    # --- persistence ------------------------------------------------------
+
+    def _load(self):
+        try:
+            with open(self._path("manifest.json"), encoding="utf-8") as f:
+                manifest = json.load(f)
+            with open(self._path("rows.json"), encoding="utf-8") as f:
+                rows = json.load(f)
+            shape = (manifest["count"], manifest["dim"])
+            matrix = np.memmap(self._path("vectors.bin"), dtype=_DTYPES[self.dtype], mode="r", shape=shape) if shape[0] else np.zeros(shape, dtype=_DTYPES[self.dtype])
+            scales = np.load(self._path("scales.npy")) if self.dtype == "int8" and shape[0] else None
+        except (OSError, ValueError, KeyError):
+            return
+        self._state = (matrix, scales, rows)
+
+    def _write(self, matrix: np.ndarray, scales: Optional[np.ndarray], rows: List[Dict[str, Any]]):
+        os.makedirs(self.directory, exist_ok=True)
+        count, dim = matrix.shape
+        if count:
+            tmp = self._path("vectors.bin") + ".tmp"
+            out = np.memmap(tmp, dtype=matrix.dtype, mode="w+", shape=matrix.shape)
+            out[:] = matrix
+            out.flush()
+            del out
+            os.replace(tmp, self._path("vectors.bin"))
+            if scales is not None:
+                with open(self._path("scales.npy") + ".tmp", "wb") as f:
+                    np.save(f, scales)
+                os.replace(self._path("scales.npy") + ".tmp", self._path("scales.npy"))
+        for name, payload in (("rows.json", rows), ("manifest.json", {"count": count, "dim": dim, "dtype": self.dtype})):
+            with open(self._path(name) + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(payload, f, ensure_ascii=False, default=str)
+            os.replace(self._path(name) + ".tmp", self._path(name))
+
+        mapped = np.memmap(self._path("vectors.bin"), dtype=matrix.dtype, mode="r", shape=matrix.shape) if count else matrix
+        self._state = (mapped, scales, rows)
+
+    # --- refresh ----------------------------------------------------------
+
+    def _fetch_ids(self) -> List[Any]:
+        ids, start = [], 0
+        while True:
+            res = supabase.table("documents").select("id").order("id").range(start, start + PAGE_SIZE - 1).execute()
+            page = res.data or []
+            ids.extend(row["id"] for row in page)
+            if len(page) < PAGE_SIZE:
+                return ids
+            start += PAGE_SIZE
+
+    def _fetch_rows(self, ids: List[Any]) -> List[Dict[str, Any]]:
+        rows = []
+        for i in range(0, len(ids), FETCH_BATCH):
+            res = supabase.table("documents").select("id, content, metadata, embedding").in_("id", ids[i:i + FETCH_BATCH]).execute()
+            rows.extend(res.data or [])
+        return rows
+
+    def refresh(self, force: bool = False):
+        """Brings the index in line with the `documents` table, touching only added/removed rows."""
+        if not force and time.time() - self._loaded_at < REFRESH_SECONDS:
+            return
+        with self._lock:
+            if not force and time.time() - self._loaded_at < REFRESH_SECONDS:
+                return
+            started = time.perf_counter()
+            if self._state[0] is None:
+                self._load()
+
+            remote_ids = self._fetch_ids()
+            remote_set = {str(i) for i in remote_ids}
+            indexed = {str(row["id"]) for row in self._state[2]}
+            added = [i for i in remote_ids if str(i) not in indexed]
+            removed = indexed - remote_set
+
+            if added or removed or self._state[0] is None:
+                self._apply(added, removed)
+            self._loaded_at = time.time()
+            print(f"[VectorIndex] {len(self)} vetores ({self.dtype}), +{len(added)} -{len(removed)} ({(time.perf_counter() - started) * 1000:.0f} ms).")
+
+    def _apply(self, added: List[Any], removed: set):
+        matrix, old_scales, old_rows = self._state
+        keep = [i for i, row in enumerate(old_rows) if str(row["id"]) not in removed]
+        rows = [old_rows[i] for i in keep]
+
+        new_vectors = []
+        for row in self._fetch_rows(added):
+            vector = parse_embedding(row.get("embedding"))
+            if vector is None:
+                continue
+            new_vectors.append(vector)
+            rows.append({"id": row["id"], "content": row.get("content", ""), "metadata": row.get("metadata") or {}})
+
+        dim = new_vectors[0].shape[0] if new_vectors else (matrix.shape[1] if matrix is not None else 0)
+        if matrix is not None and matrix.shape[0] and matrix.shape[1] != dim:
+            # Embedding model changed dimension: nothing already indexed is comparable anymore
+            print("[VectorIndex] Dimensão dos embeddings mudou; reconstruindo o índice completo.")
+            self._state = (None, None, [])
+            self._apply(self._fetch_ids(), set())
+            return
+
+        fresh = _normalize(np.vstack(new_vectors)) if new_vectors else np.zeros((0, dim), dtype=np.float32)
+        if self.dtype == "int8":
+            fresh, fresh_scales = quantize(fresh) if len(fresh) else (fresh.astype(np.int8), np.zeros(0, dtype=np.float32))
+            kept_scales = old_scales[keep] if old_scales is not None and keep else np.zeros(0, dtype=np.float32)
+            scales = np.concatenate([kept_scales, fresh_scales])
+        else:
+            fresh, scales = fresh.astype(np.float32), None
+
+        old = np.asarray(matrix[keep]) if matrix is not None and keep else np.zeros((0, dim), dtype=_DTYPES[self.dtype])
+        self._write(np.concatenate([old, fresh]) if len(old) else fresh, scales, rows)
+
+    # --- search -----------------------------------------------------------
+
+    def search(self, embedding, match_count: int = RAG_MATCH_COUNT, match_threshold: float = RAG_MATCH_THRESHOLD) -> List[Dict[str, Any]]:
+        """Top-k rows by cosine similarity, shaped like match_documents results."""
+        self.refresh()
+        matrix, scales, rows = self._state
+        if matrix is None or not len(rows):
+            return []
+
+        query = np.asarray(embedding, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)
+        if self.dtype == "int8":
+            similarities = np.empty(len(rows), dtype=np.float32)
+            for start in range(0, len(rows), SEARCH_BLOCK_ROWS):
+                block = matrix[start:start + SEARCH_BLOCK_ROWS]
+                similarities[start:start + len(block)] = block.astype(np.float32) @ query
+            similarities *= scales
+        else:
+            similarities = matrix @ query
+
+        k = min(match_count, len(similarities))
+        top = np.argpartition(-similarities, k - 1)[:k]
+        top = top[np.argsort(-similarities[top])]
+        return [
+            {**rows[i], "similarity": float(similarities[i])}
+            for i in top
+            if similarities[i] > match_threshold
+        ]
+
+    def invalidate(self):
+        self._loaded_at = 0.0
+
+
+vector_index = LocalVectorIndex()
@@ -0,0 +1,177 @@
+"""
+Non-blocking, cached DuckDuckGo search.
+
+DDGS is synchronous, so searches run on a small dedicated thread pool and
+never block the event loop. The regional ('br-pt') and global searches are
+started together. Regional results are preferred: when the global search
+answers first, the regional one still gets REGIONAL_GRACE_SECONDS to answer
+before the global (often English) results are used. The whole search is
+bounded by a deadline: a slow search returns a short "no results" reply
+instead of stalling the conversation. Threads that outlive the deadline
+finish in the background on their own pool, so the loop's default executor
+is never exhausted.
+
+Results are cached by normalized query and site for TTL_SECONDS, and
+identical searches already in flight are shared. The shared search runs as
+its own task, so a caller that is cancelled only stops waiting for it.
+Failures and timeouts are not cached.
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from ddgs import DDGS
+
+from src.lib.embeddings import normalize_query
+from src.lib.resilience import retry_with_backoff
+
+MAX_RESULTS = 5
+TTL_SECONDS = 30 * 60
+DEADLINE_SECONDS = 8.0
+CACHE_ENTRIES = 256
+MAX_WORKERS = 8
+REGIONS = ("br-pt", None)  # None = global; the first region is preferred
+REGIONAL_GRACE_SECONDS = 1.0
+
+NO_RESULTS = "Não encontrei resultados na internet para essa busca."
+TIMED_OUT = "A busca na internet demorou demais e foi interrompida. Responda com o que já sabe ou sugira que o estudante tente novamente."
+
+
+@retry_with_backoff(retries=2, min_delay=0.5, max_delay=2.0)
+def _ddg_text(query: str, region: Optional[str]) -> List[Dict[str, str]]:
+    with DDGS() as ddgs:
+        if region:
+            return list(ddgs.text(query, region=region, max_results=MAX_RESULTS, safesearch="off", timelimit=None))
+        return list(ddgs.text(query, max_results=MAX_RESULTS, safesearch="off", timelimit=None))
+
+
+def format_results(results: list) -> str:
+    """Formata os resultados da busca em texto legível."""
+    summary = ""
+    for i, res in enumerate(results, 1):
+        title = res.get('title', 'Sem título')
+        body = res.get('body', '')
+        url = res.get('href', '')
+        summary += f"{i}. **{title}**\n   {body}\n   Fonte: {url}\n\n"
+    return summary.strip()
+
+
+class WebSearch:
+    def __init__(self, ttl_seconds: float = TTL_SECONDS, deadline_seconds: float = DEADLINE_SECONDS, search_fn=None,
+                 grace_seconds: float = REGIONAL_GRACE_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self.deadline_seconds = deadline_seconds
+        self.grace_seconds = grace_seconds
+        self._search_fn = search_fn or _ddg_text
+        # (normalized query, site) -> (stored_at, text)
+        self._cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._pending: Dict[tuple, asyncio.Future] = {}
+        self._executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="web-search")
+        self.stats = {"hits": 0, "misses": 0, "shared": 0, "timeouts": 0, "errors": 0, "wins": {}}
+
+    async def search(self, query: str, site: str = None, deadline: float = None) -> str:
+        """Formatted results for `query` (restricted to `site`), from cache or a raced regional/global search."""
+        key = (normalize_query(query), (site or "").lower())
+        cached = self._cache.get(key)
+        if cached and time.time() - cached[0] < self.ttl_seconds:
+            self._cache.move_to_end(key)
+            self.stats["hits"] += 1
+            return cached[1]
+
+        shared = self._pending.get(key)
+        if shared is None:
+            self.stats["misses"] += 1
+            # Detached from the caller: cancelling one waiter (e.g. a speculative search
+            # that lost to the knowledge base) never cancels the search for the others
+            shared = asyncio.ensure_future(self._search(key, f"{query} site:{site}" if site else query, deadline or self.deadline_seconds))
+            self._pending[key] = shared
+            shared.add_done_callback(lambda task: self._finished(key, task))
+        else:
+            self.stats["shared"] += 1
+        return await asyncio.shield(shared)
+
+    async def _search(self, key: tuple, search_query: str, deadline: float) -> str:
+        text, cacheable = await self._race(search_query, deadline)
+        if cacheable:
+            self._store(key, text)
+        return text
+
+    def _finished(self, key: tuple, task: asyncio.Task):
+        if self._pending.get(key) is task:
+            del self._pending[key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved: every waiter may have given up
+
+    async def _race(self, search_query: str, deadline: float) -> tuple:
+        """
+        (text, cacheable): the preferred region's results, or the first other
+        non-empty result once the preferred one came back empty, failed or
+        missed its grace window; all within the deadline.
+        """
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        print(f"[WebSearch] Buscando: '{search_query}'")
+        tasks = {
+            asyncio.ensure_future(loop.run_in_executor(self._executor, self._search_fn, search_query, region)): region or "global"
+            for region in REGIONS
+        }
+        preferred = REGIONS[0] or "global"
+        failed = 0
+        fallback = None  # (region, results, received_at) of a non-preferred region
+        try:
+            remaining = set(tasks)
+            while remaining:
+                now = time.perf_counter()
+                timeout = deadline - (now - started)
+                if fallback:
+                    timeout = min(timeout, fallback[2] + self.grace_seconds - now)
+                if timeout <= 0:
+                    break
+                done, remaining = await asyncio.wait(remaining, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception():
+                        failed += 1
+                        print(f"[WebSearch] Erro na busca ({tasks[task]}): {type(task.exception()).__name__}: {task.exception()}")
+                        continue
+                    results = task.result()
+                    if not results:
+                        continue
+                    if tasks[task] == preferred:
+                        return self._win(preferred, results, started)
+                    fallback = fallback or (tasks[task], results, time.perf_counter())
+                if fallback and all(tasks[task] != preferred for task in remaining):
+                    break  # the preferred region already finished without results
+            if fallback:
+                return self._win(fallback[0], fallback[1], started)
+        finally:
+            for task in tasks:
+                task.cancel()  # only drops our interest; the worker thread finishes on its own
+
+        if failed == len(tasks):
+            self.stats["errors"] += 1
+            raise RuntimeError("todas as buscas na internet falharam")
+        if remaining:
+            self.stats["timeouts"] += 1
+            print(f"[WebSearch] ⚠️ Prazo de {deadline:.1f}s esgotado para '{search_query}'.")
+            return TIMED_OUT, False
+        print(f"[WebSearch] ⚠️ NENHUM resultado para '{search_query}'.")
+        return NO_RESULTS, failed == 0
+
+    def _win(self, region: str, results: list, started: float) -> tuple:
+        self.stats["wins"][region] = self.stats["wins"].get(region, 0) + 1
+        print(f"[WebSearch] {len(results)} resultados ({region}) em {(time.perf_counter() - started) * 1000:.0f} ms.")
+        return format_results(results), True
+
+    def _store(self, key: tuple, text: str):
+        self._cache[key] = (time.time(), text)
+        self._cache.move_to_end(key)
+        while len(self._cache) > CACHE_ENTRIES:
+            self._cache.popitem(last=False)
+
+    def invalidate(self):
+        self._cache.clear()
+
+
+web_search = WebSearch()
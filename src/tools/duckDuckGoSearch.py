@@ -1,64 +1,19 @@
-from ddgs import DDGS
 from src.lib.error_handler import safe_execution
-from src.lib.resilience import retry_with_backoff
+from src.lib.web_search import web_search
 
 @safe_execution(error_type="tool_error", default_return="Desculpe, não consegui realizar a busca na internet no momento.")
-@retry_with_backoff(retries=3)
-def duckDuckGoSearchTool(query: str, site: str = None) -> str:
+async def duckDuckGoSearchTool(query: str, site: str = None) -> str:
     """
     Realiza uma busca na internet utilizando o DuckDuckGo.
     Útil para encontrar informações recentes ou que não estão na base de conhecimento interna.
-    
+
     Args:
         query: O termo ou pergunta a ser pesquisada.
         site: Opcional. Restringe a busca a um domínio específico (ex: 'partners.link').
-        
+
     Returns:
         Um resumo dos resultados encontrados na web.
     """
-    search_query = query
-    if site:
-        search_query = f"{query} site:{site}"
-        
-    print(f"[DuckDuckGo] Iniciando busca para: '{search_query}'", flush=True)
-    
-    # Primeira tentativa: com região BR
-    try:
-        print(f"[DuckDuckGo] Tentativa 1: Busca com região 'br-pt'", flush=True)
-        with DDGS() as ddgs:
-            results = list(ddgs.text(search_query, region="br-pt", max_results=5, safesearch="off", timelimit=None))
-            
-        print(f"[DuckDuckGo] Resultados obtidos (região BR): {len(results)}", flush=True)
-        
-        if results:
-            return format_results(results)
-            
-    except Exception as e:
-        print(f"[DuckDuckGo] Erro na busca regional: {type(e).__name__}: {e}", flush=True)
-        # Continue to next attempt
-    
-    # Segunda tentativa: sem restrição de região (Global)
-    # Exceptions here will be caught by safe_execution
-    print(f"[DuckDuckGo] Tentativa 2: Busca SEM restrição de região", flush=True)
-    with DDGS() as ddgs:
-        results = list(ddgs.text(search_query, max_results=5, safesearch="off", timelimit=None))
-        
-    print(f"[DuckDuckGo] Resultados obtidos (global): {len(results)}", flush=True)
-    
-    if results:
-        return format_results(results)
-    else:
-        print(f"[DuckDuckGo] ⚠️ NENHUM resultado encontrado para query: '{search_query}'", flush=True)
-        return "Não encontrei resultados na internet para essa busca."
-
-def format_results(results: list) -> str:
-    """Formata os resultados da busca em texto legível."""
-    summary = ""
-    for i, res in enumerate(results, 1):
-        title = res.get('title', 'Sem título')
-        body = res.get('body', '')
-        url = res.get('href', '')
-        summary += f"{i}. **{title}**\n   {body}\n   Fonte: {url}\n\n"
-    
-    print(f"[DuckDuckGo] ✅ Resumo formatado com {len(results)} resultados", flush=True)
-    return summary.strip()
+    # Regional (br-pt) and global searches run concurrently off the event loop, cached and under a deadline
+    print(f"[DuckDuckGo] Iniciando busca para: '{query}'" + (f" (site:{site})" if site else ""), flush=True)
+    return await web_search.search(query, site=site)
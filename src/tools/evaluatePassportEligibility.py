@@ -1,7 +1,20 @@
+import json
+import time
 from typing import Dict, Any, List
 from src.lib.error_handler import safe_execution
+from src.lib.tool_memo import mutates
 from src.agent.agent import supabase_client
 
+
+def clean_num(val: Any) -> float:
+    """ Parses numbers stored as text, including Brazilian currency ("R$ 1.500,00") """
+    if isinstance(val, str):
+        v = val.replace("R$", "").replace(" ", "").strip()
+        if "," in v and "." in v: v = v.replace(".", "").replace(",", ".")
+        elif "," in v: v = v.replace(",", ".")
+        return float(v)
+    return float(val)
+
 def evaluate_json_logic(rule: Any, data: Dict[str, Any]) -> Any:
     """ Evaluates a standard JSON Logic rule against data """
     if not isinstance(rule, dict):
@@ -26,14 +39,6 @@ def evaluate_json_logic(rule: Any, data: Dict[str, Any]) -> Any:
         
         # Try numeric comparison first
         try:
-            def clean_num(val):
-                if isinstance(val, str):
-                    v = val.replace("R$", "").replace(" ", "").strip()
-                    if "," in v and "." in v: v = v.replace(".", "").replace(",", ".")
-                    elif "," in v: v = v.replace(",", ".")
-                    return float(v)
-                return float(val)
-
             a_num = clean_num(a)
             b_num = clean_num(b)
             
@@ -79,59 +84,156 @@ def evaluate_json_logic(rule: Any, data: Dict[str, Any]) -> Any:
     return False
 
 
+_INFIX_OPS = ("==", "===", "!=", "!==", ">", ">=", "<", "<=", "in")
+
+
+def render_rule(rule: Any) -> str:
+    """ Renders a JSON Logic rule as a readable expression, e.g. `(renda <= 1500 and idade >= 16)` """
+    if not isinstance(rule, dict):
+        return json.dumps(rule, ensure_ascii=False)
+    if not rule:
+        return "false"
+
+    op = list(rule.keys())[0]
+    args = rule[op]
+    if not isinstance(args, list):
+        args = [args]
+
+    if op == "var":
+        return str(args[0])
+    if op in _INFIX_OPS and len(args) == 2:
+        return f"{render_rule(args[0])} {op} {render_rule(args[1])}"
+    if op in ("and", "or"):
+        return "(" + f" {op} ".join(render_rule(a) for a in args) + ")"
+    if op == "!":
+        return f"not {render_rule(args[0])}"
+    return f"{op}({', '.join(render_rule(a) for a in args)})"
+
+
+def coerce_value(val: Any) -> Any:
+    """ The value as evaluate_json_logic compares it: numeric when parseable, else normalized text """
+    if val is None or isinstance(val, bool):
+        return val
+    try:
+        return clean_num(val)
+    except (ValueError, TypeError):
+        pass
+    if isinstance(val, str):
+        return val.strip().lower()
+    return val
+
+
+class EligibilityTrace:
+    """ Collects DB timings and per-criterion evaluation details when trace mode is on """
+
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        self.db_ms = 0.0
+        self.compute_ms = 0.0
+        self.queries: List[Dict[str, Any]] = []
+        self.partners: Dict[str, Dict[str, Any]] = {}
+
+    def db(self, label: str, call):
+        start = time.perf_counter()
+        try:
+            return call()
+        finally:
+            ms = (time.perf_counter() - start) * 1000
+            self.db_ms += ms
+            if self.enabled:
+                self.queries.append({"query": label, "ms": round(ms, 3)})
+
+    def criterion(self, partner_id: str, partner_name: str, entry: Dict[str, Any]):
+        self.compute_ms += entry["ms"]
+        if not self.enabled:
+            return
+        partner = self.partners.setdefault(partner_id, {
+            "partner_id": partner_id,
+            "partner_name": partner_name,
+            "compute_ms": 0.0,
+            "criteria": []
+        })
+        partner["compute_ms"] = round(partner["compute_ms"] + entry["ms"], 3)
+        partner["criteria"].append({**entry, "ms": round(entry["ms"], 3)})
+
+    def report(self, total_ms: float) -> Dict[str, Any]:
+        return {
+            "summary": {
+                "total_ms": round(total_ms, 3),
+                "db_ms": round(self.db_ms, 3),
+                "compute_ms": round(self.compute_ms, 3),
+                "criteria_evaluated": sum(len(p["criteria"]) for p in self.partners.values()),
+                "queries": self.queries
+            },
+            "partners": list(self.partners.values())
+        }
+
+
 @safe_execution(error_type="evaluate_passport_eligibility_error", default_return={"status": "error", "message": "Failed to evaluate eligibility"})
-def evaluatePassportEligibilityTool(user_id: str) -> Dict[str, Any]:
+@mutates("profile", "eligibility")
+def evaluatePassportEligibilityTool(user_id: str, trace: bool = False) -> Dict[str, Any]:
     """
     Evaluates the user's eligibility for available programs based on partner_forms.is_criterion = True.
     It checks mapping_source variables if available in user_profiles.
     
     Args:
         user_id (str): Logging in user ID
+        trace (bool): Debug only. Adds a "trace" report with, per partner and criterion, the rule,
+            input value, coerced value, result and evaluation time, plus DB vs compute time.
         
     Returns:
         dict: List of partners with total criteria and how many are met.
     """
+    started = time.perf_counter()
+    tracer = EligibilityTrace(trace)
+
+    def finish(response: Dict[str, Any]) -> Dict[str, Any]:
+        if trace:
+            response["trace"] = tracer.report((time.perf_counter() - started) * 1000)
+        return response
+
     # 1. Fetch user profile
-    parent_res = supabase_client.table("user_profiles").select("active_application_target_id").eq("id", user_id).execute()
+    parent_res = tracer.db("parent_profile", lambda: supabase_client.table("user_profiles").select("active_application_target_id").eq("id", user_id).execute())
     if not parent_res.data:
-         return {"status": "error", "message": "User not found"}
+         return finish({"status": "error", "message": "User not found"})
     
     target_id = parent_res.data[0].get("active_application_target_id") or user_id
     
-    profile_res = supabase_client.table("user_profiles").select("*").eq("id", target_id).execute()
+    profile_res = tracer.db("target_profile", lambda: supabase_client.table("user_profiles").select("*").eq("id", target_id).execute())
     if not profile_res.data:
-         return {"status": "error", "message": "Evaluation target profile not found"}
+         return finish({"status": "error", "message": "Evaluation target profile not found"})
          
     profile = profile_res.data[0]
     
     # 2. Fetch all criteria forms with partner names
     # First get partners to have names and open status
-    partners_res = supabase_client.table("partners").select("id, name, applications_open").execute()
+    partners_res = tracer.db("partners", lambda: supabase_client.table("partners").select("id, name, applications_open").execute())
     open_partner_ids = [p["id"] for p in partners_res.data if p.get("applications_open") is True]
     partners_map = {p["id"]: p["name"] for p in partners_res.data}
     
     if not open_partner_ids:
-        supabase_client.table("user_profiles").update({
+        tracer.db("save_results", lambda: supabase_client.table("user_profiles").update({
             "eligibility_results": []
-        }).eq("id", user_id).execute()
-        return {"status": "success", "results": [], "message": "No open partners found."}
+        }).eq("id", user_id).execute())
+        return finish({"status": "success", "results": [], "message": "No open partners found."})
 
-    criteria_res = supabase_client.table("partner_forms") \
+    criteria_res = tracer.db("criteria", lambda: supabase_client.table("partner_forms") \
         .select("partner_id, field_name, mapping_source, criterion_rule") \
         .eq("is_criterion", True) \
         .in_("partner_id", open_partner_ids) \
-        .execute()
+        .execute())
     
     if not criteria_res.data:
         # Save empty results to parent profile so the UI can safely process the response instead of hanging on null
-        supabase_client.table("user_profiles").update({
+        tracer.db("save_results", lambda: supabase_client.table("user_profiles").update({
             "eligibility_results": []
-        }).eq("id", user_id).execute()
-        return {"status": "success", "results": [], "message": "No criteria found in database."}
+        }).eq("id", user_id).execute())
+        return finish({"status": "success", "results": [], "message": "No criteria found in database."})
          
     # 3. Aggregate by partner
     results = {}
     for crit in criteria_res.data:
+        crit_started = time.perf_counter()
         p_id = crit["partner_id"]
         if p_id not in results:
             results[p_id] = {
@@ -145,20 +247,24 @@ def evaluatePassportEligibilityTool(user_id: str) -> Dict[str, Any]:
         results[p_id]["total_criteria"] += 1
         
         met = False
+        user_val = None
+        rule = crit.get("criterion_rule")
+        mode = "unmapped"
         mapping = crit.get("mapping_source")
         # mapping_source is usually 'user_profiles.field_name'
         if mapping and mapping.startswith("user_profiles."):
             field = mapping.split(".")[1]
             user_val = profile.get(field)
             
-            rule = crit.get("criterion_rule")
             if not rule:
                 # If no rule but there's a mapping, simple existence check (or whatever fallback)
+                mode = "exists"
                 if user_val is not None:
                     met = True
             else:
                 # Actual JSON Logic evaluation
                 # The 'var' in the DB JSON logic matches the 'field_name' column usually
+                mode = "rule"
                 var_name = crit["field_name"]
                 
                 # Check if JSON logic references user_val by field_name or direct mapping
@@ -171,15 +277,28 @@ def evaluatePassportEligibilityTool(user_id: str) -> Dict[str, Any]:
             "field": crit["field_name"],
             "met": met
         })
+
+        entry = {"ms": (time.perf_counter() - crit_started) * 1000}
+        if trace:
+            entry.update({
+                "field": crit["field_name"],
+                "mapping_source": mapping,
+                "mode": mode,
+                "rule": render_rule(rule) if rule else None,
+                "input": user_val,
+                "coerced": coerce_value(user_val),
+                "met": met
+            })
+        tracer.criterion(p_id, results[p_id]["partner_name"], entry)
         
     final_results = list(results.values())
     
     # 4. Save results to parent profile so UI can render
-    supabase_client.table("user_profiles").update({
+    tracer.db("save_results", lambda: supabase_client.table("user_profiles").update({
         "eligibility_results": final_results
-    }).eq("id", user_id).execute()
+    }).eq("id", user_id).execute())
         
-    return {
+    return finish({
         "status": "success",
         "results": final_results
-    }
+    })
@@ -1,8 +1,10 @@
 from src.lib.error_handler import safe_execution
+from src.lib.tool_memo import read_only
 from src.lib.supabase import supabase
 
 
 @safe_execution(error_type="get_eligibility_results_error", default_return="Erro ao buscar resultados de elegibilidade.")
+@read_only("eligibility")
 def getEligibilityResultsTool(user_id: str) -> str:
     """
     Busca os resultados de elegibilidade (eligibility_results) salvos no perfil do usuário.
@@ -1,8 +1,10 @@
 from typing import Dict, List, Any
 from src.lib.supabase import supabase
 from src.lib.error_handler import safe_execution
+from src.lib.tool_memo import read_only
 
 @safe_execution(error_type="tool_error", default_return=[])
+@read_only("dates")
 def getImportantDatesTool(program_type: str = None) -> List[Dict[str, Any]]:
     """
     Busca datas importantes e prazos de programas como Prouni, Sisu ou Fies.
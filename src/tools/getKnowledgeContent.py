@@ -1,5 +1,7 @@
 from src.lib.supabase import supabase
 from src.lib.error_handler import safe_execution
+from src.lib.partner_directory import partner_directory, ambiguity_message
+from src.lib.knowledge_store import knowledge_store
 
 _FALLBACK = "Não encontrei informações na base de conhecimento."
 
@@ -17,36 +19,39 @@ def getKnowledgeContentTool(
             Valores: 'partner', 'prouni', 'sisu', 'passport', 'general', 'cloudinha'.
         partner_name (str, optional): Nome do parceiro para busca fuzzy
             (ex: 'Insper', 'Behring', 'Bolsa Integral do Insper').
-            Usa ILIKE no banco — correspondência parcial por substring.
+            Resolvido localmente pelo diretório de parceiros (nome, parte do nome ou sigla).
 
     Returns:
         str: Conteúdo Markdown dos documentos encontrados, concatenados com separadores.
-             Retorna mensagem de fallback se nenhum documento for encontrado.
+             Retorna mensagem de fallback se nenhum documento for encontrado, ou a
+             lista de opções se o nome do parceiro for ambíguo.
     """
     if not category and not partner_name:
         return _FALLBACK
 
+    if partner_name:
+        resolution = partner_directory.resolve(partner_name)
+        if resolution["ambiguous"]:
+            return ambiguity_message(partner_name, resolution)
+
     docs = _fetch_documents(category=category, partner_name=partner_name)
 
     if not docs:
         return _FALLBACK
 
-    parts = []
-    seen_paths = set()
+    # Unique storage paths, downloaded concurrently on miss and cached locally
+    titles = {}
     for doc in docs:
-        storage_path = doc["storage_path"]
-        if storage_path in seen_paths:
+        titles.setdefault(doc["storage_path"], doc["title"])
+    contents = knowledge_store.read_many(supabase, titles.keys())
+
+    parts = []
+    for storage_path, title in titles.items():
+        content = contents.get(storage_path)
+        if content is None:
+            print(f"[getKnowledgeContent] Erro ao baixar '{storage_path}'")
             continue
-        seen_paths.add(storage_path)
-        
-        title = doc["title"]
-        try:
-            raw = supabase.storage.from_("knowledge-base").download(storage_path)
-            # Use 'replace' to avoid UnicodeDecodeError if there's any corruption
-            content = raw.decode("utf-8", errors="replace")
-            parts.append(f"=== {title} ===\n\n{content}")
-        except Exception as e:
-            print(f"[getKnowledgeContent] Erro ao baixar '{storage_path}': {e}")
+        parts.append(f"=== {title} ===\n\n{content}")
 
     if not parts:
         return _FALLBACK
@@ -63,26 +68,12 @@ def _fetch_documents(category: str = None, partner_name: str = None) -> list:
     )
 
     if partner_name:
-        query = supabase.table("partners").select("id")
-        
-        # Tokenize partner_name to allow flexible matches (e.g. "Bolsa do Insper" matches "Bolsa Integral do Insper")
-        stop_words = {"das", "dos", "para", "com", "por", "que"}
-        keywords = [w for w in partner_name.split() if len(w) > 2 and w.lower() not in stop_words]
-        
-        if not keywords:
-            keywords = [partner_name.strip()]
-            
-        for kw in keywords:
-            query = query.ilike("name", f"%{kw}%")
-            
-        partners_resp = query.execute()
-        if not partners_resp.data:
+        # Resolved in memory (e.g. "Bolsa do Insper" matches "Bolsa Integral do Insper");
+        # ambiguous names were already answered with the options by the caller.
+        resolution = partner_directory.resolve(partner_name)
+        if not resolution["partner_id"]:
             return []
-        partner_ids = [p["id"] for p in partners_resp.data]
-        if len(partner_ids) == 1:
-            docs_resp = base_query.eq("partner_id", partner_ids[0]).execute()
-        else:
-            docs_resp = base_query.in_("partner_id", partner_ids).execute()
+        docs_resp = base_query.eq("partner_id", resolution["partner_id"]).execute()
         return docs_resp.data or []
 
     if category:
@@ -1,16 +1,54 @@
-from typing import Dict, List, Any
-from src.lib.supabase import supabase
+import copy
+from typing import Dict, List, Any, Optional
 from src.lib.error_handler import safe_execution
+from src.lib.tool_memo import read_only
+from src.lib.active_applications import get_active_application
+from src.lib.partner_directory import partner_directory, is_uuid, ambiguity_message
+from src.lib.partner_cache import get_partner_form_schema
+from src.lib.text_utils import fold
+
+
+def _select_step(schema: Dict[str, Any], step_name: str = None, focused_field: str = None) -> Optional[Dict[str, Any]]:
+    """
+    Finds the step matching a step name (partial, accent-insensitive) or containing the focused field.
+    Blank values are ignored, so they never match every step.
+    """
+    wanted = fold(step_name or "").strip()
+    if wanted:
+        for step in schema["steps"]:
+            if fold(step["step_name"] or "").strip() == wanted:
+                return step
+        for step in schema["steps"]:
+            name = fold(step["step_name"] or "")
+            if name and (wanted in name or name in wanted):
+                return step
+
+    wanted = fold(focused_field or "").strip()
+    if wanted:
+        for step in schema["steps"]:
+            for field in step["fields"]:
+                if wanted in (fold(field.get("field_name") or ""), fold(field.get("question_text") or "").strip()):
+                    return step
+    return None
 
 
 @safe_execution(error_type="tool_error", default_return=[])
-def getPartnerFormsTool(user_id: str, partner_id: str = None) -> List[Dict[str, Any]]:
+@read_only("forms")
+def getPartnerFormsTool(user_id: str, partner_id: str = None, step_name: str = None, focused_field: str = None) -> List[Dict[str, Any]]:
     """
     Retorna os campos e regras do formulário de um parceiro específico.
     Se partner_id for omitido, busca automaticamente o parceiro da aplicação ativa (DRAFT) para o user_id fornecido.
+
+    Args:
+        user_id: string. O ID do usuário (USER_ID_CONTEXT).
+        partner_id: string opcional. UUID ou nome do parceiro.
+        step_name: string opcional. Nome da etapa do formulário (ex: "Dados acadêmicos"). Retorna apenas os campos dessa etapa.
+        focused_field: string opcional. O CAMPO EM FOCO do formulário na tela. Retorna apenas os campos da etapa que contém esse campo.
+
+    Se nenhuma etapa for identificada, retorna todos os campos do formulário.
+    Se o nome do parceiro for ambíguo, retorna um único item {"status": "error", "message"} com as opções.
     """
-    import uuid
-    print(f"[DEBUG TOOL] getPartnerFormsTool called with user_id={user_id}, partner_id={partner_id}")
+    print(f"[DEBUG TOOL] getPartnerFormsTool called with user_id={user_id}, partner_id={partner_id}, step_name={step_name}, focused_field={focused_field}")
     
     resolved_partner_id = partner_id
     
@@ -21,49 +59,37 @@ def getPartnerFormsTool(user_id: str, partner_id: str = None) -> List[Dict[str,
             return []
             
         print(f"[DEBUG TOOL] Attempting auto-detection for user_id={user_id}")
-        active_app = (
-            supabase
-            .table("student_applications")
-            .select("partner_id")
-            .eq("user_id", user_id)
-            .eq("status", "DRAFT")
-            .order("updated_at", desc=True)
-            .limit(1)
-            .execute()
-        )
-        if not active_app.data:
+        active_app = get_active_application(user_id)
+        if not active_app:
             print(f"[DEBUG TOOL] No DRAFT application found for {user_id}")
             return []
-        resolved_partner_id = active_app.data[0]["partner_id"]
+        resolved_partner_id = active_app["partner_id"]
         print(f"[DEBUG TOOL] Auto-detected partner_id={resolved_partner_id}")
     
-    # 2. Resolve name to UUID
-    try:
-        uuid.UUID(str(resolved_partner_id))
-    except (ValueError, TypeError):
-        # Could be a name
-        name_res = supabase.table("partners").select("id").ilike("name", f"%{resolved_partner_id}%").execute()
-        if not name_res.data:
+    # 2. Resolve name to UUID (local partner directory)
+    if not is_uuid(resolved_partner_id):
+        resolution = partner_directory.resolve(str(resolved_partner_id))
+        if not resolution["partner_id"]:
             print(f"[DEBUG TOOL] Partner name not found: {resolved_partner_id}")
             return []
-        resolved_partner_id = name_res.data[0]["id"]
+        if resolution["ambiguous"]:
+            print(f"[DEBUG TOOL] Ambiguous partner name '{resolved_partner_id}': {resolution['candidates']}")
+            return [{"status": "error", "message": ambiguity_message(resolved_partner_id, resolution)}]
+        resolved_partner_id = resolution["partner_id"]
         print(f"[DEBUG TOOL] Resolved name to ID={resolved_partner_id}")
 
-    # 3. Fetch forms
-    response = (
-        supabase
-        .table("partner_forms")
-        .select("field_name, question_text, data_type, options, mapping_source, is_criterion, sort_order, maskking, step_id, partner_steps(step_name)")
-        .eq("partner_id", resolved_partner_id)
-        .order("sort_order")
-        .execute()
-    )
-    
-    fields = []
-    for item in (response.data or []):
-        step_info = item.pop("partner_steps", {})
-        item["step_name"] = step_info.get("step_name") if step_info else None
-        fields.append(item)
+    # 3. Form schema (cached per partner, grouped by step)
+    schema = get_partner_form_schema(resolved_partner_id)
+
+    # 4. Scope to a single step when the caller knows where the user is.
+    # The schema is shared process-wide: callers get copies they are free to mutate.
+    if (step_name or "").strip() or (focused_field or "").strip():
+        step = _select_step(schema, step_name=step_name, focused_field=focused_field)
+        if step:
+            print(f"[DEBUG TOOL] Returning {len(step['fields'])} fields of step '{step['step_name']}'.")
+            return copy.deepcopy(step["fields"])
+        print(f"[DEBUG TOOL] No step matched step_name={step_name}, focused_field={focused_field}. Returning full form.")
 
+    fields = schema["fields"]
     print(f"[DEBUG TOOL] Returning {len(fields)} fields.")
-    return fields
+    return copy.deepcopy(fields)
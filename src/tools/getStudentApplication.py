@@ -1,14 +1,17 @@
 from typing import Dict, Any, Optional
 from src.lib.error_handler import safe_execution
+from src.lib.tool_memo import read_only
 from src.agent.agent import supabase_client
+from src.lib.partner_directory import partner_directory, is_uuid, ambiguity_message
+from src.lib.active_applications import get_active_application
 
 @safe_execution(error_type="get_student_application_error", default_return={"status": "error", "message": "Failed to fetch student application"})
+@read_only("application")
 def getStudentApplicationTool(user_id: str, partner_id: str = None) -> Dict[str, Any]:
     """
     Fetches the progress of a student's application.
     If partner_id is omitted, auto-detects the latest DRAFT application for the given user_id.
     """
-    import uuid
     print(f"[DEBUG TOOL] getStudentApplicationTool called with user_id={user_id}, partner_id={partner_id}")
     
     resolved_partner_id = partner_id
@@ -18,29 +21,20 @@ def getStudentApplicationTool(user_id: str, partner_id: str = None) -> Dict[str,
         if not user_id:
             return {"status": "error", "message": "Missing user_id for auto-detection."}
             
-        active_app = (
-            supabase_client
-            .table("student_applications")
-            .select("partner_id")
-            .eq("user_id", user_id)
-            .eq("status", "DRAFT")
-            .order("updated_at", desc=True)
-            .limit(1)
-            .execute()
-        )
-        if not active_app.data:
+        active_app = get_active_application(user_id)
+        if not active_app:
             return {"status": "error", "message": "No active application found."}
-        resolved_partner_id = active_app.data[0]["partner_id"]
+        resolved_partner_id = active_app["partner_id"]
         print(f"[DEBUG TOOL] Auto-detected partner_id={resolved_partner_id}")
 
-    # 2. Resolve name to UUID if needed
-    try:
-        uuid.UUID(str(resolved_partner_id))
-    except (ValueError, TypeError):
-        name_res = supabase_client.table("partners").select("id").ilike("name", f"%{resolved_partner_id}%").execute()
-        if not name_res.data:
+    # 2. Resolve name to UUID if needed (local partner directory)
+    if not is_uuid(resolved_partner_id):
+        resolution = partner_directory.resolve(str(resolved_partner_id))
+        if not resolution["partner_id"]:
             return {"status": "error", "message": f"Parceiro não encontrado: {resolved_partner_id}"}
-        resolved_partner_id = name_res.data[0]["id"]
+        if resolution["ambiguous"]:
+            return {"status": "error", "message": ambiguity_message(resolved_partner_id, resolution)}
+        resolved_partner_id = resolution["partner_id"]
 
     try:
         res = supabase_client.table("student_applications") \
@@ -2,6 +2,7 @@ from typing import Optional, Dict
 import time
 from src.lib.supabase import supabase
 from src.lib.error_handler import safe_execution
+from src.lib.tool_memo import read_only
 
 # --- Cache Configuration ---
 _PROFILE_CACHE = {}
@@ -31,6 +32,7 @@ def invalidate_profile_cache(user_id: str):
         # print(f"!!! [CACHE INVALIDATED] User {user_id}")
 
 @safe_execution(error_type="tool_error", default_return={})
+@read_only("profile")
 def getStudentProfileTool(user_id: str) -> Dict:
     """Recupera as informações socioeconômicas e de perfil do estudante salvas."""
 
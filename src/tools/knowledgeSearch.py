@@ -3,6 +3,9 @@ import os
 import asyncio
 from google import genai
 from src.lib.supabase import supabase
+from src.agent.config import MODEL_EMBEDDING, RAG_MATCH_THRESHOLD, RAG_MATCH_COUNT, RAG_VECTOR_BACKEND
+from src.lib.embeddings import get_embedding_service
+from src.lib.vector_index import vector_index
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -30,53 +33,41 @@ async def knowledgeSearchTool(query: str, collection_name: str = "documents") ->
         Um texto contendo os trechos mais relevantes encontrados na documentação.
     """
     global client
-    
-    if not client:
+
+    service = get_embedding_service(client, MODEL_EMBEDDING)
+    if not service:
         return "Erro de configuração: Chave de API do Google não encontrada."
 
-    # 1. Generate Embedding (Async)
-    # Using text-embedding-004 (recommended) instead of legacy embedding-001
-    print(f"[DEBUG RAG] Generating embedding (Async) using text-embedding-004 for: '{query}'...", flush=True)
-    
-    response = await client.aio.models.embed_content(
-        model="models/text-embedding-004",
-        contents=query
-    )
+    # 1. Query embedding (cached by normalized query; concurrent misses are batched)
+    print(f"[DEBUG RAG] Embedding query with {service.backend.name}: '{query}'...", flush=True)
+    query_embedding = await service.embed_query(query)
+    if not query_embedding:
+        print(f"[DEBUG RAG] Empty embedding", flush=True)
+        return "Erro técnico ao processar sua pergunta."
+    print("[DEBUG RAG] Embedding ready.", flush=True)
     
-    if not response:
-            print(f"[DEBUG RAG] Response is None/Empty", flush=True)
-            return "Erro técnico ao processar sua pergunta."
-            
-    # Check for 'embedding' (singular) or 'embeddings' (plural)
-    if hasattr(response, 'embeddings'):
-            # Batch response?
-            query_embedding = response.embeddings[0].values
-    elif hasattr(response, 'embedding'):
-            query_embedding = response.embedding.values
+    # 2. Vector search: local memory-mapped index or match_documents RPC (config.RAG_VECTOR_BACKEND)
+    if RAG_VECTOR_BACKEND == "local":
+        print(f"[DEBUG RAG] Searching local vector index...", flush=True)
+        docs = await asyncio.to_thread(vector_index.search, query_embedding, RAG_MATCH_COUNT, RAG_MATCH_THRESHOLD)
     else:
-            print(f"[DEBUG RAG] Response has no embedding(s): {dir(response)}", flush=True)
-            return "Erro técnico ao processar sua pergunta."
-    print("[DEBUG RAG] Embedding generated successfully.", flush=True)
-    
-    # 2. Call RPC directly
-    print(f"[DEBUG RAG] Calling match_documents RPC...", flush=True)
-    
-    params = {
-        "query_embedding": query_embedding,
-        "match_threshold": 0.3,
-        "match_count": 5
-    }
-    
-    response_rpc = supabase.rpc("match_documents", params).execute()
-    
-    print(f"[DEBUG RAG] RPC Response Count: {len(response_rpc.data) if response_rpc.data else 0}", flush=True)
+        print(f"[DEBUG RAG] Calling match_documents RPC...", flush=True)
+
+        params = {
+            "query_embedding": query_embedding,
+            "match_threshold": RAG_MATCH_THRESHOLD,
+            "match_count": RAG_MATCH_COUNT
+        }
+
+        response_rpc = supabase.rpc("match_documents", params).execute()
+        docs = response_rpc.data
+
+    print(f"[DEBUG RAG] Result Count: {len(docs) if docs else 0}", flush=True)
     
-    if not response_rpc.data:
+    if not docs:
         print("[DEBUG RAG] No documents found matching threshold.")
         return "Não encontrei informações específicas sobre isso na minha base de conhecimento."
         
     # 3. Compile results
-    docs = response_rpc.data
-
     context_text = "\n\n".join([f"--- Contexto ---\n{doc.get('content', '')}" for doc in docs])
     return context_text
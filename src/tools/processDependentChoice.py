@@ -1,10 +1,12 @@
 import uuid
 from typing import Dict, Any
 from src.lib.error_handler import safe_execution
+from src.lib.tool_memo import mutates
 from src.lib.supabase import supabase
 from src.tools.updateStudentProfile import updateStudentProfileTool
 
 @safe_execution(error_type="process_dependent_error", default_return={"status": "error", "message": "Failed to process dependent choice"})
+@mutates("profile", "eligibility")
 def processDependentChoiceTool(user_id: str, choice: str) -> Dict[str, Any]:
     """
     Processes the user's choice about whether they are applying for themselves or a dependent.
@@ -1,6 +1,6 @@
 import os
-from pypdf import PdfReader
 from src.lib.error_handler import safe_execution
+from src.lib.pdf_text import pdf_text
 
 # Map of lowercase keyword → PDF filename
 # Multiple keys can point to the same file for fuzzy matching
@@ -55,12 +55,8 @@ def readPartnerDocTool(partner_name: str) -> str:
 
     print(f"[ReadPartnerDoc] Lendo PDF: {pdf_filename}")
 
-    reader = PdfReader(file_path)
-    full_text = ""
-    for page in reader.pages:
-        text = page.extract_text()
-        if text:
-            full_text += text + "\n"
+    # Extracted once (warmed at startup) and served from the page cache afterwards
+    full_text = "".join(page + "\n" for page in pdf_text.pages(file_path) if page)
 
     if not full_text.strip():
         return f"Aviso: O PDF '{pdf_filename}' não contém texto extraível."
@@ -1,5 +1,6 @@
 import os
 from src.lib.error_handler import safe_execution
+from src.lib.assets import assets
 
 RULES_CONTEXT_DIR = "rules_context"
 
@@ -26,26 +27,19 @@ def readRulesTool(program: str = None):
     base_knowledge_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "agent", "knowledge")
     target_dir = os.path.join(base_knowledge_dir, program_lower)
     
-    if not os.path.exists(target_dir):
+    if not os.path.isdir(target_dir):
         return f"Erro: Tópico '{program}' não encontrado na base de conhecimento (Diretório esperado: {target_dir}). Tente 'prouni', 'sisu' ou 'cloudinha'."
-        
-    context_files = []
-    
-    for f in os.listdir(target_dir):
-        if f.endswith(".md") or f.endswith(".txt"):
-            context_files.append(os.path.join(target_dir, f))
+
+    # Listing and contents are cached; files edited on disk are picked up without a restart
+    context_files = assets.directory(target_dir, (".md", ".txt"))
 
     if not context_files:
         return f"Aviso: O diretório para '{program}' existe mas está vazio."
 
     full_content = ""
     
-    for file_path in context_files:
-        # Note: safe_execution wraps the whole function, so if one file fails unexpectedly it will fail the whole call unless we handle it locally. 
-        # But file reading is simple enough. If strict 'no manual try/catch', I'm removing it.
-        with open(file_path, "r", encoding="utf-8") as f:
-            content = f.read()
-            filename = os.path.basename(file_path)
-            full_content += f"\n\n{'='*20}\nCONTEÚDO DO ARQUIVO: {filename}\n{'='*20}\n\n{content}"
+    for file_path, content in context_files:
+        filename = os.path.basename(file_path)
+        full_content += f"\n\n{'='*20}\nCONTEÚDO DO ARQUIVO: {filename}\n{'='*20}\n\n{content}"
             
     return full_content
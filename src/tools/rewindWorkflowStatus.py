@@ -1,8 +1,10 @@
 from src.lib.error_handler import safe_execution
+from src.lib.tool_memo import mutates
 import json
 from src.agent.agent import supabase_client
 
 @safe_execution(error_type="rewind_workflow_error", default_return="Erro ao tentar retroceder fluxo.")
+@mutates("profile", "application", "forms")
 def rewindWorkflowStatusTool(user_id: str) -> str:
     """
     Volta uma fase no fluxo do usuário (passport_phase) caso ele deseje reiniciar, 
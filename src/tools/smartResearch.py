@@ -1,21 +1,43 @@
+import asyncio
 from src.tools.knowledgeSearch import knowledgeSearchTool
 from src.tools.duckDuckGoSearch import duckDuckGoSearchTool
 from src.tools.getKnowledgeContent import getKnowledgeContentTool
 from src.lib.error_handler import safe_execution
+from src.lib.knowledge_sections import select_sections
+from src.lib.knowledge_index import knowledge_index
+from src.lib.partner_digests import partner_digests, digest_answers, format_digest, query_fields
+from src.lib.partner_directory import partner_directory, resolve_partner_id, ambiguity_message
+from src.lib.supabase import supabase
+from src.agent.config import RESEARCH_CONTEXT_BUDGET_CHARS
 
 _KB_FALLBACK = "Não encontrei informações na base de conhecimento."
 
+# Knowledge category -> smartResearch program, for routing by BM25 hits
+_CATEGORY_PROGRAMS = {
+    "prouni": "prouni",
+    "sisu": "sisu",
+    "cloudinha": "cloudinha",
+    "passport": "passport",
+    "general": "programs",
+    "partner": "programs",
+}
+# Minimum BM25 score of the best passage for index-based routing to be trusted
+_ROUTING_MIN_SCORE = 2.0
+_DIGEST_HINT = "Se este resumo não responder à pergunta, chame smartResearchTool novamente com full_text=True para ler os documentos completos do parceiro."
+
 
 @safe_execution(error_type="tool_error", default_return="Erro na pesquisa inteligente.")
-async def smartResearchTool(query: str, program: str = None, partner_name: str = None, collection_name: str = "documents") -> str:
+async def smartResearchTool(query: str, program: str = None, partner_name: str = None, collection_name: str = "documents", full_text: bool = False) -> str:
     """
     Realiza uma pesquisa inteligente sobre programas educacionais.
 
     Fluxo de decisão:
     1. Se target_program é fornecido, usa esse valor diretamente.
-    2. Se não, detecta automaticamente pelo conteúdo da query.
-    3. Busca o conteúdo na base de conhecimento do banco (Supabase).
-    4. Se nenhum conteúdo for encontrado, faz fallback para busca na web.
+    2. Se não, detecta automaticamente pelo conteúdo da query (palavras-chave e, em seguida, índice BM25 da base).
+    3. Para parceiros, responde primeiro com o resumo estruturado do parceiro (se ele cobrir a pergunta).
+    4. Busca o conteúdo na base de conhecimento do banco (Supabase), com as fontes em paralelo.
+       Se o índice não tem documentos para o programa, a busca web começa junto e é cancelada se a base responder.
+    5. Se nenhum conteúdo for encontrado, faz fallback para busca na web.
 
     Args:
         query (str): A pergunta ou dúvida do usuário.
@@ -29,9 +51,12 @@ async def smartResearchTool(query: str, program: str = None, partner_name: str =
             Usar o nome exato como retornado por getEligibilityResultsTool.
             Ex: 'Bolsa Integral do Insper', 'Fundação Behring'.
         collection_name (str): Nome da coleção RAG (em standby). Padrão: 'documents'.
+        full_text (bool): Ignora o resumo do parceiro e retorna os documentos completos.
+            Use quando um resumo anterior não respondeu à pergunta.
 
     Returns:
         str: Texto com o conteúdo relevante encontrado, prefixado com a fonte.
+             Documentos maiores que RESEARCH_CONTEXT_BUDGET_CHARS são reduzidos às seções mais relevantes.
     """
 
     query_lower = query.lower()
@@ -39,55 +64,137 @@ async def smartResearchTool(query: str, program: str = None, partner_name: str =
     # 1. Determine program (explicit or heuristic)
     if not program:
         program = _detect_target_program(query_lower, partner_name=partner_name)
+        if not program:
+            program = await asyncio.to_thread(_route_by_index, query)
     else:
         program = program.lower().strip()
 
     print(f"[SmartResearch] query='{query}'. program='{program}'. partner_name='{partner_name}'")
 
+    reason = f"Full Context não disponível no banco para program={program}"
+
+    # When the index shows no documents for this program, the web search starts alongside the KB fetch
+    speculative_web = None
+    if _kb_likely_empty(program, partner_name):
+        print(f"[SmartResearch] Base sem documentos indexados para program={program}. Busca web especulativa iniciada.")
+        speculative_web = asyncio.create_task(perform_web_fallback(query, reason, program=program))
+
+    try:
+        kb_reply = await _kb_reply(query, program, partner_name, full_text)
+    except BaseException:
+        if speculative_web:
+            speculative_web.cancel()
+        raise
+
+    if kb_reply:
+        if speculative_web:
+            speculative_web.cancel()  # only stops waiting; the shared web search finishes and is cached
+            print("[SmartResearch] Conteúdo da base encontrado. Busca web especulativa cancelada.")
+        return kb_reply
+
+    # 5. RAG (Em Standby - Desativado)
+    # 6. Fallback para Web
+    if speculative_web:
+        return await speculative_web
+    return await perform_web_fallback(query, reason, program=program)
+
+
+async def _kb_reply(query: str, program: str, partner_name: str = None, full_text: bool = False) -> str:
+    """Knowledge-base answer for the program, or None when the KB has nothing. Sources are fetched concurrently."""
     # 2. Handle 'passport' — workflow documentation from DB
     if program == "passport":
-        content = getKnowledgeContentTool(category="passport")
+        content = await asyncio.to_thread(getKnowledgeContentTool, category="passport")
         if content and _KB_FALLBACK not in content:
-            return f"FONTE: DOCUMENTAÇÃO DO PASSAPORTE - FULL CONTEXT\n\n{content}"
-        else:
-            print("[SmartResearch] Nenhum conteúdo passport no banco. Fallback web.")
+            content, scope = _focus(content, query)
+            return f"FONTE: DOCUMENTAÇÃO DO PASSAPORTE - {scope}\n\n{content}"
+        print("[SmartResearch] Nenhum conteúdo passport no banco. Fallback web.")
 
     # 3. Handle 'programs' — general knowledge + specific partner from DB
     if program == "programs":
-        general_content = getKnowledgeContentTool(category="general")
-        general_section = ""
+        # Ambiguous partner: the options go back to the agent instead of a guessed partner's content
+        if partner_name:
+            resolution = await asyncio.to_thread(partner_directory.resolve, partner_name)
+            if resolution["ambiguous"]:
+                return ambiguity_message(partner_name, resolution)
+
+        if partner_name and not full_text:
+            digest_reply = await asyncio.to_thread(_digest_reply, query, partner_name)
+            if digest_reply:
+                return digest_reply
+
+        general_fetch = asyncio.to_thread(getKnowledgeContentTool, category="general")
+        if partner_name:
+            partner_fetch = asyncio.to_thread(getKnowledgeContentTool, partner_name=partner_name)
+            general_content, partner_content = await asyncio.gather(general_fetch, partner_fetch)
+        else:
+            general_content, partner_content = await general_fetch, None
+
+        contents = []
         if general_content and _KB_FALLBACK not in general_content:
-            general_section = f"=== BASE DE CONHECIMENTO GERAL ===\n\n{general_content}\n\n"
+            contents.append(general_content)
 
-        partner_section = ""
         if partner_name:
-            partner_content = getKnowledgeContentTool(partner_name=partner_name)
             if partner_content and _KB_FALLBACK not in partner_content:
-                partner_section = f"=== DOCUMENTAÇÃO ESPECÍFICA: {partner_name.upper()} ===\n\n{partner_content}"
+                contents.append(partner_content)
             else:
                 print(f"[SmartResearch] getKnowledgeContentTool(partner_name='{partner_name}') sem dados.")
 
-        if general_section or partner_section:
-            combined = general_section + partner_section
+        if contents:
+            # Partner name joins the query so the partner's own documents rank first
+            ranking_query = f"{query} {partner_name}" if partner_name else query
+            combined, scope = _focus("\n\n---\n\n".join(contents), ranking_query)
             source_label = f"PARCEIRO ({partner_name.upper()})" if partner_name else "PROGRAMAS EDUCACIONAIS"
-            return f"FONTE: {source_label} - FULL CONTEXT\n\n{combined}"
-        else:
-            print("[SmartResearch] Nenhum conteúdo encontrado para programs.")
+            return f"FONTE: {source_label} - {scope}\n\n{combined}"
+        print("[SmartResearch] Nenhum conteúdo encontrado para programs.")
 
     # 4. Handle prouni/sisu/cloudinha — from DB
     if program in ("prouni", "sisu", "cloudinha"):
         print(f"[SmartResearch] Buscando '{program}' no banco.")
-        kb_content = getKnowledgeContentTool(category=program)
+        kb_content = await asyncio.to_thread(getKnowledgeContentTool, category=program)
 
         if kb_content and _KB_FALLBACK not in kb_content:
-            return f"FONTE: DOCUMENTAÇÃO OFICIAL ({program.upper()}) - FULL CONTEXT\n\n{kb_content}"
-        else:
-            print(f"[SmartResearch] Nenhum conteúdo para '{program}' no banco.")
+            kb_content, scope = _focus(kb_content, query)
+            return f"FONTE: DOCUMENTAÇÃO OFICIAL ({program.upper()}) - {scope}\n\n{kb_content}"
+        print(f"[SmartResearch] Nenhum conteúdo para '{program}' no banco.")
 
-    # 5. RAG (Em Standby - Desativado)
-    # 6. Fallback para Web
-    reason = f"Full Context não disponível no banco para program={program}"
-    return await perform_web_fallback(query, reason, program=program)
+    return None
+
+
+def _kb_likely_empty(program: str, partner_name: str = None) -> bool:
+    """True when the (already loaded) knowledge index has no document for the sources this program reads."""
+    if program in ("passport", "prouni", "sisu", "cloudinha"):
+        return knowledge_index.has_documents(category=program) is False
+    if program == "programs":
+        if knowledge_index.has_documents(category="general") is not False:
+            return False
+        partner_id = resolve_partner_id(partner_name) if partner_name else None
+        return not partner_id or knowledge_index.has_documents(partner_ids=[partner_id]) is False
+    return False
+
+
+def _focus(content: str, query: str) -> tuple:
+    """Reduces knowledge content to the sections relevant to the query, within the configured budget."""
+    selection = select_sections(content, query, RESEARCH_CONTEXT_BUDGET_CHARS)
+    if not selection["trimmed"]:
+        return content, "FULL CONTEXT"
+    print(f"[SmartResearch] {selection['sections']}/{selection['total_sections']} seções selecionadas ({len(selection['text'])} de {len(content)} caracteres).")
+    return selection["text"], f"SEÇÕES RELEVANTES ({selection['sections']} de {selection['total_sections']})"
+
+
+def _digest_reply(query: str, partner_name: str) -> str:
+    """The partner's precomputed digest (only the fields asked about), if it covers the question."""
+    try:
+        digest = partner_digests.get(supabase, resolve_partner_id(partner_name))
+    except Exception as e:
+        print(f"[SmartResearch] Resumo do parceiro indisponível: {e}")
+        return None
+    if not digest or not digest_answers(digest, query, partner_name):
+        return None
+
+    fields = query_fields(query)
+    text = format_digest(digest, fields + ["links"] if fields else None)
+    print(f"[SmartResearch] Respondendo com o resumo de '{digest['partner_name']}' ({len(text)} de {digest.get('source_chars')} caracteres).")
+    return f"FONTE: PARCEIRO ({partner_name.upper()}) - RESUMO ESTRUTURADO\n\n{text}\n\n{_DIGEST_HINT}"
 
 
 def _detect_target_program(query_lower: str, partner_name: str = None) -> str:
@@ -125,6 +232,24 @@ def _detect_target_program(query_lower: str, partner_name: str = None) -> str:
     return None
 
 
+def _route_by_index(query: str) -> str:
+    """Fallback routing: the knowledge category whose passages best match the query (BM25)."""
+    hits = knowledge_index.search(query, k=5)
+    if not hits or hits[0]["score"] < _ROUTING_MIN_SCORE:
+        return None
+
+    votes = {}
+    for hit in hits:
+        routed = _CATEGORY_PROGRAMS.get(hit["category"])
+        if routed:
+            votes[routed] = votes.get(routed, 0.0) + hit["score"]
+    if not votes:
+        return None
+    program = max(votes, key=votes.get)
+    print(f"[SmartResearch] program='{program}' detectado pelo índice BM25 ({hits[0]['title']} / {hits[0]['heading']}).")
+    return program
+
+
 async def perform_web_fallback(query: str, reason: str, program: str = None) -> str:
     print(f"[SmartResearch] Iniciando busca Web. Motivo: {reason}")
 
@@ -133,7 +258,7 @@ async def perform_web_fallback(query: str, reason: str, program: str = None) ->
         site = "partners.link"
         print(f"[SmartResearch] Usando site='{site}' como referência.")
 
-    web_result = duckDuckGoSearchTool(query, site=site)
+    web_result = await duckDuckGoSearchTool(query, site=site)
 
     print(f"[SmartResearch] Web Search concluído.")
     source_label = f"PESQUISA NA WEB ({reason})"
@@ -1,103 +1,166 @@
 from src.lib.error_handler import safe_execution
+from src.lib.tool_memo import mutates
 import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+from postgrest.exceptions import APIError
 from src.agent.agent import supabase_client
+from src.lib.partner_cache import get_partner_application_config
+from src.lib.partner_directory import partner_directory, is_uuid, ambiguity_message
+from src.lib.active_applications import remember_active_application, invalidate_active_application
+
+# Shared pool for the independent reads/writes of the application start pipeline
+_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="start-app")
+
+
+def _run_parallel(*calls):
+    """Runs independent Supabase calls concurrently and returns their results in order."""
+    futures = [_EXECUTOR.submit(call) for call in calls]
+    return [f.result() for f in futures]
+
+
+def _first_row(res) -> dict:
+    return res.data[0] if res is not None and res.data else {}
+
+
+_COLUMN_RE = re.compile(r"^[a-z_][a-z0-9_]*$")
+
+
+def _mapped_columns(mapping_data: list, table: str) -> list:
+    """Columns of `table` referenced by the partner form's mapping_source values (valid identifiers only)."""
+    columns = []
+    for item in mapping_data:
+        parts = (item.get("mapping_source") or "").split(".")
+        if len(parts) == 2 and parts[0] == table and _COLUMN_RE.match(parts[1]) and parts[1] not in columns:
+            columns.append(parts[1])
+    return columns
+
+
+def _select_row(table: str, columns: list, key: str, value: str):
+    """
+    Reads only `columns` of the row. mapping_source is typed by admins, so a
+    column that doesn't exist (PostgREST 400) falls back to select("*"), where
+    the unknown mapping is simply not found, as before.
+    """
+    query = lambda cols: supabase_client.table(table).select(cols).eq(key, value).execute()
+    try:
+        return query(", ".join(columns))
+    except APIError as e:
+        print(f"[StartApplication] Coluna mapeada inválida em {table} ({e.message}); lendo todas as colunas.")
+        return query("*")
+
 
 @safe_execution(error_type="start_student_application_error", default_return="Erro ao iniciar aplicação.")
+@mutates("profile", "application", "forms")
 def startStudentApplicationTool(user_id: str, partner_id: str, target_user_id: str = None) -> str:
     """
     Inicia uma nova aplicação para um programa parceiro e pré-preenche os dados com base no mapping_source definido no formulário.
     É usada quando o usuário escolhe um programa parceiro para se aplicar.
     Só permite iniciar 1 aplicação por parceiro a cada 6 meses.
-    
+
     Args:
         user_id: string. O ID do usuário (geralmente passado por USER_ID_CONTEXT).
         partner_id: string. O ID do parceiro (UUID) ou o NOME do parceiro para o qual será feita a inscrição.
         target_user_id: string opcional. O ID do usuário real da aplicação, passado pelo frontend. Se omitido, cai no fallback.
     """
-    import uuid
     from datetime import datetime, timedelta
-    
-    # 1. Resolve partner ID if a name was provided
-    resolved_partner_id = partner_id
-    try:
-        uuid.UUID(partner_id)
-    except ValueError:
-        # It's not a UUID, so treat it as a name
-        name_res = supabase_client.table("partners").select("id").ilike("name", f"%{partner_id}%").execute()
-        if not name_res.data:
+
+    # 1. Resolve partner name locally, then load redirect config and form mappings — cached in process
+    resolved_ref = partner_id
+    if not is_uuid(partner_id):
+        resolution = partner_directory.resolve(partner_id)
+        if not resolution["partner_id"]:
             return f"Nenhum parceiro encontrado com o nome fornecido: {partner_id}."
-        resolved_partner_id = name_res.data[0]["id"]
+        if resolution["ambiguous"]:
+            return ambiguity_message(partner_id, resolution)
+        resolved_ref = resolution["partner_id"]
+
+    partner = get_partner_application_config(resolved_ref)
+    if not partner:
+        return f"Nenhum parceiro encontrado com o nome fornecido: {partner_id}."
+    resolved_partner_id = partner["id"]
 
     # 1.5. Check for external redirect before doing anything else
-    partner_res = supabase_client.table("partners").select("external_redirect_config").eq("id", resolved_partner_id).execute()
-    if partner_res.data and partner_res.data[0].get("external_redirect_config"):
-        config = partner_res.data[0]["external_redirect_config"]
+    config = partner.get("external_redirect_config")
+    if config:
         url = config.get("url", "")
         msg = config.get("message", "A inscrição é feita em um site externo.")
         return f"ATENÇÃO: A inscrição para este parceiro é externa. A fase do usuário NÃO foi alterada e NENHUM formulário interno foi aberto. Repasse o link ao usuário. Diga a ele: {msg}. Link de inscrição: {url}"
 
+    mapping_data = partner["mappings"]
+    profile_columns = _mapped_columns(mapping_data, "user_profiles")
+    pref_columns = _mapped_columns(mapping_data, "user_preferences")
+    six_months_ago = (datetime.now() - timedelta(days=180)).isoformat()
+
+    def fetch_existing(student_id: str):
+        return lambda: supabase_client.table("student_applications") \
+            .select("id, status, created_at") \
+            .eq("user_id", student_id) \
+            .eq("partner_id", resolved_partner_id) \
+            .gte("created_at", six_months_ago) \
+            .order("created_at", desc=True) \
+            .limit(1) \
+            .execute()
+
+    def fetch_profile(profile_id: str, extra_columns: list = None):
+        columns = ["id"] + (extra_columns or []) + [c for c in profile_columns if c not in (extra_columns or [])]
+        return lambda: _select_row("user_profiles", columns, "id", profile_id)
+
+    fetch_prefs = None
+    if pref_columns:
+        fetch_prefs = lambda: _select_row("user_preferences", pref_columns, "user_id", user_id)
 
-    # 2. Determine who is applying (self or dependent)
-    student_id = user_id
+    # 2. Batched reads. The duplicate check and profile fetch for `user_id` are issued
+    # speculatively alongside the parent lookup, since most users apply for themselves.
+    student_id = target_user_id or user_id
     if target_user_id:
-        student_id = target_user_id
         print(f"!!! [START APP] Using explicit target_user_id: {student_id}")
+        existing_res, profile_res, pref_res = _run_parallel(
+            fetch_existing(student_id), fetch_profile(student_id), fetch_prefs or (lambda: None)
+        )
     else:
-        # Fallback: Fetch parent profile to check what the active target is
-        parent_res = supabase_client.table("user_profiles").select("active_application_target_id").eq("id", user_id).execute()
-        if parent_res.data and parent_res.data[0].get("active_application_target_id"):
-            student_id = parent_res.data[0]["active_application_target_id"]
+        existing_res, profile_res, pref_res = _run_parallel(
+            fetch_existing(user_id), fetch_profile(user_id, ["active_application_target_id"]), fetch_prefs or (lambda: None)
+        )
+        # Fallback: the parent profile tells us what the active target is
+        active_target = _first_row(profile_res).get("active_application_target_id")
+        if active_target and active_target != user_id:
+            student_id = active_target
             print(f"!!! [START APP] Using fallback active_application_target_id: {student_id}")
+            existing_res, profile_res = _run_parallel(fetch_existing(student_id), fetch_profile(student_id))
 
-    # 3. Check for existing application within 6 months FOR THE STUDENT
-    six_months_ago = (datetime.now() - timedelta(days=180)).isoformat()
-    existing_app_res = supabase_client.table("student_applications") \
-        .select("id, status, created_at") \
-        .eq("user_id", student_id) \
-        .eq("partner_id", resolved_partner_id) \
-        .gte("created_at", six_months_ago) \
-        .order("created_at", desc=True) \
-        .limit(1) \
-        .execute()
-
-    if existing_app_res.data:
-        existing_app = existing_app_res.data[0]
+    # 3. Existing application within 6 months FOR THE STUDENT
+    if existing_res.data:
+        existing_app = existing_res.data[0]
         status = existing_app.get("status")
-        
-        # Bump updated_at so the frontend picks this application as the most recent
-        supabase_client.table("student_applications").update({"updated_at": datetime.now().isoformat()}).eq("id", existing_app["id"]).execute()
-        
-        # Advance passport_phase to correct state anyway
         next_phase = "CONCLUDED" if status == "SUBMITTED" else "EVALUATE"
-        supabase_client.table("user_profiles").update({"passport_phase": next_phase}).eq("id", user_id).execute()
-        
+
+        # Bump updated_at so the frontend picks this application as the most recent,
+        # and advance passport_phase to the correct state anyway
+        _run_parallel(
+            lambda: supabase_client.table("student_applications").update({"updated_at": datetime.now().isoformat()}).eq("id", existing_app["id"]).execute(),
+            lambda: supabase_client.table("user_profiles").update({"passport_phase": next_phase}).eq("id", user_id).execute(),
+        )
+        invalidate_active_application(student_id)
+
         if status == "SUBMITTED":
             return "Você já enviou uma candidatura para este programa nos últimos 6 meses. Como ela já foi enviada, estou te levando para a tela de conclusão para você ver o resultado."
         else:
             return "Você já tem uma candidatura em andamento para este programa. Estou te levando de volta para o formulário para você continuar de onde parou."
 
-    # 4. Fetch partner form mapping source and field names
-    form_res = supabase_client.table("partner_forms").select("field_name, mapping_source").eq("partner_id", resolved_partner_id).execute()
-    if not form_res.data:
+    # 4. Partner form must exist
+    if not partner["has_form"]:
         return f"Nenhum formulário ou mapeamento encontrado para o partner_id {resolved_partner_id}."
-        
-    mapping_data = [{"field_name": f.get("field_name"), "mapping_source": f.get("mapping_source")} 
-                  for f in form_res.data if f.get("mapping_source")]
-    
-    # 5. Fetch User Profile & Preferences for data pre-fill
-    profile_res = supabase_client.table("user_profiles").select("*").eq("id", student_id).execute()
-    pref_res = supabase_client.table("user_preferences").select("*").eq("user_id", user_id).execute()
-    
-    profile_data = profile_res.data[0] if profile_res.data else {}
-    pref_data = pref_res.data[0] if pref_res.data else {}
-    
-    # 6. Build Dynamic Answers (Pre-fill)
+
+    profile_data = _first_row(profile_res)
+    pref_data = _first_row(pref_res)
+
+    # 5. Build Dynamic Answers (Pre-fill)
     answers = {}
     for item in mapping_data:
         mapping = item["mapping_source"]
         field_name_key = item["field_name"]
-        if not mapping or not field_name_key: continue
-        
+
         parts = mapping.split(".")
         if len(parts) == 2:
             source_table, field_name = parts
@@ -106,23 +169,33 @@ def startStudentApplicationTool(user_id: str, partner_id: str, target_user_id: s
                 value = profile_data[field_name]
             elif source_table == "user_preferences" and field_name in pref_data:
                 value = pref_data[field_name]
-            
+
             if value is not None and value != "":
                 answers[field_name_key] = value
-    
-    # 7. Insert into student_applications
+
+    # 6. Insert into student_applications
     payload = {
         "user_id": student_id,
         "partner_id": resolved_partner_id,
         "answers": answers,
         "status": "DRAFT"
     }
-    
-    supabase_client.table("student_applications").insert(payload).execute()
-    
-    # 8. Advance passport_phase to EVALUATE
-    supabase_client.table("user_profiles").update({"passport_phase": "EVALUATE"}).eq("id", user_id).execute()
-    
+
+    insert_res = supabase_client.table("student_applications").insert(payload).execute()
+
+    # 7. Advance passport_phase to EVALUATE. If this fails, remove the draft we just
+    # created so a retry does not find a half-started application.
+    try:
+        supabase_client.table("user_profiles").update({"passport_phase": "EVALUATE"}).eq("id", user_id).execute()
+    except Exception:
+        new_app = _first_row(insert_res)
+        if new_app.get("id"):
+            supabase_client.table("student_applications").delete().eq("id", new_app["id"]).execute()
+        invalidate_active_application(student_id)
+        raise
+
+    remember_active_application(student_id, _first_row(insert_res))
+
     # Build human-friendly labels for pre-filled fields
     FIELD_LABELS = {
         "user_profiles.full_name": "Nome Completo",
@@ -135,5 +208,5 @@ def startStudentApplicationTool(user_id: str, partner_id: str, target_user_id: s
     }
     prefilled_labels = [FIELD_LABELS.get(k, k.split(".")[-1]) for k in answers.keys()]
     prefilled_str = ", ".join(prefilled_labels) if prefilled_labels else "nenhum"
-    
+
     return f"Aplicação iniciada com sucesso. Fase avançada para EVALUATE. O formulário do programa está aberto na tela do estudante. Campos pré-preenchidos automaticamente: {prefilled_str}."
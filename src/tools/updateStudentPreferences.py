@@ -4,6 +4,7 @@ from src.lib.supabase import supabase
 from src.tools.searchOpportunities import searchOpportunitiesTool
 from src.tools.updateStudentProfile import standardize_city, standardize_state
 from src.lib.error_handler import safe_execution
+from src.lib.tool_memo import mutates
 
 @safe_execution(error_type="tool_error", default_return=None)
 def get_city_coordinates_from_db(city_name: str, state_code: Optional[str] = None):
@@ -28,6 +29,7 @@ def get_city_coordinates_from_db(city_name: str, state_code: Optional[str] = Non
     return None
 
 @safe_execution(error_type="tool_error", default_return='{"success": false, "error": "Erro ao atualizar preferências."}')
+@mutates("profile", "eligibility")
 def updateStudentPreferencesTool(user_id: str, updates: Dict[str, Any]) -> str:
     """
     Atualiza as preferências de busca do aluno (curso, nota, turno, etc.) e dispara a busca de oportunidades.
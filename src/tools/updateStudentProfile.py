@@ -2,6 +2,7 @@ from typing import Optional, Dict, Any, List, Union
 import json
 from src.lib.supabase import supabase
 from src.lib.error_handler import safe_execution
+from src.lib.tool_memo import mutates
 
 # Cache for state mappings
 _STATES_CACHE = {}
@@ -120,6 +121,7 @@ def standardize_city(city_input: str) -> Optional[Dict[str, str]]:
     return None
 
 @safe_execution(error_type="tool_error", default_return='{"success": false, "error": "Erro ao atualizar perfil."}')
+@mutates("profile", "eligibility", "forms")
 def updateStudentProfileTool(user_id: str, updates: Dict[str, Any]) -> str:
     """Atualiza os dados do aluno durante a conversa."""
     
@@ -0,0 +1,81 @@
+"""
+Tests for the in-process active-application index shared by the form/application tools.
+"""
+import sys
+import os
+from unittest.mock import patch
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+os.environ["SUPABASE_URL"] = "https://mock.supabase.co"
+os.environ["SUPABASE_KEY"] = "mock-key"
+
+from src.lib import active_applications
+from src.lib.active_applications import (
+    get_active_application,
+    remember_active_application,
+    invalidate_active_application,
+)
+
+PARTNER_ID = "5f0c8e52-4c8e-4b8a-9d7e-0a1b2c3d4e5f"
+DRAFT = {"id": "app-1", "partner_id": PARTNER_ID, "updated_at": "2026-01-01T00:00:00"}
+
+
+def _draft_chain(mock_supabase):
+    return mock_supabase.table.return_value.select.return_value.eq.return_value.eq.return_value.order.return_value.limit.return_value
+
+
+@patch("src.lib.active_applications.supabase")
+def test_lookup_is_reused_within_fresh_window(mock_supabase):
+    invalidate_active_application()
+    chain = _draft_chain(mock_supabase)
+    chain.execute.return_value.data = [dict(DRAFT)]
+
+    assert get_active_application("u1")["partner_id"] == PARTNER_ID
+    assert get_active_application("u1")["id"] == "app-1"
+    assert chain.execute.call_count == 1
+
+
+@patch("src.lib.active_applications.supabase")
+def test_stale_entry_is_reread(mock_supabase):
+    invalidate_active_application()
+    chain = _draft_chain(mock_supabase)
+    chain.execute.return_value.data = [dict(DRAFT)]
+    get_active_application("u1")
+
+    active_applications._ACTIVE_APPS["u1"]["checked_at"] -= active_applications.FRESH_SECONDS + 1
+    chain.execute.return_value.data = []
+
+    assert get_active_application("u1") is None
+    assert chain.execute.call_count == 2
+
+
+@patch("src.lib.active_applications.supabase")
+def test_stale_entry_is_revalidated_by_updated_at(mock_supabase):
+    invalidate_active_application()
+    chain = _draft_chain(mock_supabase)
+    chain.execute.return_value.data = [dict(DRAFT)]
+    cached = get_active_application("u1")
+
+    # Unchanged draft: one query, the cached entry is kept
+    active_applications._ACTIVE_APPS["u1"]["checked_at"] -= active_applications.FRESH_SECONDS + 1
+    assert get_active_application("u1") is cached
+    assert chain.execute.call_count == 2
+
+    # Draft edited elsewhere: replaced from that same single query
+    active_applications._ACTIVE_APPS["u1"]["checked_at"] -= active_applications.FRESH_SECONDS + 1
+    edited = {**DRAFT, "partner_id": "other", "updated_at": "2026-01-02T00:00:00"}
+    chain.execute.return_value.data = [edited]
+    assert get_active_application("u1") == edited
+    assert chain.execute.call_count == 3
+    mock_supabase.table.return_value.select.assert_called_with(active_applications.ACTIVE_APP_COLUMNS)
+
+
+@patch("src.lib.active_applications.supabase")
+def test_remembered_draft_skips_database(mock_supabase):
+    invalidate_active_application()
+    remember_active_application("u2", {**DRAFT, "answers": {"nome": "Ana"}})
+
+    app = get_active_application("u2")
+
+    assert app == DRAFT
+    mock_supabase.table.assert_not_called()
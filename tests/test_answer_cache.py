@@ -0,0 +1,89 @@
+"""
+Tests for the semantic answer cache: similarity within phase/partner scope, TTL and knowledge invalidation.
+"""
+import sys
+import os
+import asyncio
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+os.environ.setdefault("SUPABASE_URL", "https://mock.supabase.co")
+os.environ.setdefault("SUPABASE_KEY", "mock-key")
+
+from src.lib.answer_cache import AnswerCache
+from src.lib.embeddings import HashEmbeddingBackend
+
+backend = HashEmbeddingBackend()
+
+
+async def _embed(text):
+    return backend.name, (await backend.embed([text]))[0]
+
+
+def _cache(version, **kwargs):
+    return AnswerCache(embed_fn=_embed, version_fn=lambda: version["v"], refresh_fn=lambda: None, **kwargs)
+
+
+def test_similar_question_in_same_scope_is_served_from_cache():
+    version = {"v": "kb-1"}
+    cache = _cache(version, threshold=0.8)
+
+    async def scenario():
+        stored = await cache.store("PROGRAM_MATCH", "O que o Insper oferece na bolsa integral?", "O Insper oferece...", ["insper"])
+        hit = await cache.lookup("PROGRAM_MATCH", "o que o insper oferece na bolsa integral")
+        other_phase = await cache.lookup("ONBOARDING", "O que o Insper oferece na bolsa integral?")
+        no_partner = await cache.lookup("PROGRAM_MATCH", "O que ele oferece na bolsa integral?")
+        follow_up = await cache.store("PROGRAM_MATCH", "e a bolsa parcial?", "A parcial...", ["insper"])
+        return stored, hit, other_phase, no_partner, follow_up
+
+    stored, hit, other_phase, no_partner, follow_up = asyncio.run(scenario())
+    assert stored and hit["answer"] == "O Insper oferece..." and hit["similarity"] >= 0.8
+    assert other_phase is None and no_partner is None
+    assert follow_up is False  # relied on the conversation for the partner
+
+
+def test_entries_expire_and_are_dropped_when_knowledge_changes():
+    version = {"v": "kb-1"}
+    cache = _cache(version)
+
+    async def scenario():
+        await cache.store("ONBOARDING", "Qual a renda máxima do Prouni?", "Até 1,5 salário mínimo...", ["prouni"])
+        before = await cache.lookup("ONBOARDING", "Qual a renda máxima do Prouni?")
+        version["v"] = "kb-2"
+        after_edit = await cache.lookup("ONBOARDING", "Qual a renda máxima do Prouni?")
+
+        await cache.store("ONBOARDING", "Qual a renda máxima do Prouni?", "Até 1,5 salário mínimo...", ["prouni"])
+        cache.ttl_seconds = -1
+        expired = await cache.lookup("ONBOARDING", "Qual a renda máxima do Prouni?")
+        return before, after_edit, expired
+
+    before, after_edit, expired = asyncio.run(scenario())
+    assert before is not None and after_edit is None and expired is None
+    assert cache.stats["invalidated"] == 1 and cache.stats["expired"] == 1 and len(cache) == 0
+
+
+def test_lookups_alone_notice_an_edited_document():
+    version = {"v": "kb-1"}
+    edits = []
+
+    def refresh():
+        if edits:
+            version["v"] = edits.pop()
+
+    cache = AnswerCache(embed_fn=_embed, version_fn=lambda: version["v"], refresh_fn=refresh)
+
+    async def scenario():
+        await cache.store("ONBOARDING", "Qual a renda máxima do Prouni?", "Até 1,5 salário mínimo...", ["prouni"])
+        hot = await cache.lookup("ONBOARDING", "Qual a renda máxima do Prouni?")
+        edits.append("kb-2")  # the document changes; no store() runs afterwards
+        after_edit = await cache.lookup("ONBOARDING", "Qual a renda máxima do Prouni?")
+        return hot, after_edit
+
+    hot, after_edit = asyncio.run(scenario())
+    assert hot is not None and after_edit is None
+    assert cache.stats["invalidated"] == 1 and len(cache) == 0
+
+
+def test_unscoped_answers_are_not_cached():
+    cache = _cache({"v": "kb-1"})
+    stored = asyncio.run(cache.store("PROGRAM_MATCH", "Como funciona a plataforma?", "A Nubo...", []))
+    assert stored is False and len(cache) == 0
@@ -0,0 +1,49 @@
+"""
+Tests for the file-backed asset manager: memory hits, mtime hot reload and derived values.
+"""
+import sys
+import os
+from unittest.mock import MagicMock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+from src.lib.assets import AssetManager
+
+
+def _touch(path, content, mtime):
+    path.write_text(content, encoding="utf-8")
+    os.utime(path, ns=(mtime, mtime))
+
+
+def test_files_are_served_from_memory_until_they_change(tmp_path):
+    rules = tmp_path / "edital.md"
+    _touch(rules, "versão 1", 1_000_000_000)
+    manager = AssetManager(check_seconds=0)
+
+    assert manager.text(str(rules)) == "versão 1"
+    assert manager.text(str(rules)) == "versão 1"
+    assert manager.report()["files"][str(rules)]["reloads"] == 0
+
+    _touch(rules, "versão 2", 2_000_000_000)
+    assert manager.text(str(rules)) == "versão 2"
+    assert manager.report()["files"][str(rules)]["reloads"] == 1
+    assert manager.text(str(tmp_path / "missing.md")) is None
+
+
+def test_directory_listing_and_derived_values_follow_the_disk(tmp_path):
+    _touch(tmp_path / "a.md", "A", 1_000_000_000)
+    (tmp_path / "ignore.pdf").write_bytes(b"%PDF")
+    manager = AssetManager(check_seconds=0)
+
+    assert [os.path.basename(p) for p, _ in manager.directory(str(tmp_path))] == ["a.md"]
+    _touch(tmp_path / "b.txt", "B", 1_000_000_000)
+    assert [text for _, text in manager.directory(str(tmp_path))] == ["A", "B"]
+
+    build = MagicMock(side_effect=lambda: manager.text(str(tmp_path / "a.md")) + "!")
+    assert manager.derived("ctx", [str(tmp_path / "a.md")], build) == "A!"
+    assert manager.derived("ctx", [str(tmp_path / "a.md")], build) == "A!"
+    assert build.call_count == 1
+
+    _touch(tmp_path / "a.md", "A2", 2_000_000_000)
+    assert manager.derived("ctx", [str(tmp_path / "a.md")], build) == "A2!"
+    assert build.call_count == 2
@@ -0,0 +1,79 @@
+"""
+Tests for the Portuguese BM25 index and the knowledge-base passage index built on it.
+"""
+import sys
+import os
+from unittest.mock import patch, MagicMock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+os.environ["SUPABASE_URL"] = "https://mock.supabase.co"
+os.environ["SUPABASE_KEY"] = "mock-key"
+
+from src.lib.bm25 import BM25Index, analyze, stem_pt
+from src.lib.knowledge_index import KnowledgeIndex
+
+
+def test_analyzer_folds_accents_plurals_and_stop_words():
+    assert analyze("As inscrições do ProUni") == analyze("inscricao prouni")
+    assert stem_pt("documentos") == stem_pt("documento")
+    assert "de" not in analyze("comprovante de renda")
+
+
+def test_search_ranks_matching_document_first():
+    index = BM25Index()
+    index.add("renda", "Comprovação de renda familiar per capita")
+    index.add("docs", "Documentos necessários: RG e CPF")
+    index.add("datas", "Cronograma de inscrições e resultados")
+
+    hits = index.search("qual a renda exigida?")
+
+    assert [h["id"] for h in hits] == ["renda"]
+
+
+def test_incremental_replace_and_remove():
+    index = BM25Index()
+    index.add("a", "bolsa integral")
+    index.add("b", "bolsa parcial")
+    index.add("a", "transporte gratuito")
+    index.remove("b")
+
+    assert index.search("bolsa") == []
+    assert [h["id"] for h in index.search("transporte")] == ["a"]
+    assert len(index) == 1
+
+
+def _kb_client(docs, categories, files):
+    tables = {
+        "knowledge_documents": MagicMock(),
+        "knowledge_categories": MagicMock(),
+    }
+    tables["knowledge_documents"].select.return_value.eq.return_value.execute.return_value.data = docs
+    tables["knowledge_categories"].select.return_value.execute.return_value.data = categories
+    client = MagicMock()
+    client.table.side_effect = lambda name: tables[name]
+    client.storage.from_.return_value.list.return_value = []
+    client.storage.from_.return_value.download.side_effect = lambda path: files[path]
+    return client
+
+
+def test_knowledge_index_reindexes_only_changed_documents():
+    docs = [
+        {"title": "Edital Sisu", "storage_path": "idx/sisu.md", "partner_id": None, "category_id": "c1"},
+        {"title": "Edital ProUni", "storage_path": "idx/prouni.md", "partner_id": None, "category_id": "c2"},
+    ]
+    categories = [{"id": "c1", "name": "sisu"}, {"id": "c2", "name": "prouni"}]
+    files = {"idx/sisu.md": b"## Notas\n\nNota de corte do Sisu.", "idx/prouni.md": b"## Renda\n\nRenda per capita."}
+    client = _kb_client(docs, categories, files)
+
+    with patch("src.lib.knowledge_index.supabase", client), \
+         patch("src.lib.knowledge_index.knowledge_store") as store:
+        store.read_many.side_effect = lambda _, paths: {p: files[p].decode() for p in paths}
+        index = KnowledgeIndex()
+        index.refresh(force=True)
+        hits = index.search("nota de corte")
+        assert hits[0]["category"] == "sisu" and hits[0]["heading"] == "Notas"
+
+        client.table("knowledge_documents").select.return_value.eq.return_value.execute.return_value.data = docs[:1]
+        index.refresh(force=True)
+        assert index.search("renda per capita") == []
+        assert len(index) == 1
@@ -0,0 +1,117 @@
+"""
+Tests for the structure-aware chunker used by RAG ingestion.
+"""
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+from src.lib.chunking import chunk_document, clean_text
+
+EDITAL = """EDITAL Nº 29, DE 22 DE DEZEMBRO DE 2025
+1. DAS INSCRIÇÕES
+1.1. As inscrições para par<cipação no processo sele=vo
+serão efetuadas exclusivamente pela internet, no período
+de 19 de janeiro de 2026 até 23 de janeiro de 2026
+, observado o horário oficial de Brasília-DF.
+1.2.
+1.1.
+ No caso das vagas ofertadas no segundo semestre:
+I - as vagas serão preenchidas segundo a ordem de classificação;
+II - o CANDIDATO não poderá optar pelo semestre.
+Edital 29 (6417071)         SEI 23000.041337/2017-29 / pg. 1
+2. DA DIVULGAÇÃO DO
+RESULTADO DA CHAMADA REGULAR
+2.1. O resultado será divulgado no dia 29 de janeiro de 2026.
+"""
+
+
+def test_clean_text_repairs_pdf_artifacts():
+    text = clean_text(EDITAL)
+    assert "participação no processo seletivo serão efetuadas" in text
+    assert "23 de janeiro de 2026, observado" in text
+    assert "1.2.1.1. No caso" in text
+    assert "2. DA DIVULGAÇÃO DO RESULTADO DA CHAMADA REGULAR" in text
+    assert "SEI" not in text
+
+
+def test_items_stay_whole_under_their_section_path():
+    chunks = chunk_document(EDITAL, title="Edital Sisu")
+
+    first = next(c for c in chunks if "1.2.1.1" in c["items"])
+    assert first["section_path"] == ["1. DAS INSCRIÇÕES"]
+    assert first["content"].startswith("[Edital Sisu > 1. DAS INSCRIÇÕES]\n")
+    # Incisos travel with their item
+    assert "I - as vagas" in first["content"] and "II - o CANDIDATO" in first["content"]
+
+    result = next(c for c in chunks if "2.1" in c["items"])
+    assert result["section_path"] == ["2. DA DIVULGAÇÃO DO RESULTADO DA CHAMADA REGULAR"]
+    assert "1.1" not in result["items"]
+
+
+def test_long_sections_are_packed_without_overlap():
+    items = "\n".join(f"1.{i}. Regra número {i} do processo seletivo com texto suficiente para ocupar espaço." for i in range(1, 41))
+    chunks = chunk_document(f"1. DAS REGRAS\n{items}", max_chars=600)
+
+    assert len(chunks) > 1
+    assert all(len(c["content"]) <= 600 for c in chunks)
+    labels = [label for c in chunks for label in c["items"]]
+    assert labels == [f"1.{i}" for i in range(1, 41)]
+
+
+def test_date_tables_and_subheadings():
+    text = """8. CRONOGRAMA DAS ETAPAS
+Inscrição 01/03/2026 a 29/03/2026
+Prova objetiva 12/04/2026
+Resultado final 30/05/2026
+2. TIPOS DE COMPROVANTES
+2.1 CONTRACHEQUE SEM RENDIMENTOS VARIÁVEIS
+2.1.1 A renda é composta dos créditos do contracheque.
+"""
+    chunks = chunk_document(text)
+
+    dates = [c for c in chunks if c["kind"] == "dates"]
+    assert len(dates) == 1 and dates[0]["content"].count("\n") == 3
+    assert dates[0]["section_path"] == ["8. CRONOGRAMA DAS ETAPAS"]
+
+    income = next(c for c in chunks if "2.1.1" in c["items"])
+    assert income["section_path"] == ["2. TIPOS DE COMPROVANTES", "2.1 CONTRACHEQUE SEM RENDIMENTOS VARIÁVEIS"]
+
+
+def test_markdown_keeps_paragraphs_and_symbols():
+    text = """# Guia ProUni
+
+O ProUni oferece bolsas de estudo integrais e parciais em instituições privadas de ensino superior.
+
+## Renda
+
+A renda familiar bruta mensal por pessoa deve ser <= 1,5 salário mínimo para a bolsa integral.
+
+Para a bolsa parcial, o limite é de até 3 salários mínimos por pessoa.
+"""
+    chunks = chunk_document(text, title="guia", pdf=False)
+
+    assert [c["section_path"] for c in chunks] == [["Guia ProUni"], ["Guia ProUni", "Renda"]]
+    assert "bolsas de estudo integrais" in chunks[0]["content"]
+    assert "<= 1,5 salário mínimo" in chunks[1]["content"]
+    assert "bolsa parcial" in chunks[1]["content"]
+    # Blank-line paragraphs alone don't trigger the word-per-line PDF repair
+    assert len(chunk_document(text)) == 2
+
+
+def test_long_markdown_heading_line_keeps_its_text():
+    body = "O ProUni oferece bolsas de estudo em instituições privadas " * 3
+    chunks = chunk_document(f"# {body}", pdf=False)
+
+    assert len(chunks) == 1 and body.strip() in chunks[0]["content"]
+
+
+def test_markdown_heading_depth_sets_the_path():
+    text = "# Guia\n\n## Renda\n\nTexto da renda.\n\n### Documentos\n\nLista de documentos.\n\n## Prazos\n\nTexto dos prazos.\n"
+    chunks = chunk_document(text, pdf=False)
+
+    assert [c["section_path"] for c in chunks] == [
+        ["Guia", "Renda"],
+        ["Guia", "Renda", "Documentos"],
+        ["Guia", "Prazos"],
+    ]
@@ -0,0 +1,47 @@
+"""
+Tests for the query-embedding cache and micro-batcher (offline hash backend).
+"""
+import sys
+import os
+import asyncio
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+from src.lib.embeddings import EmbeddingCache, EmbeddingService, HashEmbeddingBackend, normalize_query
+
+
+def test_normalize_query_ignores_case_spacing_and_punctuation():
+    assert normalize_query("  O que é o   Prouni? ") == normalize_query("o que é o prouni")
+
+
+def test_concurrent_misses_are_batched_and_deduplicated(tmp_path):
+    backend = HashEmbeddingBackend(dim=16)
+    service = EmbeddingService(backend, EmbeddingCache(path=str(tmp_path / "e.sqlite")))
+
+    async def burst():
+        return await asyncio.gather(
+            service.embed_query("o que é o prouni"),
+            service.embed_query("O que é o Prouni?"),
+            service.embed_query("como funciona o sisu"),
+        )
+
+    a, b, c = asyncio.run(burst())
+
+    assert a == b and a != c
+    assert backend.calls == 1
+    assert service.stats["shared"] == 1 and service.stats["embedded"] == 2
+
+
+def test_disk_tier_survives_a_new_service(tmp_path):
+    path = str(tmp_path / "e.sqlite")
+    backend = HashEmbeddingBackend(dim=16)
+    first = asyncio.run(EmbeddingService(backend, EmbeddingCache(path=path)).embed_query("bolsa integral"))
+
+    restarted = EmbeddingService(backend, EmbeddingCache(path=path))
+    second = asyncio.run(restarted.embed_query("Bolsa integral"))
+
+    assert backend.calls == 1
+    assert second == pytest.approx(first, abs=1e-6)
+    assert restarted.stats["cache_hits"] == 1
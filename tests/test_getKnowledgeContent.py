@@ -13,6 +13,7 @@ os.environ["SUPABASE_KEY"] = "mock-key"
 os.environ["SUPABASE_SERVICE_KEY"] = "mock-service-key"
 
 from src.tools.getKnowledgeContent import getKnowledgeContentTool
+from src.lib.partner_directory import partner_directory
 
 FALLBACK = "Não encontrei informações na base de conhecimento."
 
@@ -23,7 +24,8 @@ def _make_mocks(cat_data=None, partner_data=None, doc_data=None, storage_bytes=b
     mock_cat.select.return_value.eq.return_value.execute.return_value.data = cat_data or []
 
     mock_partners = MagicMock()
-    mock_partners.select.return_value.ilike.return_value.execute.return_value.data = partner_data or []
+    # partner directory loads the whole table once: .select(...).execute()
+    mock_partners.select.return_value.execute.return_value.data = partner_data or []
 
     mock_docs = MagicMock()
     # category path: .select().eq(is_active).eq(category_id).execute()
@@ -65,16 +67,22 @@ def test_category_prouni_returns_content(mock_supabase):
     assert "Conteudo ProUni" in result
 
 
-# RED 2: returns content when partner_name='Insper' (fuzzy ILIKE match)
+# RED 2: returns content when partner_name='Insper' (fuzzy match in the partner directory)
+@patch("src.lib.partner_directory.supabase")
 @patch("src.tools.getKnowledgeContent.supabase")
-def test_partner_name_insper_fuzzy_match(mock_supabase):
+def test_partner_name_insper_fuzzy_match(mock_supabase, mock_directory_supabase):
     sb = _make_mocks(
-        partner_data=[{"id": "partner-insper-456"}],
+        partner_data=[
+            {"id": "partner-insper-456", "name": "Bolsa Integral do Insper"},
+            {"id": "partner-behring-789", "name": "Fundação Behring"},
+        ],
         doc_data=[{"title": "Edital Insper 2026.2", "storage_path": "documents/insper.md"}],
         storage_bytes=b"# Edital Insper\n\nProcesso seletivo Insper 2026.",
     )
     mock_supabase.table.side_effect = sb.table.side_effect
     mock_supabase.storage = sb.storage
+    mock_directory_supabase.table.side_effect = sb.table.side_effect
+    partner_directory.invalidate()
 
     result = getKnowledgeContentTool(partner_name="Insper")
 
@@ -83,6 +91,27 @@ def test_partner_name_insper_fuzzy_match(mock_supabase):
     assert "Processo seletivo" in result
 
 
+@patch("src.lib.partner_directory.supabase")
+@patch("src.tools.getKnowledgeContent.supabase")
+def test_ambiguous_partner_name_returns_the_options(mock_supabase, mock_directory_supabase):
+    sb = _make_mocks(
+        partner_data=[
+            {"id": "partner-estudar", "name": "Fundação Estudar"},
+            {"id": "partner-behring", "name": "Fundação Behring"},
+        ],
+        doc_data=[{"title": "Edital Estudar", "storage_path": "documents/estudar.md"}],
+    )
+    mock_supabase.table.side_effect = sb.table.side_effect
+    mock_directory_supabase.table.side_effect = sb.table.side_effect
+    partner_directory.invalidate()
+
+    result = getKnowledgeContentTool(partner_name="Fundação")
+
+    assert "mais de um parceiro" in result
+    assert "Fundação Estudar" in result and "Fundação Behring" in result
+    assert "Edital Estudar" not in result
+
+
 # RED 3: returns friendly fallback when no document found
 @patch("src.tools.getKnowledgeContent.supabase")
 def test_no_document_returns_fallback(mock_supabase):
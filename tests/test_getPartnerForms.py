@@ -0,0 +1,97 @@
+"""
+Tests for step-scoped getPartnerFormsTool backed by the cached, step-grouped form schema.
+"""
+import sys
+import os
+from unittest.mock import patch, MagicMock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+os.environ["SUPABASE_URL"] = "https://mock.supabase.co"
+os.environ["SUPABASE_KEY"] = "mock-key"
+
+from src.tools.getPartnerForms import getPartnerFormsTool
+from src.lib.partner_cache import invalidate_form_schema_cache
+
+PARTNER_ID = "5f0c8e52-4c8e-4b8a-9d7e-0a1b2c3d4e5f"
+
+FORM_ROWS = [
+    {"field_name": "nome", "question_text": "Nome completo", "sort_order": 1, "step_id": "s1",
+     "partner_steps": {"step_name": "Dados pessoais", "sort_order": 1}},
+    {"field_name": "cpf", "question_text": "CPF", "sort_order": 2, "step_id": "s1",
+     "partner_steps": {"step_name": "Dados pessoais", "sort_order": 1}},
+    {"field_name": "escola", "question_text": "Nome da escola", "sort_order": 3, "step_id": "s2",
+     "partner_steps": {"step_name": "Dados acadêmicos", "sort_order": 2}},
+]
+
+
+def _mock_forms(mock_supabase):
+    chain = mock_supabase.table.return_value.select.return_value.eq.return_value.order.return_value
+    chain.execute.return_value.data = [dict(r) for r in FORM_ROWS]
+    return chain
+
+
+@patch("src.lib.partner_cache.supabase")
+def test_step_name_returns_only_that_step(mock_supabase):
+    invalidate_form_schema_cache()
+    _mock_forms(mock_supabase)
+
+    fields = getPartnerFormsTool(user_id="u1", partner_id=PARTNER_ID, step_name="dados academicos")
+
+    assert [f["field_name"] for f in fields] == ["escola"]
+    assert fields[0]["step_name"] == "Dados acadêmicos"
+
+
+@patch("src.lib.partner_cache.supabase")
+def test_focused_field_selects_its_step(mock_supabase):
+    invalidate_form_schema_cache()
+    _mock_forms(mock_supabase)
+
+    fields = getPartnerFormsTool(user_id="u1", partner_id=PARTNER_ID, focused_field="cpf")
+
+    assert [f["field_name"] for f in fields] == ["nome", "cpf"]
+
+
+@patch("src.lib.partner_cache.supabase")
+def test_schema_is_cached_between_calls(mock_supabase):
+    invalidate_form_schema_cache()
+    chain = _mock_forms(mock_supabase)
+
+    all_fields = getPartnerFormsTool(user_id="u1", partner_id=PARTNER_ID)
+    getPartnerFormsTool(user_id="u1", partner_id=PARTNER_ID, step_name="Dados pessoais")
+
+    assert len(all_fields) == 3
+    assert chain.execute.call_count == 1
+
+
+@patch("src.lib.partner_cache.supabase")
+def test_returned_fields_are_copies_and_blank_step_means_full_form(mock_supabase):
+    invalidate_form_schema_cache()
+    _mock_forms(mock_supabase)
+
+    step = getPartnerFormsTool(user_id="u1", partner_id=PARTNER_ID, step_name="Dados pessoais")
+    step[0]["field_name"] = "alterado"
+    step.clear()
+    everything = getPartnerFormsTool(user_id="u1", partner_id=PARTNER_ID)
+    everything.pop()
+
+    assert [f["field_name"] for f in getPartnerFormsTool(user_id="u1", partner_id=PARTNER_ID)] == ["nome", "cpf", "escola"]
+    assert len(getPartnerFormsTool(user_id="u1", partner_id=PARTNER_ID, step_name="  ")) == 3
+    assert len(getPartnerFormsTool(user_id="u1", partner_id=PARTNER_ID, step_name="", focused_field=" ")) == 3
+
+
+@patch("src.tools.getPartnerForms.partner_directory")
+@patch("src.lib.partner_cache.supabase")
+def test_ambiguous_partner_name_returns_the_options(mock_supabase, mock_directory):
+    invalidate_form_schema_cache()
+    chain = _mock_forms(mock_supabase)
+    mock_directory.resolve.return_value = {
+        "partner_id": "p-estudar", "name": "Fundação Estudar", "score": 0.9, "ambiguous": True,
+        "candidates": [{"partner_id": "p-estudar", "name": "Fundação Estudar", "score": 0.9},
+                       {"partner_id": "p-behring", "name": "Fundação Behring", "score": 0.9}],
+    }
+
+    result = getPartnerFormsTool(user_id="u1", partner_id="Fundação")
+
+    assert len(result) == 1 and result[0]["status"] == "error"
+    assert "Fundação Estudar, Fundação Behring" in result[0]["message"]
+    chain.execute.assert_not_called()
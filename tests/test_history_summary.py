@@ -0,0 +1,92 @@
+"""
+Tests for the rolling conversation summary and the history budget of the prompts.
+"""
+import sys
+import os
+import asyncio
+from unittest.mock import MagicMock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+os.environ.setdefault("SUPABASE_URL", "https://mock.supabase.co")
+os.environ.setdefault("SUPABASE_KEY", "mock-key")
+
+from src.agent.memory.chat_summary import ChatSummaries, build_history_context, VERBATIM_MESSAGES
+
+
+def _records(n, size=40):
+    return [
+        {"sender": "user" if i % 2 == 0 else "cloudinha", "content": f"m{i} " + "x" * size, "created_at": f"2026-10-01T10:{i:02d}:00+00:00"}
+        for i in range(n)
+    ]
+
+
+def test_history_is_summary_plus_latest_messages_under_budget():
+    records = _records(20, size=900)
+    summary = {"summary": "- Estudante quer bolsa no Insper.", "summarized_until": "2026-10-01T10:05:00+00:00"}
+
+    context, lines = build_history_context(summary, records, budget_chars=3000)
+
+    assert len(context) <= 3000 + 100  # headers
+    assert "RESUMO DA CONVERSA ATÉ AQUI" in context and "Insper" in context
+    assert lines[-1].startswith("Cloudinha: m19")
+    assert 1 <= len(lines) <= VERBATIM_MESSAGES
+
+    _, covered = build_history_context({"summary": "...", "summarized_until": "2026-10-01T10:19:00+00:00"}, records)
+    assert covered == []  # everything already folded into the summary
+
+
+def test_update_folds_messages_outside_the_verbatim_window():
+    client = MagicMock()
+    client.table.return_value.select.return_value.eq.return_value.eq.return_value.limit.return_value.execute.return_value = MagicMock(data=[])
+    fetch = client.table.return_value.select.return_value.eq.return_value.eq.return_value.order.return_value.limit.return_value
+    fetch.execute.return_value = MagicMock(data=_records(10))
+    folded = []
+
+    async def summarize(previous, lines):
+        folded.extend(lines)
+        return "- resumo"
+
+    summaries = ChatSummaries(summarize_fn=summarize)
+    assert asyncio.run(summaries.update(client, "u1", "passport_workflow")) is True
+
+    assert len(folded) == 10 - VERBATIM_MESSAGES
+    upserted = client.table.return_value.upsert.call_args[0][0]
+    assert upserted["summarized_until"] == "2026-10-01T10:03:00+00:00"
+    assert upserted["message_count"] == 4
+    assert summaries.get(client, "u1", "passport_workflow")["summary"] == "- resumo"  # served from memory
+
+
+def test_update_never_splits_messages_with_the_same_timestamp():
+    client = MagicMock()
+    client.table.return_value.select.return_value.eq.return_value.eq.return_value.limit.return_value.execute.return_value = MagicMock(data=[])
+    fetch = client.table.return_value.select.return_value.eq.return_value.eq.return_value.order.return_value.limit.return_value
+    records = _records(11)
+    # m4 (last candidate to fold) was saved in the same instant as m5 (first verbatim)
+    records[4]["created_at"] = records[5]["created_at"]
+    fetch.execute.return_value = MagicMock(data=records)
+    folded = []
+
+    async def summarize(previous, lines):
+        folded.extend(lines)
+        return "- resumo"
+
+    summaries = ChatSummaries(summarize_fn=summarize)
+    assert asyncio.run(summaries.update(client, "u1", "passport_workflow")) is True
+
+    assert [line.split()[1] for line in folded] == ["m0", "m1", "m2", "m3"]
+    upserted = client.table.return_value.upsert.call_args[0][0]
+    assert upserted["summarized_until"] == "2026-10-01T10:03:00+00:00"
+
+
+def test_history_keeps_unfolded_messages_older_than_the_verbatim_window():
+    records = _records(12, size=400)
+    summary = {"summary": "- resumo", "summarized_until": "2026-10-01T10:02:00+00:00"}
+
+    _, lines = build_history_context(summary, records, budget_chars=10000)
+
+    # m3..m11: nine messages not yet folded, more than VERBATIM_MESSAGES
+    assert [line.split()[1] for line in lines] == [f"m{i}" for i in range(3, 12)]
+
+    _, tight = build_history_context(summary, records, budget_chars=800)
+    assert tight[-1] == lines[-1] and tight[0].endswith("…")  # the oldest one is truncated first
+    assert tight[0].split()[1] == "m10"
@@ -0,0 +1,63 @@
+"""
+Tests for heading-level section splitting and budgeted section selection.
+"""
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+from src.lib.knowledge_sections import split_sections, select_sections, get_section_index
+
+DOC = """=== Edital ProUni ===
+
+# Edital ProUni 2026
+
+Introdução ao programa.
+
+## Renda
+
+A renda familiar per capita deve ser de até 1,5 salário mínimo para bolsa integral.
+
+## Documentos
+
+Apresentar RG, CPF e comprovante de residência.
+
+---
+
+=== Perguntas Frequentes ===
+
+## Inscrição
+
+A inscrição é gratuita e feita pela internet.
+"""
+
+
+def test_split_sections_tracks_doc_and_headings():
+    sections = split_sections(DOC)
+
+    assert [(s["doc"], s["heading"]) for s in sections] == [
+        ("Edital ProUni", "Edital ProUni 2026"),
+        ("Edital ProUni", "Edital ProUni 2026 > Renda"),
+        ("Edital ProUni", "Edital ProUni 2026 > Documentos"),
+        ("Perguntas Frequentes", "Inscrição"),
+    ]
+    assert sections[2]["text"].startswith("Apresentar RG")
+
+
+def test_select_sections_keeps_relevant_parts_within_budget():
+    result = select_sections(DOC, "qual a renda máxima?", budget_chars=200)
+
+    assert result["trimmed"] is True
+    assert "renda familiar per capita" in result["text"]
+    assert "comprovante de residência" not in result["text"]
+    assert len(result["text"]) <= 200
+
+
+def test_small_documents_are_returned_whole():
+    result = select_sections(DOC, "renda", budget_chars=10_000)
+
+    assert result == {"text": DOC, "trimmed": False, "sections": None, "total_sections": None}
+
+
+def test_section_index_is_cached_by_content():
+    assert get_section_index(DOC) is get_section_index(DOC)
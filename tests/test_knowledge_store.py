@@ -0,0 +1,75 @@
+"""
+Tests for the memory + disk knowledge-base document cache.
+"""
+import sys
+import os
+import time
+from unittest.mock import MagicMock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+from src.lib.knowledge_store import KnowledgeStore, REVALIDATE_SECONDS
+
+
+def _client(files):
+    """files: {storage_path: (etag, bytes)} served by a fake bucket."""
+    bucket = MagicMock()
+
+    def list_folder(folder, options=None):
+        prefix = f"{folder}/" if folder else ""
+        return [
+            {"name": path[len(prefix):], "metadata": {"eTag": etag}}
+            for path, (etag, _) in files.items()
+            if path.startswith(prefix) and "/" not in path[len(prefix):]
+        ]
+
+    bucket.list.side_effect = list_folder
+    bucket.download.side_effect = lambda path: files[path][1]
+    client = MagicMock()
+    client.storage.from_.return_value = bucket
+    return client, bucket
+
+
+def test_second_read_is_served_from_memory(tmp_path, monkeypatch):
+    monkeypatch.setenv("KNOWLEDGE_CACHE_DIR", str(tmp_path))
+    client, bucket = _client({"docs/a.md": ("e1", b"A"), "docs/b.md": ("e1", b"B")})
+    store = KnowledgeStore()
+
+    first = store.read_many(client, ["docs/a.md", "docs/b.md"])
+    second = store.read_many(client, ["docs/a.md", "docs/b.md"])
+
+    assert first == second == {"docs/a.md": "A", "docs/b.md": "B"}
+    assert bucket.download.call_count == 2
+    assert bucket.list.call_count == 1  # one listing for the folder
+
+
+def test_cold_process_reuses_disk_when_etag_matches(tmp_path, monkeypatch):
+    monkeypatch.setenv("KNOWLEDGE_CACHE_DIR", str(tmp_path))
+    files = {"docs/a.md": ("e1", b"A"), "docs/b.md": ("e1", b"B")}
+    client, _ = _client(files)
+    KnowledgeStore().read_many(client, ["docs/a.md", "docs/b.md"])
+
+    files["docs/b.md"] = ("e2", b"B2")
+    client, bucket = _client(files)
+    result = KnowledgeStore().read_many(client, ["docs/a.md", "docs/b.md"])
+
+    assert result == {"docs/a.md": "A", "docs/b.md": "B2"}
+    bucket.download.assert_called_once_with("docs/b.md")
+
+
+def test_stale_entry_is_served_then_refreshed_in_background(tmp_path, monkeypatch):
+    monkeypatch.setenv("KNOWLEDGE_CACHE_DIR", "")
+    files = {"a.md": ("e1", b"old")}
+    client, _ = _client(files)
+    store = KnowledgeStore()
+    store.read(client, "a.md")
+    store._memory["a.md"]["checked_at"] -= REVALIDATE_SECONDS + 1
+
+    files["a.md"] = ("e2", b"new")
+    assert store.read(client, "a.md") == "old"
+
+    for _ in range(50):
+        if store._memory["a.md"]["text"] == "new":
+            break
+        time.sleep(0.02)
+    assert store.read(client, "a.md") == "new"
@@ -0,0 +1,85 @@
+"""
+Tests for the per-partner knowledge digests: extraction, coverage check and storage.
+"""
+import sys
+import os
+import json
+from unittest.mock import MagicMock, patch
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+from src.lib import partner_digests as digests_module
+from src.lib.partner_digests import PartnerDigests, build_digest, digest_answers, format_digest
+
+REGULAMENTO = """
+# Programa Ponte
+
+## Quem pode participar
+
+- Estudantes matriculados no 3º ano do ensino médio em escola pública.
+- Renda familiar per capita de até 1,5 salário mínimo.
+
+## Cronograma
+
+- Inscrições abertas de 10/03/2026 a 20/04/2026 pelo site.
+- Resultado final previsto para 15 de junho de 2026.
+
+## O que oferecemos
+
+- Bolsa de estudos integral e mentoria individual durante toda a graduação.
+
+## Processo seletivo
+
+- O processo seletivo tem três etapas: prova online, dinâmica em grupo e entrevista final.
+
+Mais informações em https://ponte.org.br/edital.
+"""
+
+
+def test_build_digest_extracts_fields():
+    digest = build_digest("p1", "Programa Ponte", REGULAMENTO)
+    fields = digest["fields"]
+
+    assert any("per capita" in item for item in fields["eligibility"])
+    assert fields["dates"] and all(any(ch.isdigit() for ch in item) for item in fields["dates"])
+    assert any("mentoria" in item for item in fields["benefits"])
+    assert any("entrevista" in item for item in fields["process"])
+    assert fields["links"] == ["https://ponte.org.br/edital"]
+    assert digest["source_chars"] == len(REGULAMENTO)
+
+
+def test_digest_is_much_smaller_than_a_full_regulation():
+    history = "A Fundação Ponte nasceu em 2005 a partir do sonho de um grupo de educadores que acreditavam na transformação social pela educação.\n\n" * 8
+    regulamento = REGULAMENTO.replace("## Quem pode participar", f"## Nossa história\n\n{history}## Quem pode participar")
+    digest = build_digest("p1", "Programa Ponte", regulamento)
+
+    assert "Fundação Ponte nasceu" not in format_digest(digest)
+    assert len(format_digest(digest)) < len(regulamento) / 2
+
+def test_digest_answers_only_covered_questions():
+    digest = build_digest("p1", "Programa Ponte", REGULAMENTO)
+
+    assert digest_answers(digest, "Quais os requisitos de renda do Programa Ponte?", "Programa Ponte")
+    assert digest_answers(digest, "Quando abrem as inscrições?", "Programa Ponte")
+    assert not digest_answers(digest, "O programa aceita estudantes de intercâmbio na Alemanha?", "Programa Ponte")
+
+    digest["fields"]["dates"] = []
+    assert not digest_answers(digest, "Qual o prazo das inscrições?", "Programa Ponte")
+
+
+def test_digests_are_parsed_once_and_missing_file_backs_off():
+    payload = json.dumps({"partners": {"p1": build_digest("p1", "Programa Ponte", REGULAMENTO)}})
+    store = PartnerDigests()
+    client = MagicMock()
+
+    with patch.object(digests_module.knowledge_store, "read", return_value=payload) as read:
+        first = store.get(client, "p1")
+        assert store.get(client, "p1") is first
+        assert store.get(client, "outro") is None
+    assert read.call_count == 3
+
+    missing = PartnerDigests()
+    with patch.object(digests_module.knowledge_store, "read", return_value=None) as read:
+        assert missing.all(client) == {}
+        assert missing.all(client) == {}
+    read.assert_called_once()
@@ -0,0 +1,83 @@
+"""
+Tests for the in-memory partner directory (name, partial name, acronym and accent-folded resolution).
+"""
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+os.environ["SUPABASE_URL"] = "https://mock.supabase.co"
+os.environ["SUPABASE_KEY"] = "mock-key"
+
+from src.lib.partner_directory import PartnerDirectory, resolve_partner_id
+
+PARTNERS = [
+    {"id": "p-estudar", "name": "Fundação Estudar"},
+    {"id": "p-behring", "name": "Fundação Behring"},
+    {"id": "p-insper-int", "name": "Bolsa Integral do Insper"},
+    {"id": "p-ponte", "name": "Instituto Ponte"},
+    {"id": "p-aurora", "name": "Programa Aurora | Instituto Sol"},
+]
+
+
+def _directory():
+    directory = PartnerDirectory()
+    directory._build(PARTNERS)
+    return directory
+
+
+def test_partial_names_resolve_to_single_partner():
+    directory = _directory()
+    assert directory.resolve("Estudar")["partner_id"] == "p-estudar"
+    assert directory.resolve("Behring")["partner_id"] == "p-behring"
+    assert directory.resolve("Insper")["partner_id"] == "p-insper-int"
+    assert directory.resolve("Insper")["ambiguous"] is False
+
+
+def test_accents_case_and_prefixes_are_folded():
+    directory = _directory()
+    assert directory.resolve("FUNDACAO ESTUDAR")["partner_id"] == "p-estudar"
+    assert directory.resolve("fundação estudar")["score"] == 1.0
+    assert directory.resolve("behr")["partner_id"] == "p-behring"
+
+
+def test_acronym_resolution():
+    directory = _directory()
+    assert directory.resolve("FE")["partner_id"] == "p-estudar"
+    assert directory.resolve("fb")["partner_id"] == "p-behring"
+    assert directory.resolve("IP")["partner_id"] == "p-ponte"
+
+
+def test_ambiguous_names_report_candidates():
+    directory = _directory()
+    result = directory.resolve("Fundação")
+    assert result["ambiguous"] is True
+    ids = {c["partner_id"] for c in result["candidates"]}
+    assert {"p-estudar", "p-behring"} <= ids
+
+
+def test_unknown_name_returns_no_match():
+    directory = _directory()
+    result = directory.resolve("Harvard")
+    assert result["partner_id"] is None
+    assert result["candidates"] == []
+
+
+def test_uuid_passthrough():
+    uid = "5f0c8e52-4c8e-4b8a-9d7e-0a1b2c3d4e5f"
+    assert resolve_partner_id(uid) == uid
+
+
+def test_empty_directory_is_cached_for_the_ttl():
+    from unittest.mock import patch, MagicMock
+    client = MagicMock()
+    client.table.return_value.select.return_value.execute.return_value.data = []
+    directory = PartnerDirectory()
+
+    with patch("src.lib.partner_directory.supabase", client):
+        assert directory.resolve("Insper")["partner_id"] is None
+        assert directory.resolve("Estudar")["partner_id"] is None
+        assert client.table.return_value.select.return_value.execute.call_count == 1
+
+        directory.invalidate()
+        directory.resolve("Insper")
+        assert client.table.return_value.select.return_value.execute.call_count == 2
@@ -0,0 +1,68 @@
+"""
+Tests for evaluatePassportEligibilityTool trace mode and rule rendering.
+"""
+import sys
+import os
+from unittest.mock import patch, MagicMock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+os.environ["SUPABASE_URL"] = "https://mock.supabase.co"
+os.environ["SUPABASE_KEY"] = "mock-key"
+
+from src.tools.evaluatePassportEligibility import evaluatePassportEligibilityTool, render_rule, coerce_value
+
+RULE = {"and": [{"<=": [{"var": "renda"}, 1500]}, {"in": [{"var": "renda"}, [800, 900]]}]}
+
+
+def _make_client():
+    profiles = MagicMock()
+    profiles.select.return_value.eq.return_value.execute.side_effect = [
+        MagicMock(data=[{"active_application_target_id": None}]),
+        MagicMock(data=[{"id": "u1", "family_income": "R$ 900,00"}]),
+    ]
+    partners = MagicMock()
+    partners.select.return_value.execute.return_value.data = [{"id": "p1", "name": "Estudar", "applications_open": True}]
+    forms = MagicMock()
+    forms.select.return_value.eq.return_value.in_.return_value.execute.return_value.data = [
+        {"partner_id": "p1", "field_name": "renda", "mapping_source": "user_profiles.family_income",
+         "criterion_rule": {"<=": [{"var": "renda"}, 1500]}},
+        {"partner_id": "p1", "field_name": "cidade", "mapping_source": None, "criterion_rule": None},
+    ]
+    tables = {"user_profiles": profiles, "partners": partners, "partner_forms": forms}
+    client = MagicMock()
+    client.table.side_effect = lambda name: tables[name]
+    return client
+
+
+def test_render_rule_is_readable():
+    assert render_rule(RULE) == "(renda <= 1500 and renda in [800, 900])"
+    assert render_rule({"!": {"var": "bolsista"}}) == "not bolsista"
+
+
+def test_coerce_value_matches_comparison():
+    assert coerce_value("R$ 1.500,00") == 1500.0
+    assert coerce_value("  Pública ") == "pública"
+    assert coerce_value(None) is None
+
+
+def test_trace_reports_criteria_and_timing():
+    with patch("src.tools.evaluatePassportEligibility.supabase_client", _make_client()):
+        out = evaluatePassportEligibilityTool("u1", trace=True)
+
+    assert out["results"][0]["met_criteria"] == 1
+    partner = out["trace"]["partners"][0]
+    renda, cidade = partner["criteria"]
+    assert renda["rule"] == "renda <= 1500"
+    assert renda["input"] == "R$ 900,00" and renda["coerced"] == 900.0 and renda["met"] is True
+    assert cidade["mode"] == "unmapped" and cidade["met"] is False
+    summary = out["trace"]["summary"]
+    assert [q["query"] for q in summary["queries"]] == ["parent_profile", "target_profile", "partners", "criteria", "save_results"]
+    assert summary["criteria_evaluated"] == 2
+
+
+def test_no_trace_by_default():
+    with patch("src.tools.evaluatePassportEligibility.supabase_client", _make_client()):
+        out = evaluatePassportEligibilityTool("u1")
+
+    assert "trace" not in out
+    assert out["results"][0]["details"] == [{"field": "renda", "met": True}, {"field": "cidade", "met": False}]
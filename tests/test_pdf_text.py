@@ -0,0 +1,74 @@
+"""
+Tests for the cached PDF text service: content-hash keys, disk reuse and page access.
+"""
+import sys
+import os
+from unittest.mock import patch
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+from src.lib import pdf_text as pdf_text_module
+from src.lib.pdf_text import PdfTextService
+
+
+def _fake_pdf(path, content):
+    path.write_bytes(content)
+    return str(path)
+
+
+def test_pages_are_extracted_once_per_content(tmp_path):
+    first = _fake_pdf(tmp_path / "edital.pdf", b"%PDF edital")
+    renamed = _fake_pdf(tmp_path / "edital_copia.pdf", b"%PDF edital")
+    service = PdfTextService(cache_dir=str(tmp_path / "cache"))
+
+    with patch.object(pdf_text_module, "extract_pages", return_value=["página um", "", "página três"]) as extract:
+        assert service.pages(first) == ["página um", "", "página três"]
+        assert service.page(renamed, 3) == "página três"
+        assert service.text(first) == "página um\npágina três"
+
+    extract.assert_called_once_with(first)
+    with pytest.raises(IndexError):
+        service.page(first, 4)
+
+
+def test_disk_cache_survives_restart_and_changes_reextract(tmp_path):
+    pdf = _fake_pdf(tmp_path / "ponte.pdf", b"%PDF v1")
+    cache_dir = str(tmp_path / "cache")
+
+    with patch.object(pdf_text_module, "extract_pages", return_value=["regulamento v1"]):
+        PdfTextService(cache_dir=cache_dir).warm([pdf], workers=1)
+
+    restarted = PdfTextService(cache_dir=cache_dir)
+    with patch.object(pdf_text_module, "extract_pages") as extract:
+        assert restarted.warm([pdf]) == {pdf: 1}
+    extract.assert_not_called()
+    assert restarted.stats["disk_hits"] == 1
+
+    _fake_pdf(tmp_path / "ponte.pdf", b"%PDF v2 (novo regulamento)")
+    with patch.object(pdf_text_module, "extract_pages", return_value=["regulamento v2"]) as extract:
+        assert restarted.pages(pdf) == ["regulamento v2"]
+    extract.assert_called_once()
+
+
+def test_lookup_waits_for_an_inflight_extraction(tmp_path):
+    import threading
+    pdf = _fake_pdf(tmp_path / "edital.pdf", b"%PDF edital")
+    service = PdfTextService(cache_dir=str(tmp_path / "cache"))
+    started, release = threading.Event(), threading.Event()
+
+    def slow_extract(path):
+        started.set()
+        release.wait(2)
+        return ["página um"]
+
+    with patch.object(pdf_text_module, "extract_pages", side_effect=slow_extract) as extract:
+        warm = threading.Thread(target=service.warm, args=([pdf],), kwargs={"workers": 1})
+        warm.start()
+        started.wait(2)
+        threading.Timer(0.1, release.set).start()
+        assert service.pages(pdf) == ["página um"]
+        warm.join()
+
+    extract.assert_called_once()
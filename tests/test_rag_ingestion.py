@@ -0,0 +1,55 @@
+"""
+Tests for the incremental ingestion diff: keep stored chunks, embed new ones, delete orphans.
+"""
+import sys
+import os
+from unittest.mock import patch, MagicMock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+os.environ["SUPABASE_URL"] = "https://mock.supabase.co"
+os.environ["SUPABASE_KEY"] = "mock-key"
+
+import rag_ingestion
+
+MODEL = "models/text-embedding-004"
+
+
+def _chunk(text):
+    return {"content": text, "metadata": {"source": "edital.md", "chunk_hash": text}, "chunk_hash": text}
+
+
+def test_ingest_file_only_embeds_new_chunks_and_deletes_orphans():
+    embedder = MagicMock(model=MODEL)
+    embedder.embed.side_effect = lambda texts: [[0.1, 0.2] for _ in texts]
+    stored = [
+        {"id": 1, "metadata": {"chunk_hash": "a", "embedding_model": MODEL}},
+        {"id": 2, "metadata": {"chunk_hash": "old", "embedding_model": MODEL}},
+        {"id": 3, "metadata": {"chunk_hash": "b", "embedding_model": "models/embedding-001"}},
+    ]
+    client = MagicMock()
+    with patch.object(rag_ingestion, "load_chunks", return_value=[_chunk("a"), _chunk("b"), _chunk("c")]), \
+         patch.object(rag_ingestion, "existing_rows", return_value=stored), \
+         patch.object(rag_ingestion, "supabase", client):
+        stats = rag_ingestion.ingest_file("documents/edital.md", "edital.md", embedder, "sha", workers=2, batch_size=1, dry_run=False)
+
+    assert stats == {"chunks": 3, "kept": 1, "embedded": 2, "deleted": 2}
+    inserted = [c.args[0][0] for c in client.table.return_value.insert.call_args_list]
+    assert sorted(r["content"] for r in inserted) == ["b", "c"]
+    assert all(r["metadata"]["embedding_model"] == MODEL for r in inserted)
+    client.table.return_value.delete.return_value.in_.assert_called_once_with("id", [2, 3])
+
+
+def test_unchanged_files_are_skipped_via_manifest(tmp_path):
+    (tmp_path / "edital.md").write_text("conteúdo")
+    sha = rag_ingestion._sha256((tmp_path / "edital.md").read_bytes())
+    rag_ingestion.save_manifest(str(tmp_path / rag_ingestion.MANIFEST_NAME), {
+        "files": {"edital.md": {"sha256": sha, "model": rag_ingestion.MODEL_EMBEDDING,
+                       "chunker": rag_ingestion.CHUNKER_VERSION, "chunks": 1, "complete": True}}
+    })
+
+    with patch.object(rag_ingestion, "ingest_file") as ingest_file, \
+         patch.object(rag_ingestion, "Embedder"):
+        totals = rag_ingestion.ingest_documents(str(tmp_path))
+
+    ingest_file.assert_not_called()
+    assert totals["skipped"] == 1
@@ -0,0 +1,114 @@
+"""
+Tests for the structured Reasoning → Response contract: compact serialization and templated outcomes.
+"""
+import sys
+import os
+import json
+from unittest.mock import patch
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+os.environ.setdefault("SUPABASE_URL", "https://mock.supabase.co")
+os.environ.setdefault("SUPABASE_KEY", "mock-key")
+
+from src.agent.reasoning_models import ReasoningOutput, ToolCall
+from src.agent import fast_path
+from src.agent.workflow import _templated_reply, _infer_intention, _direct_reply, ResponseCallStats
+
+
+def _output(*calls):
+    return ReasoningOutput(
+        user_message="Quero me inscrever no Insper",
+        user_intention=_infer_intention(list(calls)),
+        reasoning="",
+        context_used={"passport_phase": "PROGRAM_MATCH", "age": 17},
+        tools_called=list(calls),
+    )
+
+
+def test_compact_keeps_only_needed_tool_results():
+    output = _output(
+        ToolCall(tool="getStudentProfileTool", params={"user_id": "u1"}, result={"full_name": "Ana", "city": None}),
+        ToolCall(tool="getPartnerFormsTool", params={"partner_id": "insper"}, result="x" * 10000),
+    )
+    payload = json.loads(output.compact(exclude_tools=("getStudentProfileTool",), max_chars=100))
+
+    assert [t["tool"] for t in payload["ferramentas"]] == ["getPartnerFormsTool"]
+    assert len(payload["ferramentas"][0]["resultado"]) < 120
+    assert payload["contexto"] == {"passport_phase": "PROGRAM_MATCH", "age": 17}
+    assert "notas_do_raciocinio" not in payload  # empty fields are dropped
+    assert payload["intencao"] == "question_about_form_field"
+
+
+def test_compact_passes_research_results_whole():
+    import asyncio
+    from src.agent.config import RESEARCH_CONTEXT_BUDGET_CHARS
+    from src.tools.smartResearch import _kb_reply
+
+    document = ("Renda familiar por pessoa de até 1,5 salário mínimo. " * 400)[:RESEARCH_CONTEXT_BUDGET_CHARS]
+    with patch("src.tools.smartResearch.getKnowledgeContentTool", return_value=document):
+        reply = asyncio.run(_kb_reply("renda do prouni", "prouni"))
+    assert len(reply) > RESEARCH_CONTEXT_BUDGET_CHARS  # "FONTE: ..." header on top of the budgeted text
+
+    output = _output(ToolCall(tool="smartResearchTool", params={"query": "renda do prouni"}, result=reply))
+    payload = json.loads(output.compact())
+    assert payload["ferramentas"][0]["resultado"] == reply
+
+
+def test_application_started_is_templated_unless_student_also_asked_something():
+    started = ToolCall(
+        tool="startStudentApplicationTool",
+        params={"user_id": "u1", "partner_id": "Bolsa Integral do Insper"},
+        result="Aplicação iniciada com sucesso. Fase avançada para EVALUATE. Campos pré-preenchidos automaticamente: nenhum.",
+    )
+    insper = {"partner_id": "p-insper", "name": "Bolsa Integral do Insper", "score": 1.0, "ambiguous": False, "candidates": []}
+    with patch.object(fast_path.partner_directory, "resolve", return_value=insper):
+        reply = _templated_reply(_output(started))
+    assert reply and "Bolsa Integral do Insper" in reply and "preenchi" not in reply
+
+    research = ToolCall(tool="smartResearchTool", params={"query": "prazo"}, result="...")
+    assert _templated_reply(_output(started, research)) is None
+
+    failed = ToolCall(tool="startStudentApplicationTool", params={}, result="Erro ao iniciar aplicação.")
+    assert _templated_reply(_output(failed)) is None
+
+
+def test_tool_free_turn_is_answered_by_the_reasoning_agent():
+    thanks = ReasoningOutput(user_message="obrigado!", user_intention="unknown", reasoning="[RESPOSTA_DIRETA] Imagina! Qualquer dúvida, é só chamar. 😊")
+    assert _direct_reply(thanks) == "Imagina! Qualquer dúvida, é só chamar. 😊"
+
+    report = ReasoningOutput(user_message="obrigado!", user_intention="unknown", reasoning="INTENÇÃO: agradecimento")
+    assert _direct_reply(report) is None  # no marker: the Response Agent still writes the reply
+
+    mentioned = ReasoningOutput(
+        user_message="obrigado!", user_intention="unknown",
+        reasoning="INTENÇÃO: agradecimento. Não usei [RESPOSTA_DIRETA] porque o estudante também perguntou do prazo.",
+    )
+    assert _direct_reply(mentioned) is None  # marker not at the start: not a reply
+
+    research = ToolCall(tool="smartResearchTool", params={"query": "prazo"}, result="...")
+    assert _direct_reply(_output(research)) is None
+
+    stats = ResponseCallStats()
+    stats.record("ONBOARDING", "direct")
+    stats.record("ONBOARDING", "response_agent")
+    stats.record("PROGRAM_MATCH", "templated")
+    report = stats.report()
+    assert report["ONBOARDING"]["avoided_second_calls"] == 1 and report["ONBOARDING"]["avoided_share"] == 0.5
+    assert report["PROGRAM_MATCH"]["avoided_second_calls"] == 1
+
+
+def test_only_scoped_knowledge_research_is_cacheable():
+    from src.agent.workflow import _answer_cache_terms, _impersonal
+
+    research = ToolCall(tool="smartResearchTool", params={"query": "o que oferece", "program": "programs", "partner_name": "Insper"}, result="...")
+    profile = ToolCall(tool="getStudentProfileTool", params={"user_id": "u1"}, result={"full_name": "Ana"})
+    dates = ToolCall(tool="getImportantDatesTool", params={"program_type": "prouni"}, result=[])
+    unscoped = ToolCall(tool="smartResearchTool", params={"query": "o que é", "program": "programs"}, result="...")
+
+    assert _answer_cache_terms(_output(research)) == ["insper"]
+    assert _answer_cache_terms(_output(research, profile)) is None
+    assert _answer_cache_terms(_output(dates)) is None
+    assert _answer_cache_terms(_output(unscoped)) is None
+
+    shared = _impersonal(_output(research), "PROGRAM_MATCH")
+    assert shared.context_used == {"passport_phase": "PROGRAM_MATCH"} and shared.reasoning == ""
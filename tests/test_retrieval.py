@@ -0,0 +1,64 @@
+"""
+Tests for the in-memory few-shot example index used by retrieve_similar_examples.
+"""
+import sys
+import os
+import time
+from unittest.mock import MagicMock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+os.environ.setdefault("SUPABASE_URL", "https://mock.supabase.co")
+os.environ.setdefault("SUPABASE_KEY", "mock-key")
+
+from src.agent.retrieval import ExampleIndex
+
+EXAMPLES = [
+    {"id": 4, "intent_category": "sisu", "input_query": "Quando sai o resultado do Sisu?"},
+    {"id": 3, "intent_category": "sisu", "input_query": "Qual a nota de corte de medicina?"},
+    {"id": 2, "intent_category": "sisu", "input_query": "Posso me inscrever em duas opções de curso?"},
+    {"id": 1, "intent_category": "prouni", "input_query": "Qual a renda máxima para bolsa integral?"},
+]
+
+
+def _client(rows):
+    client = MagicMock()
+    query = client.table.return_value.select.return_value.eq.return_value.order.return_value
+    query.execute.side_effect = lambda: MagicMock(data=list(rows))
+    return client, query
+
+
+def test_examples_ranked_by_similarity_within_category():
+    client, query = _client(EXAMPLES)
+    index = ExampleIndex()
+
+    ranked = index.search(client, "qual é a nota de corte para medicina na federal?", "sisu", k=2)
+    assert [ex["id"] for ex in ranked] == [3, 4]  # best match, then the most recent of the category
+
+    for _ in range(100):
+        index.search(client, "resultado do sisu", "sisu")
+    assert query.execute.call_count == 1  # served from memory
+
+
+def test_refresh_picks_up_changed_examples():
+    rows = list(EXAMPLES)
+    client, _ = _client(rows)
+    index = ExampleIndex()
+    assert [ex["id"] for ex in index.search(client, "renda bolsa integral", "prouni")] == [1]
+
+    rows.insert(0, {"id": 5, "intent_category": "prouni", "input_query": "Bolsa parcial exige qual renda?"})
+    index.refresh(client, force=True)
+    assert [ex["id"] for ex in index.search(client, "renda para bolsa parcial", "prouni")] == [5, 1]
+
+
+def test_failed_load_is_retried_soon():
+    from src.agent import retrieval
+    client, query = _client(EXAMPLES)
+    query.execute.side_effect = [ConnectionError("supabase fora do ar"), MagicMock(data=list(EXAMPLES))]
+    index = ExampleIndex()
+
+    assert index.search(client, "resultado do sisu", "sisu") == []
+    # Next refresh is due after RETRY_SECONDS, not a full REFRESH_SECONDS
+    assert index._loaded_at < time.time() - index.refresh_seconds + retrieval.RETRY_SECONDS + 1
+    index._loaded_at -= retrieval.RETRY_SECONDS
+    index.refresh(client)
+    assert len(index) == len(EXAMPLES)
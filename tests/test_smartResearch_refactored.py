@@ -71,3 +71,49 @@ def test_no_hardcoded_tool_imports():
     assert not hasattr(mod, "readRulesTool"), (
         "readRulesTool must not be imported in smartResearch.py"
     )
+
+
+# Speculative web search starts when the index has no documents and is cancelled once KB content arrives
+def test_speculative_web_search_cancelled_when_kb_answers():
+    web_cancelled = asyncio.Event()
+
+    async def slow_web(*args, **kwargs):
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            web_cancelled.set()
+            raise
+
+    async def run():
+        result = await smartResearchTool(query="o que é o sisu?", program="sisu")
+        await asyncio.sleep(0)
+        return result
+
+    with patch("src.tools.smartResearch.getKnowledgeContentTool", return_value="Conteúdo Sisu do banco"), \
+         patch("src.tools.smartResearch.knowledge_index.has_documents", return_value=False), \
+         patch("src.tools.smartResearch.perform_web_fallback", side_effect=slow_web) as mock_web:
+        result = asyncio.run(run())
+
+    assert "SISU" in result.upper()
+    mock_web.assert_called_once()
+    assert web_cancelled.is_set()
+
+
+# General and partner content are fetched concurrently
+def test_programs_sources_fetched_concurrently():
+    import threading
+    import time
+    both_running = threading.Barrier(2, timeout=2)
+
+    def kb(category=None, partner_name=None):
+        both_running.wait()  # deadlocks (BrokenBarrierError) if the fetches run one after the other
+        time.sleep(0.01)
+        return f"Conteúdo {category or partner_name}"
+
+    with patch("src.tools.smartResearch.getKnowledgeContentTool", side_effect=kb), \
+         patch("src.tools.smartResearch._digest_reply", return_value=None), \
+         patch("src.tools.smartResearch.perform_web_fallback", new_callable=AsyncMock) as mock_web:
+        result = asyncio.run(smartResearchTool(query="requisitos", program="programs", partner_name="Insper"))
+
+    assert "Conteúdo general" in result and "Conteúdo Insper" in result
+    mock_web.assert_not_called()
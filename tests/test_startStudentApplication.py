@@ -0,0 +1,119 @@
+"""
+Tests for the batched startStudentApplicationTool pipeline.
+Partner settings come from the in-process partner cache; profile/preference
+reads only select the columns referenced by the form's mapping_source.
+"""
+import sys
+import os
+from unittest.mock import patch, MagicMock
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+os.environ["SUPABASE_URL"] = "https://mock.supabase.co"
+os.environ["SUPABASE_KEY"] = "mock-key"
+os.environ["SUPABASE_SERVICE_KEY"] = "mock-service-key"
+
+from src.tools.startStudentApplication import startStudentApplicationTool
+
+PARTNER_ID = "5f0c8e52-4c8e-4b8a-9d7e-0a1b2c3d4e5f"
+
+
+def _partner(redirect=None, mappings=None):
+    return {
+        "id": PARTNER_ID,
+        "name": "Fundação Estudar",
+        "external_redirect_config": redirect,
+        "has_form": True,
+        "mappings": mappings if mappings is not None else [
+            {"field_name": "nome", "mapping_source": "user_profiles.full_name"},
+            {"field_name": "renda", "mapping_source": "user_preferences.family_income_per_capita"},
+        ],
+    }
+
+
+def _make_client(existing=None, profile=None, prefs=None):
+    apps = MagicMock()
+    select_chain = apps.select.return_value.eq.return_value.eq.return_value.gte.return_value.order.return_value.limit.return_value
+    select_chain.execute.return_value.data = existing or []
+    apps.insert.return_value.execute.return_value.data = [{"id": "app-1"}]
+
+    profiles = MagicMock()
+    profiles.select.return_value.eq.return_value.execute.return_value.data = [profile or {"id": "user-1"}]
+
+    preferences = MagicMock()
+    preferences.select.return_value.eq.return_value.execute.return_value.data = [prefs or {}]
+
+    tables = {"student_applications": apps, "user_profiles": profiles, "user_preferences": preferences}
+    client = MagicMock()
+    client.table.side_effect = lambda name: tables[name]
+    return client, tables
+
+
+def test_external_redirect_short_circuits_without_db_calls():
+    client, _ = _make_client()
+    with patch("src.tools.startStudentApplication.get_partner_application_config",
+               return_value=_partner(redirect={"url": "https://x.org", "message": "Inscreva-se no site"})), \
+         patch("src.tools.startStudentApplication.supabase_client", client):
+        result = startStudentApplicationTool(user_id="user-1", partner_id=PARTNER_ID)
+
+    assert "https://x.org" in result
+    client.table.assert_not_called()
+
+
+def test_new_application_prefills_only_mapped_columns():
+    client, tables = _make_client(
+        profile={"id": "user-1", "full_name": "Ana", "active_application_target_id": None},
+        prefs={"family_income_per_capita": 900},
+    )
+    with patch("src.tools.startStudentApplication.get_partner_application_config", return_value=_partner()), \
+         patch("src.tools.startStudentApplication.supabase_client", client):
+        result = startStudentApplicationTool(user_id="user-1", partner_id=PARTNER_ID)
+
+    assert "Aplicação iniciada com sucesso" in result
+    payload = tables["student_applications"].insert.call_args[0][0]
+    assert payload["answers"] == {"nome": "Ana", "renda": 900}
+    # No select("*") on profiles/preferences
+    assert tables["user_profiles"].select.call_args[0][0] != "*"
+    assert tables["user_preferences"].select.call_args[0][0] == "family_income_per_capita"
+
+
+def test_unknown_mapped_column_falls_back_to_all_columns():
+    from postgrest.exceptions import APIError
+    client, tables = _make_client()
+    rows = {"*": [{"id": "user-1", "full_name": "Ana"}]}
+
+    def select(columns):
+        query = MagicMock()
+        if columns == "*":
+            query.eq.return_value.execute.return_value.data = rows["*"]
+        else:
+            query.eq.return_value.execute.side_effect = APIError({"code": "42703", "message": "column user_profiles.nome_completo does not exist"})
+        return query
+
+    tables["user_profiles"].select.side_effect = select
+    mappings = [
+        {"field_name": "nome", "mapping_source": "user_profiles.full_name"},
+        {"field_name": "apelido", "mapping_source": "user_profiles.nome_completo"},
+        {"field_name": "x", "mapping_source": "user_profiles.id, senha"},
+    ]
+    with patch("src.tools.startStudentApplication.get_partner_application_config", return_value=_partner(mappings=mappings)), \
+         patch("src.tools.startStudentApplication.supabase_client", client):
+        result = startStudentApplicationTool(user_id="user-1", partner_id=PARTNER_ID)
+
+    assert "Aplicação iniciada com sucesso" in result
+    assert tables["student_applications"].insert.call_args[0][0]["answers"] == {"nome": "Ana"}
+    selected = [c.args[0] for c in tables["user_profiles"].select.call_args_list]
+    assert "senha" not in selected[0] and selected[-1] == "*"
+
+
+def test_phase_update_failure_removes_new_draft():
+    client, tables = _make_client(profile={"id": "user-1", "full_name": "Ana"})
+    tables["user_profiles"].update.return_value.eq.return_value.execute.side_effect = ConnectionError("boom")
+    with patch("src.tools.startStudentApplication.get_partner_application_config", return_value=_partner()), \
+         patch("src.tools.startStudentApplication.supabase_client", client), \
+         patch("src.lib.error_handler.supabase"):
+        result = startStudentApplicationTool(user_id="user-1", partner_id=PARTNER_ID)
+
+    assert result == "Erro ao iniciar aplicação."
+    tables["student_applications"].delete.return_value.eq.assert_called_once_with("id", "app-1")
@@ -0,0 +1,51 @@
+"""
+Tests for streaming the student-facing agents: partial deltas pass through, the aggregated repeat is dropped.
+"""
+import sys
+import os
+import asyncio
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+os.environ.setdefault("SUPABASE_URL", "https://mock.supabase.co")
+os.environ.setdefault("SUPABASE_KEY", "mock-key")
+
+from google.adk.events import Event
+from google.genai.types import Content, Part, FunctionCall
+from src.agent.workflow import _stream_deltas, _event_text, ttft_stats
+
+
+def _event(*parts, partial=False):
+    return Event(author="response_agent", partial=partial, content=Content(role="model", parts=list(parts)))
+
+
+async def _collect(events):
+    async def source():
+        for event in events:
+            yield event
+    return [e async for e in _stream_deltas(source(), "streaming_test_agent")]
+
+
+def test_deltas_stream_and_aggregated_text_is_not_repeated():
+    events = [
+        _event(Part(text="Oi! "), partial=True),
+        _event(Part(text="Tudo bem?"), partial=True),
+        _event(Part(text="Oi! Tudo bem?")),  # aggregated turn
+    ]
+    streamed = asyncio.run(_collect(events))
+
+    assert "".join(_event_text(e) for e in streamed) == "Oi! Tudo bem?"
+    assert all(e.partial for e in streamed)
+    assert ttft_stats.report()["streaming_test_agent"]["count"] == 1
+
+
+def test_tool_parts_of_aggregated_event_are_kept():
+    call = Part(function_call=FunctionCall(name="smartResearchTool", args={"query": "prazo"}))
+    events = [
+        _event(Part(text="Deixa eu ver."), partial=True),
+        _event(Part(text="Deixa eu ver."), call),
+        _event(Part(text="Sem deltas antes.")),  # non-streamed turn passes through whole
+    ]
+    streamed = asyncio.run(_collect(events))
+
+    assert [_event_text(e) for e in streamed] == ["Deixa eu ver.", "", "Sem deltas antes."]
+    assert streamed[1].content.parts[0].function_call.name == "smartResearchTool"
@@ -0,0 +1,58 @@
+"""
+Tests for per-turn memoization of read-only tools.
+"""
+import sys
+import os
+import asyncio
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+os.environ.setdefault("SUPABASE_URL", "https://mock.supabase.co")
+os.environ.setdefault("SUPABASE_KEY", "mock-key")
+
+from src.lib.tool_memo import read_only, mutates, tool_turn
+
+reads = []
+
+
+@read_only("profile")
+def fake_profile_tool(user_id: str, fields: str = "all") -> dict:
+    reads.append(user_id)
+    return {"user_id": user_id, "passport_phase": "ONBOARDING"}
+
+
+@mutates("profile")
+def fake_update_tool(user_id: str) -> str:
+    return "ok"
+
+
+def test_read_only_results_are_memoized_per_turn_and_invalidated_by_mutations():
+    reads.clear()
+    with tool_turn() as memo:
+        first = fake_profile_tool("u1")
+        first["passport_phase"] = "changed by the caller"
+        again = fake_profile_tool(user_id="u1", fields="all")  # same call, other spelling
+        assert again["passport_phase"] == "ONBOARDING"
+        assert reads == ["u1"]
+
+        fake_update_tool("u1")
+        fake_profile_tool("u1")
+        assert reads == ["u1", "u1"]
+        assert memo.stats == {"hits": 1, "misses": 2, "invalidated": 1}
+
+    fake_profile_tool("u1")  # outside a turn: always executes
+    assert len(reads) == 3
+
+
+def test_memo_follows_the_turn_into_threads_and_is_not_shared_between_turns():
+    reads.clear()
+
+    async def turn():
+        with tool_turn():
+            await asyncio.to_thread(fake_profile_tool, "u2")
+            await asyncio.to_thread(fake_profile_tool, "u2")
+
+    async def main():
+        await asyncio.gather(turn(), turn())
+
+    asyncio.run(main())
+    assert reads == ["u2", "u2"]  # one execution per turn
@@ -0,0 +1,62 @@
+"""
+Tests for the deterministic UI-intent fast path (no LLM for button presses).
+"""
+import sys
+import os
+import asyncio
+from unittest.mock import patch
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+os.environ.setdefault("SUPABASE_URL", "https://mock.supabase.co")
+os.environ.setdefault("SUPABASE_KEY", "mock-key")
+
+from src.agent import fast_path
+from src.agent.fast_path import classify_ui_intent, try_fast_path, FastPathStats
+
+INSPER = {"partner_id": "p-insper", "name": "Bolsa Integral do Insper", "score": 0.95, "ambiguous": False, "candidates": []}
+
+
+def test_button_labels_are_classified_per_phase():
+    assert classify_ui_intent("ONBOARDING", "Vamos começar!")["intent"] == "start_onboarding"
+    assert classify_ui_intent("ASK_DEPENDENT", "É para mim")["args"] == {"choice": "self"}
+    assert classify_ui_intent("ASK_DEPENDENT", "Para outra pessoa")["args"] == {"choice": "dependent"}
+    # Same label in another phase, or free text, goes to the LLM
+    assert classify_ui_intent("EVALUATE", "É para mim") is None
+    assert classify_ui_intent("ASK_DEPENDENT", "é para minha filha, ela tem 15 anos") is None
+
+    with patch.object(fast_path.partner_directory, "resolve", return_value=INSPER):
+        intent = classify_ui_intent(
+            "PROGRAM_MATCH",
+            "Quero me inscrever na Bolsa Integral do Insper (target_user_id=3f1c2a9e-1b2c-4d5e-8f90-a1b2c3d4e5f6)",
+        )
+        assert intent["confidence"] >= fast_path.MIN_CONFIDENCE
+        assert intent["args"]["target_user_id"] == "3f1c2a9e-1b2c-4d5e-8f90-a1b2c3d4e5f6"
+        assert classify_ui_intent("PROGRAM_MATCH", "Quero me inscrever no Insper, mas qual o prazo?") is None
+
+
+def test_partner_choice_runs_tool_and_replies_from_template():
+    success = "Aplicação iniciada com sucesso. Fase avançada para EVALUATE. O formulário do programa está aberto na tela do estudante. Campos pré-preenchidos automaticamente: Nome Completo, Idade."
+    with patch.object(fast_path.partner_directory, "resolve", return_value=INSPER), \
+         patch.object(fast_path, "get_partner_application_config", return_value={"id": "p-insper"}), \
+         patch.object(fast_path, "startStudentApplicationTool", return_value=success) as start:
+        result = asyncio.run(try_fast_path("u1", "PROGRAM_MATCH", "Quero me inscrever no Insper"))
+
+    start.assert_called_once_with(user_id="u1", partner_id="p-insper")
+    assert "Bolsa Integral do Insper" in result["reply"] and "Nome Completo, Idade" in result["reply"]
+
+    # External sign-up: the LLM explains the partner's own link, the tool is not called
+    with patch.object(fast_path.partner_directory, "resolve", return_value=INSPER), \
+         patch.object(fast_path, "get_partner_application_config", return_value={"external_redirect_config": {"url": "x"}}), \
+         patch.object(fast_path, "startStudentApplicationTool") as start:
+        assert asyncio.run(try_fast_path("u1", "PROGRAM_MATCH", "Quero me inscrever no Insper")) is None
+    start.assert_not_called()
+
+
+def test_stats_report_share_without_llm():
+    stats = FastPathStats()
+    for _ in range(4):
+        stats.record_turn()
+    stats.record_fast("dependent_self")
+    stats.record_scripted()
+    assert stats.report()["no_llm_share"] == 0.5
+    assert stats.report()["by_intent"] == {"dependent_self": 1}
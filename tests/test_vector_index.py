@@ -0,0 +1,84 @@
+"""
+Tests for the local memory-mapped vector index (alternative to the match_documents RPC).
+"""
+import sys
+import os
+import json
+from unittest.mock import patch, MagicMock
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+os.environ["SUPABASE_URL"] = "https://mock.supabase.co"
+os.environ["SUPABASE_KEY"] = "mock-key"
+
+from src.lib.vector_index import LocalVectorIndex
+
+ROWS = {
+    1: {"id": 1, "content": "Prouni renda", "metadata": {}, "embedding": json.dumps([1.0, 0.0, 0.0])},
+    2: {"id": 2, "content": "Sisu nota", "metadata": {}, "embedding": [0.0, 1.0, 0.0]},
+    3: {"id": 3, "content": "Prouni bolsa", "metadata": {}, "embedding": [0.8, 0.6, 0.0]},
+}
+
+
+def _client(table_rows):
+    docs = MagicMock()
+    docs.select.return_value.order.return_value.range.return_value.execute.side_effect = \
+        lambda: MagicMock(data=[{"id": i} for i in sorted(table_rows)])
+
+    def in_(column, ids):
+        query = MagicMock()
+        query.execute.return_value.data = [table_rows[i] for i in ids]
+        return query
+
+    docs.select.return_value.in_.side_effect = in_
+    client = MagicMock()
+    client.table.return_value = docs
+    return client
+
+
+@pytest.mark.parametrize("dtype", ["float32", "int8"])
+def test_search_returns_top_matches_above_threshold(tmp_path, dtype):
+    with patch("src.lib.vector_index.supabase", _client(dict(ROWS))):
+        index = LocalVectorIndex(directory=str(tmp_path), dtype=dtype)
+        hits = index.search([1.0, 0.1, 0.0], match_count=2, match_threshold=0.3)
+
+    assert [h["id"] for h in hits] == [1, 3]
+    assert hits[0]["content"] == "Prouni renda"
+    assert hits[0]["similarity"] == pytest.approx(0.995, abs=0.01)
+
+
+def test_refresh_is_incremental_and_persisted(tmp_path):
+    table = {1: ROWS[1], 2: ROWS[2]}
+    client = _client(table)
+    with patch("src.lib.vector_index.supabase", client):
+        index = LocalVectorIndex(directory=str(tmp_path))
+        index.refresh(force=True)
+
+        del table[1]
+        table[3] = ROWS[3]
+        index.refresh(force=True)
+        fetched = [c.args[1] for c in client.table.return_value.select.return_value.in_.call_args_list]
+
+    assert fetched == [[1, 2], [3]]
+    assert sorted(r["id"] for r in index._rows) == [2, 3]
+
+    # A new process picks the matrix up from disk and needs no embedding fetch
+    with patch("src.lib.vector_index.supabase", _client(table)) as fresh_client:
+        reloaded = LocalVectorIndex(directory=str(tmp_path))
+        hits = reloaded.search([0.0, 1.0, 0.0], match_count=1)
+        fresh_client.table.return_value.select.return_value.in_.assert_not_called()
+    assert hits[0]["id"] == 2
+
+
+def test_int8_search_is_blocked_and_reads_one_snapshot(tmp_path):
+    with patch("src.lib.vector_index.supabase", _client(dict(ROWS))), \
+            patch("src.lib.vector_index.SEARCH_BLOCK_ROWS", 2):
+        index = LocalVectorIndex(directory=str(tmp_path), dtype="int8")
+        index.refresh(force=True)
+        state = index._state
+        hits = index.search([0.0, 1.0, 0.0], match_count=3, match_threshold=0.3)
+
+    assert [h["id"] for h in hits] == [2, 3]
+    assert hits[1]["similarity"] == pytest.approx(0.6, abs=0.01)
+    assert index._state is state  # searching never republishes the index
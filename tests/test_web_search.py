@@ -0,0 +1,100 @@
+"""
+Tests for the non-blocking web search: region race, cache and deadline.
+"""
+import sys
+import os
+import asyncio
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+from src.lib.web_search import WebSearch, TIMED_OUT
+
+RESULT = [{"title": "Programa Ponte", "body": "Inscrições abertas", "href": "https://partners.link/ponte"}]
+
+
+def test_first_region_with_results_wins_and_is_cached():
+    calls = []
+
+    def fake_search(query, region):
+        calls.append((query, region))
+        if region == "br-pt":
+            time.sleep(0.3)
+            return []
+        return RESULT
+
+    search = WebSearch(search_fn=fake_search)
+
+    async def burst():
+        return await asyncio.gather(
+            search.search("Programa Ponte?", site="partners.link"),
+            search.search("programa   ponte", site="partners.link"),
+        )
+
+    first, second = asyncio.run(burst())
+    assert first == second and "partners.link/ponte" in first
+    assert search.stats["shared"] == 1 and search.stats["wins"] == {"global": 1}
+
+    assert asyncio.run(search.search("PROGRAMA PONTE", site="partners.link")) == first
+    assert search.stats["hits"] == 1
+    assert len(calls) == 2 and calls[0][0] == "Programa Ponte? site:partners.link"
+
+
+def test_deadline_returns_quickly_and_is_not_cached():
+    def slow_search(query, region):
+        time.sleep(0.5)
+        return RESULT
+
+    search = WebSearch(deadline_seconds=0.05, search_fn=slow_search)
+    started = time.perf_counter()
+    assert asyncio.run(search.search("Fundação Estudar")) == TIMED_OUT
+    assert time.perf_counter() - started < 0.3
+    assert search.stats["timeouts"] == 1
+
+    search.deadline_seconds = 2.0
+    assert "Programa Ponte" in asyncio.run(search.search("Fundação Estudar"))
+
+
+def test_cancelling_the_first_caller_does_not_cancel_shared_search():
+    def fake_search(query, region):
+        time.sleep(0.2)
+        return RESULT
+
+    search = WebSearch(search_fn=fake_search)
+
+    async def scenario():
+        owner = asyncio.create_task(search.search("Programa Ponte"))
+        await asyncio.sleep(0.05)
+        waiter = asyncio.create_task(search.search("programa ponte"))
+        await asyncio.sleep(0.05)
+        owner.cancel()
+        result = await waiter
+        assert owner.cancelled()
+        return result
+
+    assert "Programa Ponte" in asyncio.run(scenario())
+    assert search.stats["shared"] == 1
+    assert "Programa Ponte" in asyncio.run(search.search("PROGRAMA PONTE"))
+    assert search.stats["hits"] == 1
+
+
+def test_regional_results_are_preferred_within_the_grace_window():
+    regional = [{"title": "Programa Ponte (BR)", "body": "Inscrições", "href": "https://ponte.org.br"}]
+
+    def search_with(regional_delay):
+        def fake_search(query, region):
+            if region == "br-pt":
+                time.sleep(regional_delay)
+                return regional
+            return RESULT
+        return WebSearch(search_fn=fake_search, grace_seconds=0.3)
+
+    late_but_in_grace = search_with(0.1)
+    assert "ponte.org.br" in asyncio.run(late_but_in_grace.search("Programa Ponte"))
+    assert late_but_in_grace.stats["wins"] == {"br-pt": 1}
+
+    too_slow = search_with(1.0)
+    started = time.perf_counter()
+    assert "partners.link/ponte" in asyncio.run(too_slow.search("Programa Ponte"))
+    assert time.perf_counter() - started < 0.8
+    assert too_slow.stats["wins"] == {"global": 1}
@@ -14,7 +14,7 @@ from src.tools.smartResearch import smartResearchTool
 
 async def verify():
     print("--- Verificando DuckDuckGoSearchTool com site ---")
-    res1 = duckDuckGoSearchTool(query="Fundação Estudar", site="partners.link")
+    res1 = await duckDuckGoSearchTool(query="Fundação Estudar", site="partners.link")
     print(f"Resultado (deve conter partners.link): {res1[:200]}...")
     assert "partners.link" in res1.lower() or "não encontrei" in res1.lower()
     